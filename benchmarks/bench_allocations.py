@@ -0,0 +1,174 @@
+"""
+Asignaciones de memoria y presión de GC por turno en el código propio del hot path.
+
+Un "turno" reproduce lo que hace el agente por mensaje fuera de LangChain/OpenAI:
+
+  - ChatRequest.model_validate_json del body (con config del gateway)
+  - _prepare_agent_context + _build_content
+  - ScheduleValidator.validate (horario + CONSULTAR_DISPONIBILIDAD)
+  - check_slot_availability (slot concreto, como ScheduleRecommender)
+  - buscar_productos_servicios (un hit de cache y un término nuevo)
+  - json_response(ChatResponse)
+
+post_with_logging se reemplaza por respuestas fijas en memoria, así que
+resilient_call, circuit breakers y caches corren de verdad pero sin red.
+
+Reporta por turno: bytes pico (tracemalloc), bloques y bytes que siguen vivos
+(lo que retienen los caches) y colecciones de GC por cada 1000 turnos
+(gen0/gen1/gen2) — las pausas que terminan en el p99.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_allocations.py
+    python benchmarks/bench_allocations.py --turns 5000 --json antes.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from citas.agent.content import _build_content  # noqa: E402
+from citas.agent.context import _prepare_agent_context  # noqa: E402
+from citas.fast_json import json_response  # noqa: E402
+from citas.schemas import ChatRequest, ChatResponse  # noqa: E402
+from citas.services import busqueda_productos, catalogo_snapshot  # noqa: E402
+from citas.services.scheduling import availability_client, schedule_validator  # noqa: E402
+from citas.services.scheduling.time_parser import DAY_FIELD_MAP  # noqa: E402
+
+_HORARIO = {campo: "08:00 AM - 08:00 PM" for campo in DAY_FIELD_MAP.values()} | {"horarios_bloqueados": ""}
+
+_PRODUCTOS = [
+    {
+        "nombre": f"Servicio {i}", "precio_unitario": 100 + i, "nombre_categoria": "General",
+        "descripcion": "<p>Descripción del servicio</p>", "nombre_tipo_producto": "Servicio",
+    }
+    for i in range(10)
+]
+
+
+async def _fake_post(url: str, payload: dict[str, Any]) -> dict[str, Any]:
+    cod_ope = payload.get("codOpe")
+    if cod_ope == "OBTENER_HORARIO_REUNIONES":
+        return {"success": True, "horario_reuniones": _HORARIO}
+    if cod_ope == "CONSULTAR_DISPONIBILIDAD":
+        return {"success": True, "disponible": True}
+    return {"success": True, "productos": _PRODUCTOS}
+
+
+def _install_fakes() -> None:
+    for module in (schedule_validator, availability_client, busqueda_productos, catalogo_snapshot):
+        module.post_with_logging = _fake_post
+
+
+def _body(turn: int) -> bytes:
+    return json.dumps({
+        "message": "Quiero agendar el jueves a las 10:30 AM, ¿cuánto cuesta la consultoría?",
+        "session_id": 1000 + turn % 200,
+        "id_empresa": 42,
+        "api_key": "sk-bench",
+        "config": {
+            "duracion_cita_minutos": 60, "slots": 2, "agendar_usuario": True, "usuario_id": "17",
+            "correo_usuario": "vendedor@example.com", "agendar_sucursal": False,
+            "personalidad": "cercana", "nombre_bot": "Sofía", "id_chatbot": 9,
+        },
+    }).encode()
+
+
+async def _turn(turn: int, body: bytes) -> None:
+    request = ChatRequest.model_validate_json(body)
+    context = _prepare_agent_context(request.id_empresa, request.config, request.session_id)
+    _build_content(request.message)
+
+    validator = schedule_validator.ScheduleValidator(
+        id_empresa=context.id_empresa,
+        duracion_cita_minutos=context.duracion_cita_minutos,
+        slots=context.slots,
+        agendar_usuario=context.agendar_usuario,
+        agendar_sucursal=context.agendar_sucursal,
+    )
+    await validator.validate("2099-01-15", "10:30 AM")
+    await availability_client.check_slot_availability(
+        context.id_empresa, "2099-01-15", "11:30 AM", validator.duracion_cita,
+        context.slots, context.agendar_usuario, context.agendar_sucursal,
+    )
+    await busqueda_productos.buscar_productos_servicios(context.id_empresa, "consultoría")
+    await busqueda_productos.buscar_productos_servicios(context.id_empresa, f"servicio {turn % 500}")
+
+    json_response(ChatResponse(reply="Listo, tu cita quedó agendada.", url=None))
+
+
+async def _measure(turns: int) -> dict[str, Any]:
+    bodies = [_body(i) for i in range(200)]
+    for i in range(200):  # warm-up: caches, imports perezosos, specializations
+        await _turn(i, bodies[i])
+
+    collections = [0, 0, 0]
+
+    def _on_gc(phase: str, info: dict[str, Any]) -> None:
+        if phase == "start":
+            collections[info["generation"]] += 1
+
+    gc.collect()
+    gc.callbacks.append(_on_gc)
+    blocks_before = sys.getallocatedblocks()
+    try:
+        for i in range(turns):
+            await _turn(i, bodies[i % 200])
+    finally:
+        gc.callbacks.remove(_on_gc)
+    blocks_retained = sys.getallocatedblocks() - blocks_before
+
+    tracemalloc.start()
+    peaks = []
+    for i in range(min(turns, 500)):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        await _turn(i, bodies[i % 200])
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - start)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peaks.sort()
+    return {
+        "turns": turns,
+        "peak_bytes_per_turn_p50": peaks[len(peaks) // 2],
+        "peak_bytes_per_turn_max": peaks[-1],
+        "retained_blocks_per_turn": round(blocks_retained / turns, 2),
+        "retained_bytes_per_turn": round(current / min(turns, 500), 1),
+        "gc_per_1000_turns": [round(c * 1000 / turns, 2) for c in collections],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=3000)
+    parser.add_argument("--json", default=None, help="Guardar el resultado en este archivo")
+    args = parser.parse_args()
+
+    _install_fakes()
+    result = asyncio.run(_measure(args.turns))
+
+    print(f"Turnos: {result['turns']}")
+    print(f"Bytes pico por turno:      p50={result['peak_bytes_per_turn_p50']:,}  máx={result['peak_bytes_per_turn_max']:,}")
+    print(f"Bloques retenidos / turno: {result['retained_blocks_per_turn']}")
+    print(f"Bytes retenidos / turno:   {result['retained_bytes_per_turn']:,}")
+    gen0, gen1, gen2 = result["gc_per_1000_turns"]
+    print(f"GC cada 1000 turnos:       gen0={gen0} gen1={gen1} gen2={gen2}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark de serialización de checkpoints: tamaño y tiempo de dumps/loads.
+
+Compara sobre un estado conversacional realista (mensajes humanos, AIMessage con
+tool_calls, ToolMessage con horarios, CitaStructuredResponse):
+
+  - json       JsonPlusRedisSerializer (formato actual en Redis)
+  - msgpack    JsonPlusSerializer (formato actual en memoria)
+  - compact/*  CompactCheckpointSerializer con cada codec instalado
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_checkpoint_serde.py [--turns 10] [--iterations 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # noqa: E402
+from langgraph.checkpoint.redis.jsonplus_redis import JsonPlusRedisSerializer  # noqa: E402
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer  # noqa: E402
+
+from citas.agent.content import CitaStructuredResponse  # noqa: E402
+from citas.agent.runtime._serde import CompactCheckpointSerializer, available_codecs  # noqa: E402
+
+_JSON_MODULES = [("citas", "agent", "content", "CitaStructuredResponse")]
+_MSGPACK_MODULES = [("citas.agent.content", "CitaStructuredResponse")]
+
+
+def _build_state(turns: int) -> dict:
+    """Estado tipo 'messages' + structured_response tras N turnos de conversación."""
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"Hola, quisiera una cita para el jueves {i} a las 3pm"))
+        messages.append(AIMessage(
+            content="",
+            tool_calls=[{
+                "name": "check_availability",
+                "args": {"service": "Consulta general", "date": f"2026-03-{10 + i % 18:02d}", "time": "3:00 PM"},
+                "id": f"call_{i:04d}",
+            }],
+        ))
+        messages.append(ToolMessage(
+            content=(
+                "Horarios disponibles para el jueves: 09:00 AM, 09:30 AM, 10:00 AM, "
+                "10:30 AM, 11:00 AM, 03:00 PM, 03:30 PM, 04:00 PM. "
+                "El horario de atención es de 09:00 AM a 06:00 PM."
+            ),
+            tool_call_id=f"call_{i:04d}",
+        ))
+        messages.append(AIMessage(
+            content=(
+                "¡Perfecto! Tengo disponible el *jueves a las 3:00 PM*. "
+                "¿Me confirmas tu nombre completo y correo para agendar?"
+            ),
+        ))
+    return {
+        "messages": messages,
+        "structured_response": CitaStructuredResponse(
+            reply="¡Listo! Tu cita quedó agendada para el jueves a las 3:00 PM.",
+            url=None,
+        ),
+    }
+
+
+def _bench(name: str, serde, obj, iterations: int) -> None:
+    type_, data = serde.dumps_typed(obj)
+    restored = serde.loads_typed((type_, data))
+    assert len(restored["messages"]) == len(obj["messages"]), name
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serde.dumps_typed(obj)
+    dumps_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serde.loads_typed((type_, data))
+    loads_us = (time.perf_counter() - start) / iterations * 1e6
+
+    print(f"{name:<16} {type_:<9} {len(data):>9} {dumps_us:>11.1f} {loads_us:>11.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10, help="Turnos de conversación en el estado")
+    parser.add_argument("--iterations", type=int, default=500, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    state = _build_state(args.turns)
+    serdes = [
+        ("json", JsonPlusRedisSerializer(
+            allowed_json_modules=_JSON_MODULES, allowed_msgpack_modules=_MSGPACK_MODULES,
+        )),
+        ("msgpack", JsonPlusSerializer(allowed_msgpack_modules=_MSGPACK_MODULES)),
+    ]
+    for codec in available_codecs():
+        serdes.append((f"compact/{codec}", CompactCheckpointSerializer(
+            codec=codec,
+            allowed_json_modules=_JSON_MODULES,
+            allowed_msgpack_modules=_MSGPACK_MODULES,
+        )))
+
+    print(f"Estado: {len(state['messages'])} mensajes, {args.iterations} iteraciones")
+    print(f"{'serde':<16} {'type':<9} {'bytes':>9} {'dumps (µs)':>11} {'loads (µs)':>11}")
+    for name, serde in serdes:
+        _bench(name, serde, state, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
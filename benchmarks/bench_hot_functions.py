@@ -0,0 +1,302 @@
+"""
+Micro-benchmarks de las funciones puras del hot path, con baseline y umbral de regresión.
+
+Cubre lo que corre en cada request o tool call:
+
+  - time_parser: parse_time, parse_time_range, is_time_blocked (500 rangos bloqueados)
+  - content._build_content (texto plano y mensaje con URLs de imagen)
+  - busqueda_productos.format_productos_para_respuesta (descripciones HTML largas)
+  - preguntas_frecuentes.format_preguntas_frecuentes_para_prompt (300 FAQs)
+  - context._prepare_agent_context (sin huella y con huella → LRU)
+  - render Jinja del system prompt (catálogo y FAQs grandes)
+  - catalogo_index.CatalogIndex.search (catálogo de 200 ítems: exacta, prefijo, con typo)
+  - texto_busqueda.query_key (clave normalizada del cache de búsquedas)
+
+Cada benchmark se calibra para que una repetición dure >= --min-time y se toma el
+mínimo de --repeat repeticiones intercaladas entre benchmarks (µs por llamada; el mínimo es lo más estable entre
+corridas). Los tiempos se normalizan con una carga de referencia fija (Python puro)
+medida en la misma corrida, así una máquina más lenta o cargada no se confunde con
+una regresión. Contra el baseline guardado, un benchmark falla si su tiempo
+normalizado supera baseline × umbral (default 1.30, o el umbral propio guardado en
+el baseline) y el script sale con código 1 — sirve como gate en CI.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_hot_functions.py                   # compara contra el baseline
+    python benchmarks/bench_hot_functions.py --save-baseline   # regraba el baseline
+    python benchmarks/bench_hot_functions.py -k blocked --threshold 1.15
+
+El baseline depende de la máquina: regrabarlo en la misma máquina/CI donde se compara.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from citas.agent.content import _build_content  # noqa: E402
+from citas.agent.context import _prepare_agent_context  # noqa: E402
+from citas.agent.prompts import _citas_template  # noqa: E402
+from citas.schemas import ChatRequest, CitasConfig  # noqa: E402
+from citas.services.busqueda_productos import format_productos_para_respuesta  # noqa: E402
+from citas.services.catalogo_index import CatalogIndex  # noqa: E402
+from citas.services.texto_busqueda import query_key  # noqa: E402
+from citas.services.prompt_data import format_nombres_para_prompt  # noqa: E402
+from citas.services.prompt_data.preguntas_frecuentes import format_preguntas_frecuentes_para_prompt  # noqa: E402
+from citas.services.scheduling.time_parser import is_time_blocked, parse_time, parse_time_range  # noqa: E402
+
+_BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "hot_functions.json"
+_DEFAULT_THRESHOLD = 1.30
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def _blocked_json(n: int) -> str:
+    """n bloqueos {fecha, inicio, fin} repartidos en 50 días; ninguno cubre la hora consultada."""
+    bloqueos = []
+    for i in range(n):
+        dia = 1 + i % 28
+        hora = 8 + i % 10
+        bloqueos.append({"fecha": f"2026-{3 + i // 28 % 9:02d}-{dia:02d}", "inicio": f"{hora:02d}:00", "fin": f"{hora:02d}:30"})
+    return json.dumps(bloqueos)
+
+
+def _blocked_csv(n: int) -> str:
+    return ", ".join(f"2026-{3 + i // 28 % 9:02d}-{1 + i % 28:02d} {8 + i % 10:02d}:00-{8 + i % 10:02d}:30" for i in range(n))
+
+
+def _productos(n: int, desc_chars: int) -> list[dict[str, Any]]:
+    parrafo = "<p>Descripción <strong>detallada</strong> del servicio &amp; sus beneficios.</p>\n  "
+    return [
+        {
+            "nombre": f"Servicio {i:03d}",
+            "precio_unitario": f"{50 + i * 7.5:.2f}",
+            "nombre_categoria": "Consultas",
+            "nombre_tipo_producto": "Servicio" if i % 2 else "Producto",
+            "nombre_unidad": "unidad",
+            "descripcion": (parrafo * (desc_chars // len(parrafo) + 1))[:desc_chars],
+        }
+        for i in range(n)
+    ]
+
+
+def _faqs(n: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "pregunta": f"  ¿Pregunta frecuente número {i} sobre horarios, pagos y sedes?  ",
+            "respuesta": f"Respuesta {i}: " + "texto explicativo de la política de la empresa. " * 6,
+            "categoria": ("Citas", "Pagos", "Servicios", "")[i % 4],
+            "archivo_ayuda": f"https://cdn.example.com/ayuda/{i}.pdf" if i % 5 == 0 else "",
+        }
+        for i in range(n)
+    ]
+
+
+def _config() -> CitasConfig:
+    return CitasConfig(
+        duracion_cita_minutos=45, slots=3, agendar_usuario=True, usuario_id="17",
+        correo_usuario=" vendedor@example.com ", agendar_sucursal=False,
+        personalidad="cercana y precisa", nombre_bot="Sofía", frase_saludo="¡Hola! Soy Sofía",
+        frase_des="¡Hasta pronto!", frase_no_sabe="Déjame consultarlo", archivo_saludo="", id_chatbot=9,
+    )
+
+
+def _gateway_config() -> CitasConfig:
+    """Config validada por ChatRequest (con huella), como llega desde el gateway."""
+    return ChatRequest.model_validate({
+        "message": "Hola", "session_id": 123456, "id_empresa": 42, "api_key": "sk-bench",
+        "config": _config().model_dump(),
+    }).config
+
+
+def _prompt_variables() -> dict[str, Any]:
+    """Variables como las arma build_citas_system_prompt, con un tenant grande."""
+    config = _config()
+    variables = config.model_dump(exclude_none=True)
+    nombres_productos = [f"Producto {i:03d}" for i in range(150)]
+    nombres_servicios = [f"Servicio {i:03d}" for i in range(150)]
+    variables.update(
+        id_empresa=42,
+        archivo_saludo="",
+        fecha_iso="2026-10-19",
+        hora_actual="10:30 AM",
+        fecha_completa="19 de octubre de 2026 es lunes",
+        horario_atencion="\n".join(f"- {d}: 08:00 - 20:00" for d in ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes")),
+        nombres_productos=nombres_productos,
+        nombres_servicios=nombres_servicios,
+        lista_productos_servicios=format_nombres_para_prompt(nombres_productos, nombres_servicios),
+        contexto_negocio="Clínica con sedes en Lima y Arequipa. " * 40,
+        preguntas_frecuentes=format_preguntas_frecuentes_para_prompt(_faqs(300)),
+        instrucciones_especiales="Confirmar siempre el correo antes de agendar.",
+    )
+    return variables
+
+
+def _benchmarks() -> dict[str, Callable[[], Any]]:
+    fecha = datetime(2026, 5, 14)
+    hora = datetime(1900, 1, 1, 19, 15)
+    blocked_json = _blocked_json(500)
+    blocked_csv = _blocked_csv(500)
+    productos_10 = _productos(10, 1500)
+    productos_50 = _productos(50, 4000)
+    faqs = _faqs(300)
+    catalogo = CatalogIndex(_productos(200, 1500))
+    config = _config()
+    gateway_config = _gateway_config()
+    variables = _prompt_variables()
+    texto = "Hola, quisiera agendar una cita para el jueves a las 3pm, ¿tienen disponibilidad? " * 3
+    con_imagenes = texto + " https://cdn.example.com/a.jpg https://cdn.example.com/b.png?x=1 https://cdn.example.com/c.webp"
+
+    return {
+        "parse_time[12h]": lambda: parse_time("03:30 PM"),
+        "parse_time[24h]": lambda: parse_time("15:30"),
+        "parse_time[invalid]": lambda: parse_time("mañana"),
+        "parse_time_range": lambda: parse_time_range("9:00 AM - 6:00 PM"),
+        "is_time_blocked[json-500]": lambda: is_time_blocked(fecha, hora, blocked_json),
+        "is_time_blocked[csv-500]": lambda: is_time_blocked(fecha, hora, blocked_csv),
+        "build_content[text]": lambda: _build_content(texto),
+        "build_content[images]": lambda: _build_content(con_imagenes),
+        "format_productos[10x1500]": lambda: format_productos_para_respuesta(productos_10),
+        "format_productos[50x4000]": lambda: format_productos_para_respuesta(productos_50),
+        "format_faqs[300]": lambda: format_preguntas_frecuentes_para_prompt(faqs),
+        "catalog_search[exact]": lambda: catalogo.search("Servicio 042", 10),
+        "catalog_search[prefix]": lambda: catalogo.search("consult", 10),
+        "catalog_search[typo]": lambda: catalogo.search("benefisios", 10),
+        "search_query_key": lambda: query_key("¿Cuánto cuesta la limpieza dental?"),
+        "prepare_agent_context": lambda: _prepare_agent_context(42, config, 123456),
+        "prepare_agent_context[cached]": lambda: _prepare_agent_context(42, gateway_config, 123456),
+        "render_system_prompt": lambda: _citas_template.render(**variables),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Medición y comparación
+# ---------------------------------------------------------------------------
+
+def _calibrate(func: Callable[[], Any], min_time: float) -> int:
+    """Cantidad de llamadas para que una repetición dure >= min_time."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return loops
+        loops *= 10 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+
+def _measure_all(
+    benchmarks: dict[str, Callable[[], Any]],
+    repeat: int,
+    min_time: float,
+) -> dict[str, dict[str, float]]:
+    """
+    µs por llamada (mínimo y mediana) de cada benchmark.
+
+    Las repeticiones se intercalan (ronda 1 de todos, ronda 2 de todos, ...) para que
+    una racha de ruido de la máquina afecte a todos por igual y no a uno solo.
+    """
+    loops = {name: _calibrate(func, min_time) for name, func in benchmarks.items()}
+    runs: dict[str, list[float]] = {name: [] for name in benchmarks}
+    for _ in range(repeat):
+        for name, func in benchmarks.items():
+            n = loops[name]
+            start = time.perf_counter()
+            for _ in range(n):
+                func()
+            runs[name].append((time.perf_counter() - start) / n)
+    results = {}
+    for name, values in runs.items():
+        values.sort()
+        results[name] = {"min_us": values[0] * 1e6, "median_us": values[len(values) // 2] * 1e6, "loops": loops[name]}
+    return results
+
+
+def _reference_workload() -> int:
+    """Carga fija de Python puro (dicts, strings, enteros) para normalizar."""
+    data = {f"k{i}": i for i in range(200)}
+    total = 0
+    for key, value in data.items():
+        total += len(key.upper()) + value % 7
+    return total
+
+
+def _load_baseline() -> dict[str, Any]:
+    if not _BASELINE_PATH.exists():
+        return {}
+    return json.loads(_BASELINE_PATH.read_text(encoding="utf-8"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="filter", default=None, help="Solo benchmarks cuyo nombre contenga este texto")
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--min-time", type=float, default=0.02, help="Segundos mínimos por repetición")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"Factor de regresión permitido (default: el del baseline o {_DEFAULT_THRESHOLD})")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar resultados como nuevo baseline")
+    args = parser.parse_args()
+
+    baseline = _load_baseline()
+    base_results = baseline.get("results", {})
+    results: dict[str, dict[str, float]] = {}
+    regressions: list[str] = []
+
+    selected = {
+        name: func for name, func in _benchmarks().items()
+        if not args.filter or args.filter in name
+    }
+    measured = _measure_all({"_reference": _reference_workload, **selected}, args.repeat, args.min_time)
+    reference_us = measured.pop("_reference")["min_us"]
+    base_reference = baseline.get("reference_us")
+    speed = reference_us / base_reference if base_reference else 1.0
+    print(f"Referencia: {reference_us:.2f} µs (factor de velocidad vs baseline: {speed:.2f})\n")
+
+    print(f"{'benchmark':<28} {'min µs':>10} {'mediana µs':>11} {'baseline':>10} {'ratio':>7}")
+    for name, stats in measured.items():
+        results[name] = stats
+        line = f"{name:<28} {stats['min_us']:>10.2f} {stats['median_us']:>11.2f}"
+        base = base_results.get(name)
+        if base and not args.save_baseline:
+            ratio = stats["min_us"] / speed / base["min_us"]
+            threshold = args.threshold or base.get("threshold") or baseline.get("threshold", _DEFAULT_THRESHOLD)
+            flag = "  REGRESIÓN" if ratio > threshold else ""
+            if flag:
+                regressions.append(name)
+            line += f" {base['min_us']:>10.2f} {ratio:>6.2f}x{flag}"
+        print(line)
+
+    if args.save_baseline:
+        merged = {**base_results, **{k: {**base_results.get(k, {}), **v} for k, v in results.items()}}
+        payload = {
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "threshold": baseline.get("threshold", _DEFAULT_THRESHOLD),
+            "reference_us": round(reference_us, 3),
+            "results": {k: {kk: round(vv, 3) for kk, vv in v.items()} for k, v in sorted(merged.items())},
+        }
+        _BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _BASELINE_PATH.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nBaseline guardado en {_BASELINE_PATH}")
+        return 0
+
+    if baseline and baseline.get("python") != platform.python_version():
+        print(f"\nAviso: baseline medido con Python {baseline.get('python')}, ahora {platform.python_version()}")
+    if regressions:
+        print(f"\n{len(regressions)} regresión(es): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
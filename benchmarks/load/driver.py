@@ -0,0 +1,266 @@
+"""
+Driver de carga para POST /api/chat: conversaciones multi-turno a un RPS objetivo.
+
+Modelo open-loop: las llegadas siguen un proceso de Poisson a --rps, sin esperar
+a que terminen los requests anteriores (como el tráfico real del gateway). Cada
+llegada envía el siguiente turno de una conversación que no tenga un turno en
+vuelo; si no hay ninguna libre, empieza una conversación nueva (session_id nuevo,
+empresa al azar entre --empresas). Los turnos de una misma sesión nunca se solapan.
+
+Reporte:
+  - latencia p50 / p95 / p99 / máx de /api/chat (solo requests completados)
+  - RPS logrado, errores (HTTP != 200 o reply de error del agente)
+  - tokens/s: delta de citas_llm_tokens_total en /metrics del agente
+  - promedio por fase: delta de citas_request_phase_duration_seconds (timing.py)
+
+Uso:
+    python benchmarks/load/driver.py --target http://127.0.0.1:8002 --rps 5 --duration 60
+    python benchmarks/load/driver.py ... --json resultados.json   # para comparar cambios
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+# Conversaciones guionadas (los textos disparan las tools del fake de OpenAI)
+CONVERSATIONS: list[list[str]] = [
+    [
+        "Hola, buenas tardes",
+        "¿Qué horarios tienen disponibles para mañana?",
+        "Quiero agendar mañana a las 10am, soy Ana Torres, ana.torres@example.com",
+    ],
+    [
+        "Hola, ¿cuánto cuesta la consulta general?",
+        "¿Y qué horario libre hay para mañana?",
+        "Perfecto, quiero reservar a las 10am. Mi correo es luis.perez@example.com",
+    ],
+    [
+        "Buenas, busco información de sus planes",
+        "¿Tienen algún servicio de evaluación?",
+        "Gracias, lo pensaré",
+    ],
+    [
+        "¿Tienen disponibilidad hoy?",
+        "Ok, entonces mañana. ¿Qué horarios hay?",
+        "Agendar a las 10am por favor, carla.rios@example.com",
+        "Gracias!",
+    ],
+]
+
+_ERROR_PREFIXES = (
+    "Error procesando mensaje",
+    "Error de configuración",
+    "La solicitud tardó más de",
+    "Disculpa, tuve un problema",
+    "¡Hola! Gracias por tu mensaje. En este momento te voy a derivar",
+)
+
+
+@dataclass
+class _Conversation:
+    session_id: int
+    id_empresa: int
+    turns: list[str]
+    next_turn: int = 0
+
+
+@dataclass
+class LoadResult:
+    """Resultado de una corrida del driver."""
+
+    duration_s: float
+    sent: int = 0
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    http_errors: int = 0
+    conversations: int = 0
+    tokens: float = 0.0
+    phases_ms: dict[str, tuple[float, int]] = field(default_factory=dict)
+
+    def summary(self) -> dict[str, Any]:
+        lat = sorted(self.latencies)
+        if len(lat) >= 2:
+            q = statistics.quantiles(lat, n=100, method="inclusive")
+            p50, p95, p99 = q[49], q[94], q[98]
+        else:
+            p50 = p95 = p99 = lat[0] if lat else 0.0
+        return {
+            "duration_s": round(self.duration_s, 1),
+            "sent": self.sent,
+            "completed": len(lat),
+            "conversations": self.conversations,
+            "achieved_rps": round(len(lat) / self.duration_s, 2) if self.duration_s else 0.0,
+            "errors": self.errors,
+            "http_errors": self.http_errors,
+            "latency_ms": {
+                "p50": round(p50 * 1000, 1),
+                "p95": round(p95 * 1000, 1),
+                "p99": round(p99 * 1000, 1),
+                "max": round((lat[-1] if lat else 0.0) * 1000, 1),
+            },
+            "tokens": int(self.tokens),
+            "tokens_per_s": round(self.tokens / self.duration_s, 1) if self.duration_s else 0.0,
+            "phases_avg_ms": {
+                phase: {"avg_ms": round(total / count * 1000, 2), "count": count}
+                for phase, (total, count) in sorted(self.phases_ms.items())
+                if count
+            },
+        }
+
+
+async def _scrape_metrics(client: httpx.AsyncClient, target: str) -> tuple[float, dict[str, tuple[float, int]]]:
+    """(tokens totales, {fase: (suma_s, count)}) desde /metrics del agente."""
+    try:
+        response = await client.get(f"{target}/metrics/")
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return 0.0, {}
+    tokens = 0.0
+    phases: dict[str, list[float]] = {}
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if sample.name == "citas_llm_tokens_total" and sample.labels.get("type") == "total":
+                tokens = sample.value
+            elif sample.name == "citas_request_phase_duration_seconds_sum":
+                phases.setdefault(sample.labels["phase"], [0.0, 0])[0] = sample.value
+            elif sample.name == "citas_request_phase_duration_seconds_count":
+                phases.setdefault(sample.labels["phase"], [0.0, 0])[1] = int(sample.value)
+    return tokens, {k: (v[0], int(v[1])) for k, v in phases.items()}
+
+
+async def run_load(
+    target: str,
+    rps: float,
+    duration: float,
+    empresas: int = 10,
+    token: str | None = None,
+    api_key: str = "sk-load-test",
+    request_timeout: float = 150.0,
+    seed: int | None = None,
+) -> LoadResult:
+    """Ejecuta la carga y retorna el resultado (ver LoadResult.summary)."""
+    rng = random.Random(seed)
+    headers = {"X-Internal-Token": token} if token else {}
+    session_ids = itertools.count(int(time.time()) % 1_000_000 * 1000)
+    idle: deque[_Conversation] = deque()
+    in_flight: set[asyncio.Task] = set()
+
+    async with httpx.AsyncClient(
+        timeout=request_timeout,
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=200),
+        headers=headers,
+    ) as client:
+        tokens_before, phases_before = await _scrape_metrics(client, target)
+        result = LoadResult(duration_s=duration)
+
+        async def _send(conv: _Conversation) -> None:
+            message = conv.turns[conv.next_turn]
+            body = {
+                "message": message,
+                "session_id": conv.session_id,
+                "id_empresa": conv.id_empresa,
+                "api_key": api_key,
+                "config": {
+                    "duracion_cita_minutos": 30,
+                    "slots": 2,
+                    "usuario_id": 1,
+                    "correo_usuario": "vendedor@example.com",
+                    "id_chatbot": conv.id_empresa,
+                },
+            }
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"{target}/api/chat", json=body)
+                elapsed = time.perf_counter() - start
+                if response.status_code != 200:
+                    result.http_errors += 1
+                else:
+                    result.latencies.append(elapsed)
+                    reply = response.json().get("reply") or ""
+                    if reply.startswith(_ERROR_PREFIXES):
+                        result.errors += 1
+            except httpx.HTTPError:
+                result.http_errors += 1
+            conv.next_turn += 1
+            if conv.next_turn < len(conv.turns):
+                idle.append(conv)
+
+        start = time.perf_counter()
+        next_arrival = start
+        while next_arrival - start < duration:
+            await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+            if idle:
+                conv = idle.popleft()
+            else:
+                conv = _Conversation(
+                    session_id=next(session_ids),
+                    id_empresa=rng.randint(1, empresas),
+                    turns=rng.choice(CONVERSATIONS),
+                )
+                result.conversations += 1
+            task = asyncio.create_task(_send(conv))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            result.sent += 1
+            next_arrival += rng.expovariate(rps)
+
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=request_timeout)
+        result.duration_s = time.perf_counter() - start
+
+        tokens_after, phases_after = await _scrape_metrics(client, target)
+        result.tokens = max(0.0, tokens_after - tokens_before)
+        for phase, (total, count) in phases_after.items():
+            prev_total, prev_count = phases_before.get(phase, (0.0, 0))
+            result.phases_ms[phase] = (total - prev_total, count - prev_count)
+    return result
+
+
+def print_summary(summary: dict[str, Any]) -> None:
+    lat = summary["latency_ms"]
+    print(f"Duración: {summary['duration_s']}s | enviados: {summary['sent']} | completados: {summary['completed']} "
+          f"| conversaciones: {summary['conversations']} | RPS logrado: {summary['achieved_rps']}")
+    print(f"Errores agente: {summary['errors']} | errores HTTP: {summary['http_errors']}")
+    print(f"Latencia (ms): p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} max={lat['max']}")
+    print(f"Tokens: {summary['tokens']} ({summary['tokens_per_s']} tokens/s)")
+    if summary["phases_avg_ms"]:
+        print(f"{'fase':<20} {'avg (ms)':>10} {'count':>8}")
+        for phase, data in summary["phases_avg_ms"].items():
+            print(f"{phase:<20} {data['avg_ms']:>10} {data['count']:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="http://127.0.0.1:8002", help="URL base del agente")
+    parser.add_argument("--rps", type=float, default=5.0, help="Requests por segundo objetivo")
+    parser.add_argument("--duration", type=float, default=60.0, help="Segundos de generación de carga")
+    parser.add_argument("--empresas", type=int, default=10, help="Cantidad de id_empresa distintos")
+    parser.add_argument("--token", default=None, help="X-Internal-Token (si INTERNAL_API_TOKEN está activo)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", default=None, help="Guardar el resumen en este archivo")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(
+        args.target, args.rps, args.duration, empresas=args.empresas, token=args.token, seed=args.seed,
+    ))
+    summary = result.summary()
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Stand-in local de OpenAI Chat Completions para pruebas de carga.
+
+Responde POST /v1/chat/completions con tool calls guionadas según el último mensaje:
+
+  - Último mensaje del usuario con palabras clave → tool call:
+      precio / cuesta / busco / tienen      → search_productos_servicios
+      agendar / reservar (+ email)          → create_booking
+      horario / disponib / mañana / hoy     → check_availability
+  - Último mensaje es el resultado de una tool, o el usuario no pidió nada de lo
+    anterior → respuesta final.
+
+La respuesta final respeta la estrategia de structured output que use el agente:
+`response_format` json_schema (ProviderStrategy) → JSON en content; tool
+`CitaStructuredResponse` (ToolStrategy) → tool call a esa tool.
+
+Latencia configurable (base + jitter uniforme) y `usage` aproximado (4 chars/token)
+para que citas_llm_tokens_total refleje volumen real.
+
+Uso (standalone; run_load.py lo levanta solo):
+    python benchmarks/load/fake_openai.py --port 9100 --latency-ms 400 --jitter-ms 150
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 python run.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+
+# (palabras clave, tool) — se evalúan en orden
+_SCRIPT: list[tuple[tuple[str, ...], str]] = [
+    (("agendar", "agenda", "reservar", "reserva"), "create_booking"),
+    (("precio", "cuesta", "busco", "tienen", "ofrecen"), "search_productos_servicios"),
+    (("horario", "disponib", "mañana", "hoy", "libre"), "check_availability"),
+]
+
+_FINAL_REPLIES = {
+    "check_availability": "Tengo estos horarios libres para mañana: 10:00 AM, 11:30 AM y 3:00 PM. ¿Cuál prefieres?",
+    "search_productos_servicios": "Encontré lo que buscas. La *Consulta general* cuesta S/. 120.00. ¿Quieres agendar?",
+    "create_booking": "¡Listo! Tu cita quedó agendada para mañana a las 10:00 AM. Te llegará la confirmación al correo.",
+    None: "¡Hola! Con gusto te ayudo a agendar una cita. ¿Qué día y hora te acomodan?",
+}
+
+
+class FakeOpenAIState:
+    """Configuración y contadores del servidor."""
+
+    def __init__(self, latency_ms: float, jitter_ms: float) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):  # content multimodal (Vision)
+        return " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return ""
+
+
+def _tomorrow() -> str:
+    return (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def _tool_args(tool: str, user_text: str) -> dict[str, Any]:
+    if tool == "search_productos_servicios":
+        words = [w for w in re.findall(r"\w+", user_text.lower()) if len(w) > 3]
+        return {"busqueda": words[-1] if words else "consulta"}
+    if tool == "create_booking":
+        email = _EMAIL_RE.search(user_text)
+        return {
+            "date": _tomorrow(),
+            "time": "10:00 AM",
+            "customer_name": "Cliente Prueba",
+            "customer_contact": email.group(0) if email else "cliente@example.com",
+        }
+    return {"date": _tomorrow(), "time": "10:00 AM"}
+
+
+def _pick_tool(user_text: str, available: set[str]) -> str | None:
+    lowered = user_text.lower()
+    for keywords, tool in _SCRIPT:
+        if tool in available and any(k in lowered for k in keywords):
+            if tool == "create_booking" and not _EMAIL_RE.search(user_text):
+                continue
+            return tool
+    return None
+
+
+def _last_tool_name(messages: list[dict[str, Any]]) -> str | None:
+    """Nombre de la tool cuyo resultado es el último mensaje."""
+    call_id = messages[-1].get("tool_call_id")
+    for msg in reversed(messages):
+        for call in msg.get("tool_calls") or []:
+            if call.get("id") == call_id:
+                return call["function"]["name"]
+    return None
+
+
+def _tool_call(name: str, args: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": f"call_{uuid.uuid4().hex[:24]}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(args, ensure_ascii=False)},
+    }
+
+
+def build_completion(body: dict[str, Any]) -> tuple[dict[str, Any], int, int]:
+    """Arma la respuesta guionada. Retorna (completion, prompt_tokens, completion_tokens)."""
+    messages = body.get("messages") or []
+    tools = {t["function"]["name"] for t in body.get("tools") or [] if t.get("type") == "function"}
+    last = messages[-1] if messages else {"role": "user", "content": ""}
+
+    message: dict[str, Any] = {"role": "assistant", "content": None, "refusal": None}
+    tool_name = None
+    if last.get("role") == "user":
+        tool_name = _pick_tool(_text(last.get("content")), tools)
+
+    if tool_name is not None:
+        message["tool_calls"] = [_tool_call(tool_name, _tool_args(tool_name, _text(last.get("content"))))]
+        finish_reason = "tool_calls"
+    else:
+        previous_tool = _last_tool_name(messages) if last.get("role") == "tool" else None
+        reply = _FINAL_REPLIES.get(previous_tool, _FINAL_REPLIES[None])
+        structured = {"reply": reply, "url": None}
+        if body.get("response_format"):
+            message["content"] = json.dumps(structured, ensure_ascii=False)
+            finish_reason = "stop"
+        elif "CitaStructuredResponse" in tools:
+            message["tool_calls"] = [_tool_call("CitaStructuredResponse", structured)]
+            finish_reason = "tool_calls"
+        else:
+            message["content"] = reply
+            finish_reason = "stop"
+
+    prompt_chars = sum(len(_text(m.get("content"))) for m in messages) + len(json.dumps(body.get("tools") or []))
+    output_chars = len(message["content"] or "") + len(json.dumps(message.get("tool_calls") or []))
+    prompt_tokens, completion_tokens = prompt_chars // 4 + 1, output_chars // 4 + 1
+
+    completion = {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+    return completion, prompt_tokens, completion_tokens
+
+
+def create_app(state: FakeOpenAIState) -> FastAPI:
+    app = FastAPI(title="fake-openai")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> dict[str, Any]:
+        body = await request.json()
+        delay = state.latency_ms + random.uniform(-state.jitter_ms, state.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+        completion, prompt_tokens, completion_tokens = build_completion(body)
+        state.requests += 1
+        state.prompt_tokens += prompt_tokens
+        state.completion_tokens += completion_tokens
+        return completion
+
+    @app.get("/stats")
+    async def stats() -> dict[str, int]:
+        return {
+            "requests": state.requests,
+            "prompt_tokens": state.prompt_tokens,
+            "completion_tokens": state.completion_tokens,
+        }
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=400, help="Latencia base por completion")
+    parser.add_argument("--jitter-ms", type=float, default=150, help="Jitter uniforme ± sobre la latencia")
+    args = parser.parse_args()
+    app = create_app(FakeOpenAIState(args.latency_ms, args.jitter_ms))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Stand-in local de las APIs PHP de MaravIA para pruebas de carga.
+
+Un solo servidor con las rutas que usa el agente (despacho por codOpe):
+
+  POST /ws_informacion_ia.php        OBTENER_HORARIO_REUNIONES, OBTENER_PRODUCTOS_CITAS,
+                                     OBTENER_SERVICIOS_CITAS, OBTENER_CONTEXTO_NEGOCIO,
+                                     OBTENER_FUNCIONES_ESPECIALES,
+                                     BUSCAR_PRODUCTOS_SERVICIOS_CITAS,
+                                     MULTI_OPERACION (varias de las anteriores en un POST)
+  POST /ws_preguntas_frecuentes.php  FAQs por id_chatbot
+  POST /ws_agendar_reunion.php       CONSULTAR_DISPONIBILIDAD, SUGERIR_HORARIOS
+  POST /ws_calendario.php            CREAR_EVENTO
+  GET  /stats                        requests atendidos por codOpe
+
+MULTI_OPERACION recibe {"operaciones": [payload, ...]} y responde
+{"success": true, "resultados": [...]} en el mismo orden (ver infra/batching.py);
+con --no-multi-op responde como un backend que no la conoce. En /stats cuenta como
+MULTI_OPERACION y además suma cada operación interna a su codOpe.
+
+Catálogo, FAQs y descripciones (HTML largo) tienen tamaño configurable para
+ejercitar el formateo y el system prompt con tenants grandes.
+
+Uso (standalone; run_load.py lo levanta solo):
+    python benchmarks/load/fake_php.py --port 9200 --latency-ms 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+class FakePHPState:
+    """Configuración, datos sintéticos y contadores del servidor."""
+
+    def __init__(
+        self, latency_ms: float, jitter_ms: float, productos: int, faqs: int, desc_chars: int,
+        multi_op: bool = True,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.multi_op = multi_op
+        self.jitter_ms = jitter_ms
+        self.calls: Counter[str] = Counter()
+        self.catalogo = [_producto(i, desc_chars) for i in range(productos)]
+        self.faqs = [
+            {
+                "pregunta": f"¿Pregunta frecuente número {i} sobre citas y servicios?",
+                "respuesta": f"Respuesta detallada {i}: " + "texto de ejemplo " * 12,
+                "categoria": ("Citas", "Pagos", "Servicios")[i % 3],
+            }
+            for i in range(faqs)
+        ]
+
+
+def _producto(i: int, desc_chars: int) -> dict[str, Any]:
+    es_servicio = i % 2 == 0
+    parrafo = "<p>Descripción <strong>detallada</strong> del producto &amp; sus beneficios.</p> "
+    return {
+        "nombre": f"{'Servicio' if es_servicio else 'Producto'} {i:03d}",
+        "precio_unitario": f"{50 + i * 7.5:.2f}",
+        "nombre_categoria": ("Consultas", "Planes", "Equipos")[i % 3],
+        "nombre_tipo_producto": "Servicio" if es_servicio else "Producto",
+        "nombre_unidad": "unidad",
+        "descripcion": (parrafo * (desc_chars // len(parrafo) + 1))[:desc_chars],
+    }
+
+
+def _horario() -> dict[str, Any]:
+    abierto = "08:00-20:00"
+    return {
+        "reunion_lunes": abierto,
+        "reunion_martes": abierto,
+        "reunion_miercoles": abierto,
+        "reunion_jueves": abierto,
+        "reunion_viernes": abierto,
+        "reunion_sabado": abierto,
+        "reunion_domingo": abierto,
+        "horarios_bloqueados": "",
+    }
+
+
+def _sugerencias() -> list[dict[str, Any]]:
+    manana = datetime.now() + timedelta(days=1)
+    horas = [(10, 0, "10:00 AM"), (11, 30, "11:30 AM"), (15, 0, "03:00 PM")]
+    return [
+        {
+            "dia": "mañana",
+            "hora_legible": legible,
+            "disponible": True,
+            "fecha_inicio": manana.replace(hour=h, minute=m, second=0).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        for h, m, legible in horas
+    ]
+
+
+def _informacion(state: FakePHPState, cod_ope: str, payload: dict[str, Any]) -> dict[str, Any]:
+    if cod_ope == "OBTENER_HORARIO_REUNIONES":
+        return {"success": True, "horario_reuniones": _horario()}
+    if cod_ope == "OBTENER_PRODUCTOS_CITAS":
+        return {"success": True, "productos": [p for p in state.catalogo if p["nombre_tipo_producto"] == "Producto"]}
+    if cod_ope == "OBTENER_SERVICIOS_CITAS":
+        return {"success": True, "servicios": [p for p in state.catalogo if p["nombre_tipo_producto"] == "Servicio"]}
+    if cod_ope == "OBTENER_CONTEXTO_NEGOCIO":
+        return {"success": True, "contexto_negocio": "Clínica de ejemplo con sedes en Lima. " * 20}
+    if cod_ope == "OBTENER_FUNCIONES_ESPECIALES":
+        return {"success": True, "funciones_especiales": ""}
+    if cod_ope == "BUSCAR_PRODUCTOS_SERVICIOS_CITAS":
+        termino = str(payload.get("busqueda", "")).lower()
+        limite = int(payload.get("limite") or 10)
+        encontrados = [p for p in state.catalogo if termino in p["nombre"].lower()] or state.catalogo
+        return {"success": True, "productos": encontrados[:limite]}
+    return {"success": False, "error": f"codOpe no soportado: {cod_ope}"}
+
+
+def _agendar(cod_ope: str) -> dict[str, Any]:
+    if cod_ope == "CONSULTAR_DISPONIBILIDAD":
+        return {"success": True, "disponible": True}
+    if cod_ope == "SUGERIR_HORARIOS":
+        return {"success": True, "mensaje": "Horarios disponibles encontrados", "total": 3, "sugerencias": _sugerencias()}
+    return {"success": False, "error": f"codOpe no soportado: {cod_ope}"}
+
+
+def create_app(state: FakePHPState) -> FastAPI:
+    app = FastAPI(title="fake-maravia-php")
+
+    async def _latency() -> None:
+        delay = state.latency_ms + random.uniform(-state.jitter_ms, state.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+    @app.post("/ws_informacion_ia.php")
+    async def informacion(request: Request) -> dict[str, Any]:
+        payload = await request.json()
+        cod_ope = payload.get("codOpe", "")
+        state.calls[cod_ope] += 1
+        await _latency()
+        if cod_ope == "MULTI_OPERACION" and state.multi_op:
+            operaciones = payload.get("operaciones") or []
+            state.calls.update(op.get("codOpe", "") for op in operaciones)
+            return {"success": True, "resultados": [_informacion(state, op.get("codOpe", ""), op) for op in operaciones]}
+        return _informacion(state, cod_ope, payload)
+
+    @app.post("/ws_preguntas_frecuentes.php")
+    async def preguntas_frecuentes(request: Request) -> dict[str, Any]:
+        await request.json()
+        state.calls["PREGUNTAS_FRECUENTES"] += 1
+        await _latency()
+        return {"success": True, "preguntas_frecuentes": state.faqs}
+
+    @app.post("/ws_agendar_reunion.php")
+    async def agendar_reunion(request: Request) -> dict[str, Any]:
+        payload = await request.json()
+        cod_ope = payload.get("codOpe", "")
+        state.calls[cod_ope] += 1
+        await _latency()
+        return _agendar(cod_ope)
+
+    @app.post("/ws_calendario.php")
+    async def calendario(request: Request) -> dict[str, Any]:
+        payload = await request.json()
+        cod_ope = payload.get("codOpe", "")
+        state.calls[cod_ope] += 1
+        await _latency()
+        if cod_ope != "CREAR_EVENTO":
+            return {"success": False, "message": f"codOpe no soportado: {cod_ope}"}
+        return {"success": True, "message": "Evento creado correctamente", "google_calendar_synced": False}
+
+    @app.get("/stats")
+    async def stats() -> dict[str, int]:
+        return dict(state.calls)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency-ms", type=float, default=60, help="Latencia base por request")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="Jitter uniforme ± sobre la latencia")
+    parser.add_argument("--productos", type=int, default=200, help="Tamaño del catálogo por empresa")
+    parser.add_argument("--faqs", type=int, default=50, help="Preguntas frecuentes por chatbot")
+    parser.add_argument("--desc-chars", type=int, default=1500, help="Largo de cada descripción HTML")
+    parser.add_argument("--no-multi-op", action="store_true", help="Simular un backend sin MULTI_OPERACION")
+    args = parser.parse_args()
+    state = FakePHPState(
+        args.latency_ms, args.jitter_ms, args.productos, args.faqs, args.desc_chars, multi_op=not args.no_multi_op,
+    )
+    uvicorn.run(create_app(state), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Replay offline de conversaciones grabadas (CONVERSATION_RECORD_FILE) contra un build.
+
+Reproduce el tráfico real con backends simulados y deterministas:
+
+  - LLM: cada turno devuelve exactamente las respuestas grabadas del modelo (tool
+    calls con sus args y la respuesta final), con la latencia y el usage grabados.
+    El guion del turno se elige por el texto del usuario (FIFO entre turnos con el
+    mismo texto) y los pasos siguientes se encadenan por tool_call_id, así cada
+    conversación sigue su forma real.
+  - PHP: cada POST devuelve la respuesta grabada para ese payload (o, si el payload
+    cambió — fechas relativas a hoy —, la última del mismo codOpe y empresa), con la
+    latencia grabada.
+
+Las sesiones arrancan con el espaciado original dividido por --speed (0 = sin
+esperas, hasta --concurrency sesiones a la vez); los turnos de una sesión son
+secuenciales. Si el build hace más llamadas al modelo que las grabadas, el stub
+cierra el turno con la respuesta grabada.
+
+Reporte: latencias de /api/chat, llamadas al LLM, tokens y llamadas PHP por codOpe,
+junto a lo mismo calculado del log original. Para comparar builds:
+
+    python benchmarks/load/replay.py grabacion.jsonl.gz --json build_a.json
+    git checkout otra-rama
+    python benchmarks/load/replay.py grabacion.jsonl.gz --json build_b.json
+    python benchmarks/load/replay.py --compare build_a.json build_b.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+from typing import Any
+
+import httpx
+from fastapi import FastAPI, Request
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+import driver  # noqa: E402
+import run_load  # noqa: E402
+from fake_openai import _text, _tool_call  # noqa: E402
+
+from citas.agent.content import _build_content  # noqa: E402
+from citas.recording import iter_records  # noqa: E402
+
+
+def _turn_key(message: str) -> str:
+    """Clave del guion: el texto del usuario tal como lo ve el modelo (sin URLs de imagen)."""
+    return _text(_build_content(message)).strip()
+
+
+def _canonical(payload: Any) -> str:
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False)
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    values = sorted(values)
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    if len(values) == 1:
+        q = [values[0]] * 99
+    else:
+        q = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": round(q[49], 1), "p95": round(q[94], 1), "p99": round(q[98], 1), "max": round(values[-1], 1)}
+
+
+# ---------------------------------------------------------------------------
+# Carga del log
+# ---------------------------------------------------------------------------
+
+class Recording:
+    """Sesiones del log y los índices que usan los stubs."""
+
+    def __init__(self, records: list[dict[str, Any]]) -> None:
+        records.sort(key=lambda r: r["ts"])
+        self.records = records
+        self.sessions: dict[int, list[dict[str, Any]]] = defaultdict(list)
+        for record in records:
+            self.sessions[record["request"]["session_id"]].append(record)
+
+        self.scripts: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self.php_exact: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self.php_by_ope: dict[tuple[str, Any], dict[str, Any]] = {}
+        for turns in self.sessions.values():
+            for record in turns:
+                self.scripts[_turn_key(record["request"]["message"])].append(record)
+                for call in record["php"]:
+                    self.php_exact[_canonical(call["payload"])].append(call)
+                    self.php_by_ope[(call["cod_ope"], call["payload"].get("id_empresa"))] = call
+                    self.php_by_ope.setdefault((call["cod_ope"], None), call)
+
+    def summary(self) -> dict[str, Any]:
+        """Mismas métricas que el replay, calculadas sobre lo grabado."""
+        return {
+            "turns": len(self.records),
+            "sessions": len(self.sessions),
+            "latency_ms": _percentiles([r["elapsed_ms"] for r in self.records]),
+            "llm_calls": sum(len(r["llm"]) for r in self.records),
+            "tokens": sum(c["usage"]["total"] for r in self.records for c in r["llm"]),
+            "php_calls": dict(Counter(c["cod_ope"] or "(sin codOpe)" for r in self.records for c in r["php"])),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Stubs
+# ---------------------------------------------------------------------------
+
+class ReplayState:
+    def __init__(self, recording: Recording, latency_scale: float) -> None:
+        self.recording = recording
+        self.latency_scale = latency_scale
+        self.scripts = {k: deque(v) for k, v in recording.scripts.items()}
+        self.php_exact = {k: deque(v) for k, v in recording.php_exact.items()}
+        self.pending: dict[str, tuple[dict[str, Any], int]] = {}  # tool_call_id → (record, paso)
+        self.llm_calls = 0
+        self.llm_unscripted = 0
+        self.tokens = 0
+        self.php_calls: Counter[str] = Counter()
+        self.php_unmatched = 0
+
+    async def sleep(self, ms: float) -> None:
+        if self.latency_scale > 0 and ms > 0:
+            await asyncio.sleep(ms * self.latency_scale / 1000)
+
+
+def _final_message(record: dict[str, Any], body: dict[str, Any], tools: set[str]) -> tuple[dict[str, Any], str]:
+    """Respuesta final sintetizada (el build pidió más pasos que los grabados)."""
+    structured = {"reply": record.get("reply") or "", "url": record.get("url")}
+    if body.get("response_format"):
+        return {"role": "assistant", "content": json.dumps(structured, ensure_ascii=False)}, "stop"
+    if "CitaStructuredResponse" in tools:
+        return {"role": "assistant", "content": None, "tool_calls": [_tool_call("CitaStructuredResponse", structured)]}, "tool_calls"
+    return {"role": "assistant", "content": structured["reply"]}, "stop"
+
+
+def create_llm_app(state: ReplayState) -> FastAPI:
+    app = FastAPI(title="replay-openai")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> dict[str, Any]:
+        body = await request.json()
+        messages = body.get("messages") or []
+        tools = {t["function"]["name"] for t in body.get("tools") or [] if t.get("type") == "function"}
+        last = messages[-1] if messages else {}
+
+        record, step = None, 0
+        if last.get("role") == "tool":
+            record, step = state.pending.pop(last.get("tool_call_id"), (None, 0))
+        else:
+            queue = state.scripts.get(_text(last.get("content")).strip())
+            if queue:
+                record = queue[0] if len(queue) == 1 else queue.popleft()
+
+        state.llm_calls += 1
+        if record is not None and step < len(record["llm"]):
+            recorded = record["llm"][step]
+            await state.sleep(recorded["ms"])
+            message: dict[str, Any] = {"role": "assistant", "content": None}
+            if recorded["tool_calls"]:
+                calls = [_tool_call(c["name"], c["args"]) for c in recorded["tool_calls"]]
+                message["tool_calls"] = calls
+                for call in calls:
+                    state.pending[call["id"]] = (record, step + 1)
+                finish_reason = "tool_calls"
+            else:
+                content = recorded["content"]
+                message["content"] = content if isinstance(content, str) else _text(content)
+                finish_reason = "stop"
+            usage = recorded["usage"]
+        else:
+            state.llm_unscripted += 1
+            message, finish_reason = _final_message(record or {}, body, tools)
+            usage = {"input": 0, "output": 0, "total": 0}
+        state.tokens += usage["total"]
+
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+            "usage": {
+                "prompt_tokens": usage["input"],
+                "completion_tokens": usage["output"],
+                "total_tokens": usage["total"],
+            },
+        }
+
+    return app
+
+
+def create_php_app(state: ReplayState) -> FastAPI:
+    app = FastAPI(title="replay-php")
+
+    @app.post("/{path:path}")
+    async def php(path: str, request: Request) -> Any:
+        payload = await request.json()
+        cod_ope = payload.get("codOpe", "")
+        state.php_calls[cod_ope or "(sin codOpe)"] += 1
+        queue = state.php_exact.get(_canonical(payload))
+        if queue:
+            call = queue[0] if len(queue) == 1 else queue.popleft()
+        else:
+            call = (
+                state.recording.php_by_ope.get((cod_ope, payload.get("id_empresa")))
+                or state.recording.php_by_ope.get((cod_ope, None))
+            )
+        if call is None:
+            state.php_unmatched += 1
+            return {"success": False, "error": "sin respuesta grabada"}
+        await state.sleep(call["ms"])
+        return call["response"]
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+async def replay_sessions(
+    target: str,
+    recording: Recording,
+    speed: float,
+    concurrency: int,
+    request_timeout: float = 150.0,
+) -> tuple[list[float], int]:
+    """Reproduce todas las sesiones. Retorna (latencias ms, requests con error)."""
+    latencies: list[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    t0 = recording.records[0]["ts"] if recording.records else 0.0
+
+    async with httpx.AsyncClient(timeout=request_timeout) as client:
+        async def _session(turns: list[dict[str, Any]]) -> None:
+            nonlocal errors
+            if speed > 0:
+                await asyncio.sleep((turns[0]["ts"] - t0) / speed)
+            async with semaphore:
+                previous_ts = turns[0]["ts"]
+                for record in turns:
+                    if speed > 0:
+                        await asyncio.sleep(max(0.0, record["ts"] - previous_ts - record["elapsed_ms"] / 1000) / speed)
+                    previous_ts = record["ts"]
+                    body = {**record["request"], "api_key": "sk-replay"}
+                    start = time.perf_counter()
+                    try:
+                        response = await client.post(f"{target}/api/chat", json=body)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        if response.status_code != 200 or response.json().get("reply", "").startswith(driver._ERROR_PREFIXES):
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+
+        await asyncio.gather(*(_session(turns) for turns in recording.sessions.values()))
+    return latencies, errors
+
+
+# ---------------------------------------------------------------------------
+# Reporte y comparación
+# ---------------------------------------------------------------------------
+
+def _print_side_by_side(title_a: str, a: dict[str, Any], title_b: str, b: dict[str, Any]) -> None:
+    def row(label: str, va: Any, vb: Any) -> None:
+        delta = ""
+        if isinstance(va, (int, float)) and isinstance(vb, (int, float)) and va:
+            delta = f"{(vb - va) / va * 100:+.1f}%"
+        print(f"{label:<40} {va!s:>14} {vb!s:>14} {delta:>9}")
+
+    print(f"{'':<40} {title_a:>14} {title_b:>14} {'Δ':>9}")
+    for q in ("p50", "p95", "p99", "max"):
+        row(f"latencia {q} (ms)", a["latency_ms"][q], b["latency_ms"][q])
+    row("llamadas LLM", a["llm_calls"], b["llm_calls"])
+    row("tokens", a["tokens"], b["tokens"])
+    for ope in sorted(set(a["php_calls"]) | set(b["php_calls"])):
+        row(f"php {ope}", a["php_calls"].get(ope, 0), b["php_calls"].get(ope, 0))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", nargs="?", help="Archivo de CONVERSATION_RECORD_FILE (.jsonl o .jsonl.gz)")
+    parser.add_argument("--compare", nargs=2, metavar=("A.json", "B.json"), help="Comparar dos resúmenes de replay")
+    parser.add_argument("--speed", type=float, default=0.0, help="Factor de aceleración del espaciado real (0 = sin esperas)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Sesiones simultáneas (con --speed 0)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplica la latencia grabada de LLM y PHP (0 = sin latencia)")
+    parser.add_argument("--agent-port", type=int, default=8103)
+    parser.add_argument("--openai-port", type=int, default=9101)
+    parser.add_argument("--php-port", type=int, default=9201)
+    parser.add_argument("--agent-env", action="append", default=[], metavar="CLAVE=VALOR")
+    parser.add_argument("--agent-log", default=None)
+    parser.add_argument("--json", default=None, help="Guardar el resumen del replay en este archivo")
+    args = parser.parse_args()
+
+    if args.compare:
+        a, b = (json.loads(Path(p).read_text(encoding="utf-8")) for p in args.compare)
+        _print_side_by_side(Path(args.compare[0]).stem, a["replay"], Path(args.compare[1]).stem, b["replay"])
+        return 0
+    if not args.recording:
+        parser.error("falta el archivo de grabación (o --compare)")
+
+    recording = Recording(list(iter_records(args.recording)))
+    if not recording.records:
+        print("La grabación está vacía")
+        return 1
+    state = ReplayState(recording, args.latency_scale)
+    servers = [
+        run_load.serve_in_thread(create_llm_app(state), args.openai_port),
+        run_load.serve_in_thread(create_php_app(state), args.php_port),
+    ]
+
+    agent_url = f"http://127.0.0.1:{args.agent_port}"
+    log = open(args.agent_log, "w") if args.agent_log else subprocess.DEVNULL
+    agent = run_load.start_agent(
+        args.agent_port, f"http://127.0.0.1:{args.openai_port}/v1",
+        f"http://127.0.0.1:{args.php_port}", args.agent_env, log,
+    )
+    try:
+        run_load.wait_healthy(agent_url, agent, timeout=60)
+        print(f"Replay: {len(recording.records)} turnos en {len(recording.sessions)} sesiones contra {agent_url}")
+        start = time.perf_counter()
+        latencies, errors = asyncio.run(replay_sessions(agent_url, recording, args.speed, args.concurrency))
+        wall = time.perf_counter() - start
+    finally:
+        run_load.stop_agent(agent)
+        for server in servers:
+            server.should_exit = True
+        if log is not subprocess.DEVNULL:
+            log.close()
+
+    replayed = {
+        "turns": len(latencies),
+        "sessions": len(recording.sessions),
+        "latency_ms": _percentiles(latencies),
+        "llm_calls": state.llm_calls,
+        "tokens": state.tokens,
+        "php_calls": dict(state.php_calls),
+        "errors": errors,
+        "llm_unscripted": state.llm_unscripted,
+        "php_unmatched": state.php_unmatched,
+        "wall_s": round(wall, 1),
+    }
+    summary = {"recorded": recording.summary(), "replay": replayed}
+    _print_side_by_side("grabado", summary["recorded"], "replay", replayed)
+    print(f"\nErrores: {errors} | pasos LLM sin guion: {state.llm_unscripted} | PHP sin respuesta grabada: {state.php_unmatched}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
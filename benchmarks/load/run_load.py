@@ -0,0 +1,172 @@
+"""
+Prueba de carga end-to-end sin dependencias externas.
+
+Levanta en este proceso los stand-ins de OpenAI (fake_openai.py) y de las APIs PHP
+(fake_php.py), arranca el agente como subproceso apuntando a ellos
+(OPENAI_BASE_URL, API_*_URL), espera /health, corre el driver y muestra:
+
+  - p50 / p95 / p99 / máx de /api/chat, RPS logrado, errores, tokens/s
+  - promedio por fase (citas_request_phase_duration_seconds)
+  - llamadas recibidas por los fakes (completions y codOpe)
+
+Así cada cambio de rendimiento se puede medir de forma reproducible antes de
+desplegar. Sin REDIS_URL el agente usa InMemorySaver (como en local).
+
+Uso (desde la raíz del repo):
+    python benchmarks/load/run_load.py --rps 5 --duration 60
+    python benchmarks/load/run_load.py --rps 20 --duration 120 --llm-latency-ms 800 --json antes.json
+    python benchmarks/load/run_load.py --agent-env MAX_CONCURRENT_AGENT=200 ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import driver  # noqa: E402
+import fake_openai  # noqa: E402
+import fake_php  # noqa: E402
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def serve_in_thread(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name=f"fake-{port}", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def wait_healthy(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"El agente terminó al arrancar (exit code {process.returncode})")
+        try:
+            if httpx.get(f"{url}/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"El agente no respondió /health en {timeout:.0f}s")
+
+
+def start_agent(
+    port: int,
+    openai_base_url: str,
+    php_base_url: str,
+    extra_env: list[str],
+    log: Any,
+) -> subprocess.Popen:
+    """Arranca el agente (uvicorn) como subproceso apuntando a los stand-ins."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(_REPO_ROOT / "src"),
+        "OPENAI_BASE_URL": openai_base_url,
+        "API_INFORMACION_URL": f"{php_base_url}/ws_informacion_ia.php",
+        "API_AGENDAR_REUNION_URL": f"{php_base_url}/ws_agendar_reunion.php",
+        "API_CALENDAR_URL": f"{php_base_url}/ws_calendario.php",
+        "API_PREGUNTAS_FRECUENTES_URL": f"{php_base_url}/ws_preguntas_frecuentes.php",
+        "INTERNAL_API_TOKEN": "",
+        "REDIS_URL": "",
+        "CONVERSATION_RECORD_FILE": "",
+        "LOG_LEVEL": "WARNING",
+    }
+    for item in extra_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "citas.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=_REPO_ROOT, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def stop_agent(agent: subprocess.Popen) -> None:
+    agent.terminate()
+    try:
+        agent.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        agent.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--empresas", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--agent-port", type=int, default=8102)
+    parser.add_argument("--openai-port", type=int, default=9100)
+    parser.add_argument("--php-port", type=int, default=9200)
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--llm-jitter-ms", type=float, default=150)
+    parser.add_argument("--php-latency-ms", type=float, default=60)
+    parser.add_argument("--php-jitter-ms", type=float, default=20)
+    parser.add_argument("--productos", type=int, default=200)
+    parser.add_argument("--faqs", type=int, default=50)
+    parser.add_argument("--desc-chars", type=int, default=1500)
+    parser.add_argument("--php-no-multi-op", action="store_true", help="El PHP simulado no soporta MULTI_OPERACION")
+    parser.add_argument("--agent-env", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="Variable extra para el agente (repetible)")
+    parser.add_argument("--agent-log", default=None, help="Archivo para stdout/stderr del agente")
+    parser.add_argument("--json", default=None, help="Guardar el resumen en este archivo")
+    args = parser.parse_args()
+
+    openai_state = fake_openai.FakeOpenAIState(args.llm_latency_ms, args.llm_jitter_ms)
+    php_state = fake_php.FakePHPState(
+        args.php_latency_ms, args.php_jitter_ms, args.productos, args.faqs, args.desc_chars,
+        multi_op=not args.php_no_multi_op,
+    )
+    servers = [
+        serve_in_thread(fake_openai.create_app(openai_state), args.openai_port),
+        serve_in_thread(fake_php.create_app(php_state), args.php_port),
+    ]
+
+    agent_url = f"http://127.0.0.1:{args.agent_port}"
+    log = open(args.agent_log, "w") if args.agent_log else subprocess.DEVNULL
+    agent = start_agent(
+        args.agent_port, f"http://127.0.0.1:{args.openai_port}/v1",
+        f"http://127.0.0.1:{args.php_port}", args.agent_env, log,
+    )
+    try:
+        wait_healthy(agent_url, agent, timeout=60)
+        print(f"Carga: {args.rps} RPS durante {args.duration:.0f}s contra {agent_url}")
+        result = asyncio.run(driver.run_load(
+            agent_url, args.rps, args.duration, empresas=args.empresas, seed=args.seed,
+        ))
+    finally:
+        stop_agent(agent)
+        for server in servers:
+            server.should_exit = True
+        if log is not subprocess.DEVNULL:
+            log.close()
+
+    summary = result.summary()
+    summary["fakes"] = {
+        "openai_requests": openai_state.requests,
+        "php_calls": dict(php_state.calls),
+    }
+    driver.print_summary(summary)
+    print(f"OpenAI fake: {openai_state.requests} completions | PHP fake: {dict(php_state.calls)}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
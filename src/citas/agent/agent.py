@@ -14,10 +14,13 @@ from .runtime import (
     get_model, get_checkpointer,
     get_cached_agent, cache_agent, agent_cache_size,
     acquire_agent_lock, release_agent_lock, acquire_session_lock,
-    message_window,
+    message_window, model_call_timer, tool_call_recorder,
 )
 from ..tools.tools import AGENT_TOOLS
+from ..infra import run_cpu_bound
 from ..logger import get_logger
+from ..timing import track_phase, timed_acquire
+from ..tracing import start_span
 from ..metrics import track_chat_response, track_llm_call, record_chat_error, CHAT_REQUESTS, AGENT_CACHE, update_cache_stats, record_token_usage
 from .prompts import build_citas_system_prompt
 from .content import CitaStructuredResponse, _build_content
@@ -55,13 +58,18 @@ async def _build_agent_for_empresa(id_empresa: int, api_key: str, config: CitasC
     """
     logger.info("[AGENT] Construyendo agente para id_empresa=%s", id_empresa)
     system_prompt = await build_citas_system_prompt(id_empresa=id_empresa, config=config)
-    agent = create_agent(
+    middleware = [message_window, model_call_timer]
+    if app_config.CONVERSATION_RECORD_FILE:
+        middleware.append(tool_call_recorder)
+    # Compilar el grafo es CPU puro: fuera del loop para no frenar otras conversaciones
+    agent = await run_cpu_bound(
+        create_agent,
         model=get_model(api_key),
         tools=AGENT_TOOLS,
         system_prompt=system_prompt,
         checkpointer=get_checkpointer(),
         response_format=CitaStructuredResponse,
-        middleware=[message_window],
+        middleware=middleware,
     )
     logger.info(
         "[AGENT] Agente listo para id_empresa=%s (tools=%s, TTL=%s min)",
@@ -82,7 +90,8 @@ async def _get_agent(id_empresa: int, api_key: str, config: CitasConfig | None):
     cache_key: tuple = (id_empresa, _key_hash)
 
     # Fast path — sin lock
-    cached = get_cached_agent(cache_key)
+    with track_phase("agent_lookup"):
+        cached = get_cached_agent(cache_key)
     if cached is not None:
         AGENT_CACHE.labels(result="hit").inc()
         update_cache_stats("agent", agent_cache_size())
@@ -103,7 +112,8 @@ async def _get_agent(id_empresa: int, api_key: str, config: CitasConfig | None):
                 return cached
 
             AGENT_CACHE.labels(result="miss").inc()
-            agent = await _build_agent_for_empresa(id_empresa, api_key, config)
+            with track_phase("agent_build"):
+                agent = await _build_agent_for_empresa(id_empresa, api_key, config)
             cache_agent(cache_key, agent)
             update_cache_stats("agent", agent_cache_size())
             return agent
@@ -162,7 +172,7 @@ async def process_cita_message(
     CHAT_REQUESTS.labels(empresa_id=_empresa_id).inc()
 
     # Backpressure: limitar invocaciones concurrentes al agente (OpenAI + tools)
-    async with _semaphore:
+    async with timed_acquire(_semaphore, "semaphore_wait"):
         try:
             agent = await _get_agent(id_empresa, api_key, config)
         except Exception as e:
@@ -178,10 +188,12 @@ async def process_cita_message(
 
         try:
             with track_chat_response():
-                async with session_lock:
+                async with timed_acquire(session_lock, "session_lock_wait"):
                     logger.debug("[AGENT] Invocando agent - Session: %s, Message: %s...", session_id, message[:100])
 
-                    with track_llm_call():
+                    with track_llm_call(), start_span(
+                        "agent.invoke", session_id=session_id, id_empresa=id_empresa,
+                    ):
                         result = await agent.ainvoke(
                             {"messages": [{"role": "user", "content": _build_content(message)}]},
                             config=run_config,
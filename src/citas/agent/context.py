@@ -1,17 +1,25 @@
 """
 Modelo de contexto runtime y función de preparación.
+
+AgentContext es inmutable (frozen, slots): se arma una vez por
+(id_empresa, session_id, huella de config) y se reutiliza desde un LRU en los
+turnos siguientes de la misma conversación. La huella viene de CitasConfig
+(ver schemas.ChatRequest); si cambia la config del gateway, cambia la clave.
 """
 
 from dataclasses import dataclass, fields as dc_fields
-from typing import Any
 
+from cachetools import LRUCache
+
+from .. import config as app_config
 from ..logger import get_logger
+from ..metrics import AGENT_CONTEXT_CACHE
 from ..schemas import CitasConfig
 
 logger = get_logger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AgentContext:
     """
     Esquema de contexto runtime para el agente.
@@ -27,12 +35,31 @@ class AgentContext:
     session_id: int = 0
 
 
+_AGENT_FIELDS = frozenset(f.name for f in dc_fields(AgentContext)) - {"id_empresa", "session_id"}
+
+_context_cache: LRUCache | None = (
+    LRUCache(maxsize=app_config.AGENT_CONTEXT_CACHE_MAXSIZE)
+    if app_config.AGENT_CONTEXT_CACHE_MAXSIZE > 0
+    else None
+)
+_context_cache_hit = AGENT_CONTEXT_CACHE.labels(result="hit")
+_context_cache_miss = AGENT_CONTEXT_CACHE.labels(result="miss")
+
+
+def _build_agent_context(id_empresa: int, config: CitasConfig | None, session_id: int) -> AgentContext:
+    if not config:
+        return AgentContext(id_empresa=id_empresa, session_id=session_id)
+    params = {k: v for k, v in config.as_dict().items() if k in _AGENT_FIELDS}
+    return AgentContext(id_empresa=id_empresa, session_id=session_id, **params)
+
+
 def _prepare_agent_context(id_empresa: int, config: CitasConfig | None, session_id: int) -> AgentContext:
     """
     Prepara el contexto runtime para inyectar a las tools del agente.
 
     Los validators de CitasConfig ya normalizaron bool→int, str→int, strip, etc.
     Solo se incluyen campos con valor no-None; el resto queda con el default del dataclass.
+    Si la config trae huella, el resultado se reutiliza por (id_empresa, session_id, huella).
 
     Args:
         id_empresa: ID de la empresa (tenant key).
@@ -40,17 +67,18 @@ def _prepare_agent_context(id_empresa: int, config: CitasConfig | None, session_
         session_id: ID de sesión (int, unificado con orquestador).
 
     Returns:
-        AgentContext configurado.
+        AgentContext configurado (inmutable, puede ser compartido entre turnos).
     """
-    params: dict[str, Any] = {
-        "id_empresa": id_empresa,
-        "session_id": session_id,
-    }
-
-    if config:
-        agent_fields = {f.name for f in dc_fields(AgentContext)}
-        for k, v in config.model_dump(exclude_none=True).items():
-            if k in agent_fields:
-                params[k] = v
-
-    return AgentContext(**params)
+    fingerprint = config.fingerprint if config else ""
+    if _context_cache is None or fingerprint is None:
+        return _build_agent_context(id_empresa, config, session_id)
+
+    key = (id_empresa, session_id, fingerprint)
+    cached = _context_cache.get(key)
+    if cached is not None:
+        _context_cache_hit.inc()
+        return cached
+    _context_cache_miss.inc()
+    context = _build_agent_context(id_empresa, config, session_id)
+    _context_cache[key] = context
+    return context
@@ -10,6 +10,7 @@ from zoneinfo import ZoneInfo
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from ... import config as app_config
+from ...infra import run_cpu_bound
 from ...logger import get_logger
 from ...schemas import CitasConfig
 from ...services.prompt_data import fetch_contexto_negocio, fetch_funciones_especiales, fetch_horario_reuniones, fetch_nombres_productos_servicios, format_nombres_para_prompt, fetch_preguntas_frecuentes
@@ -51,7 +52,7 @@ async def build_citas_system_prompt(
     Returns:
         System prompt renderizado.
     """
-    variables = config.model_dump(exclude_none=True) if config else {}
+    variables = dict(config.as_dict()) if config else {}
     variables["id_empresa"] = id_empresa
     variables["archivo_saludo"] = ((config.archivo_saludo or "") if config else "").strip()
 
@@ -105,7 +106,7 @@ async def build_citas_system_prompt(
     variables["preguntas_frecuentes"] = preguntas_frecuentes_str or ""
     variables["instrucciones_especiales"] = instrucciones_especiales
 
-    return _citas_template.render(**variables)
+    return await run_cpu_bound(_citas_template.render, **variables)
 
 
 __all__ = ["build_citas_system_prompt"]
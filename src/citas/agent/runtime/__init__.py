@@ -10,7 +10,7 @@ from ._cache import (
     release_agent_lock,
     acquire_session_lock,
 )
-from .middleware import message_window
+from .middleware import message_window, model_call_timer, tool_call_recorder
 
 __all__ = [
     "get_model",
@@ -25,4 +25,6 @@ __all__ = [
     "release_agent_lock",
     "acquire_session_lock",
     "message_window",
+    "model_call_timer",
+    "tool_call_recorder",
 ]
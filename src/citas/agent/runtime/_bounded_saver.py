@@ -0,0 +1,251 @@
+"""
+InMemorySaver acotado para el modo sin Redis (REDIS_URL vacío).
+
+InMemorySaver nunca libera memoria: cada sesión vista queda en RAM hasta reiniciar
+el proceso. BoundedInMemorySaver agrega, por thread_id:
+  - Contabilidad de bytes serializados (checkpoints + metadata + blobs + writes)
+  - Orden LRU por último acceso (get/put/put_writes)
+  - TTL por inactividad (MEMORY_CHECKPOINT_TTL_HOURS, 0 = sin TTL)
+  - Techo de threads (MEMORY_CHECKPOINT_MAX_THREADS) y de memoria (MEMORY_CHECKPOINT_MAX_MB)
+
+Al superar un límite se evictan threads completos (nunca checkpoints sueltos de un
+thread activo), empezando por el menos usado. El thread que se está escribiendo
+no se evicta aunque por sí solo supere el techo.
+
+Drop-in de InMemorySaver: misma API, mismo serde. Solo se usa en el fallback de
+init_checkpointer() (_llm.py).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+
+from ...logger import get_logger
+from ...metrics import record_checkpoint_eviction, update_checkpoint_memory_stats
+
+logger = get_logger(__name__)
+
+
+class _ThreadUsage:
+    """Bytes y keys internas de un thread. Permite evictar en O(thread) sin barrer todo."""
+
+    __slots__ = ("nbytes", "last_access", "blob_keys", "write_keys")
+
+    def __init__(self, now: float):
+        self.nbytes = 0
+        self.last_access = now
+        self.blob_keys: set[tuple] = set()
+        self.write_keys: set[tuple] = set()
+
+
+class BoundedInMemorySaver(InMemorySaver):
+    """
+    InMemorySaver con eviction LRU/TTL por thread y techo de memoria.
+
+    Los límites se aplican después de cada escritura (put / put_writes); el TTL
+    también se revisa en lecturas para no devolver una conversación expirada.
+    """
+
+    def __init__(
+        self,
+        *,
+        serde: SerializerProtocol | None = None,
+        max_threads: int = 5000,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: float = 0,
+    ) -> None:
+        """
+        Args:
+            serde: Serializer (mismo que InMemorySaver).
+            max_threads: Máximo de threads (sesiones) retenidos.
+            max_bytes: Techo de bytes serializados sumando todos los threads.
+            ttl_seconds: Segundos de inactividad antes de expirar un thread. 0 = sin TTL.
+        """
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._usage: OrderedDict[str, _ThreadUsage] = OrderedDict()
+        self._total_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Contabilidad
+    # ------------------------------------------------------------------
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes serializados retenidos entre todos los threads."""
+        return self._total_bytes
+
+    @property
+    def thread_count(self) -> int:
+        """Cantidad de threads retenidos."""
+        return len(self._usage)
+
+    def _touch(self, thread_id: str) -> _ThreadUsage:
+        """Marca el thread como recién usado (lo mueve al final del LRU)."""
+        now = time.monotonic()
+        usage = self._usage.get(thread_id)
+        if usage is None:
+            usage = self._usage[thread_id] = _ThreadUsage(now)
+        else:
+            usage.last_access = now
+            self._usage.move_to_end(thread_id)
+        return usage
+
+    def _add_bytes(self, usage: _ThreadUsage, nbytes: int) -> None:
+        usage.nbytes += nbytes
+        self._total_bytes += nbytes
+
+    def _is_expired(self, usage: _ThreadUsage, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - usage.last_access > self.ttl_seconds
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _evict(self, thread_id: str, reason: str) -> None:
+        """Elimina un thread completo y actualiza la contabilidad."""
+        usage = self._usage.get(thread_id)
+        self._delete_thread_data(thread_id, usage)
+        record_checkpoint_eviction(reason)
+        logger.debug(
+            "[CHECKPOINT] Thread evictado (%s) thread_id=%s, %s bytes",
+            reason, thread_id, usage.nbytes if usage else 0,
+        )
+
+    def _enforce_limits(self, current_thread_id: str) -> None:
+        """
+        Aplica TTL, techo de threads y techo de memoria, en ese orden.
+        El LRU está ordenado por último acceso: los candidatos siempre están al inicio.
+        """
+        now = time.monotonic()
+        for thread_id in list(self._usage.keys()):
+            if thread_id == current_thread_id:
+                continue
+            usage = self._usage[thread_id]
+            if self._is_expired(usage, now):
+                self._evict(thread_id, "ttl")
+                continue
+            if len(self._usage) > self.max_threads:
+                self._evict(thread_id, "max_threads")
+                continue
+            if self._total_bytes > self.max_bytes:
+                self._evict(thread_id, "max_bytes")
+                continue
+            # Ni expirado ni sobre límites: los siguientes son más recientes
+            break
+        update_checkpoint_memory_stats(len(self._usage), self._total_bytes)
+
+    def _delete_thread_data(self, thread_id: str, usage: _ThreadUsage | None) -> None:
+        """Borra storage/writes/blobs de un thread usando el índice de keys."""
+        self.storage.pop(thread_id, None)
+        if usage is None:
+            # Thread no contabilizado (no debería ocurrir): barrido completo
+            super().delete_thread(thread_id)
+            return
+        for key in usage.write_keys:
+            self.writes.pop(key, None)
+        for key in usage.blob_keys:
+            self.blobs.pop(key, None)
+        self._total_bytes -= usage.nbytes
+        del self._usage[thread_id]
+
+    # ------------------------------------------------------------------
+    # API BaseCheckpointSaver
+    # ------------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        usage = self._usage.get(thread_id)
+        if usage is not None:
+            if self._is_expired(usage, time.monotonic()):
+                self._evict(thread_id, "ttl")
+                update_checkpoint_memory_stats(len(self._usage), self._total_bytes)
+                return None
+            self._touch(thread_id)
+        result = super().get_tuple(config)
+        # InMemorySaver.get_tuple crea entradas vacías en storage/writes (defaultdict):
+        # indexarlas para que la eviction también las libere.
+        if usage is None:
+            if not any(self.storage.get(thread_id, {}).values()):
+                self.storage.pop(thread_id, None)
+        elif result is not None:
+            cfg = result.config["configurable"]
+            usage.write_keys.add((thread_id, cfg.get("checkpoint_ns", ""), cfg["checkpoint_id"]))
+        return result
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        # Re-put del mismo checkpoint_id: InMemorySaver reemplaza la entrada, descontarla
+        previous = self.storage.get(thread_id, {}).get(checkpoint_ns, {}).get(checkpoint["id"])
+        result = super().put(config, checkpoint, metadata, new_versions)
+        usage = self._touch(thread_id)
+
+        nbytes = 0
+        if previous is not None:
+            nbytes -= len(previous[0][1]) + len(previous[1][1])
+        for channel, version in new_versions.items():
+            key = (thread_id, checkpoint_ns, channel, version)
+            if key not in usage.blob_keys:
+                usage.blob_keys.add(key)
+                nbytes += len(self.blobs[key][1])
+        saved_checkpoint, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+        nbytes += len(saved_checkpoint[1]) + len(saved_metadata[1])
+        self._add_bytes(usage, nbytes)
+
+        self._enforce_limits(thread_id)
+        return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        outer_key = (thread_id, checkpoint_ns, config["configurable"]["checkpoint_id"])
+        before = dict(self.writes.get(outer_key) or {})
+
+        super().put_writes(config, writes, task_id, task_path)
+
+        usage = self._touch(thread_id)
+        usage.write_keys.add(outer_key)
+        nbytes = 0
+        for inner_key, value in self.writes.get(outer_key, {}).items():
+            previous = before.get(inner_key)
+            if previous is value:
+                continue
+            nbytes += len(value[2][1])
+            if previous is not None:
+                nbytes -= len(previous[2][1])
+        self._add_bytes(usage, nbytes)
+
+        self._enforce_limits(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        usage = self._usage.get(thread_id)
+        if usage is None:
+            super().delete_thread(thread_id)
+            return
+        self._delete_thread_data(thread_id, usage)
+        update_checkpoint_memory_stats(len(self._usage), self._total_bytes)
+
+
+__all__ = ["BoundedInMemorySaver"]
@@ -0,0 +1,150 @@
+"""
+Base para wrappers de checkpointer (HotThreadCacheSaver, InstrumentedCheckpointSaver).
+
+DelegatingCheckpointSaver reenvía toda la API de BaseCheckpointSaver al saver
+envuelto (`inner`). Las subclases sobreescriben solo los métodos que les interesan.
+"""
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Collection, Iterator, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+
+class DelegatingCheckpointSaver(BaseCheckpointSaver):
+    """Wrapper transparente sobre otro BaseCheckpointSaver."""
+
+    def __init__(self, inner: BaseCheckpointSaver) -> None:
+        super().__init__(serde=inner.serde)
+        self.inner = inner
+
+    def _rewrap(self, inner: BaseCheckpointSaver) -> DelegatingCheckpointSaver:
+        """Clon superficial con otro `inner` (comparte el estado del wrapper)."""
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone.inner = inner
+        clone.serde = inner.serde
+        return clone
+
+    # ------------------------------------------------------------------
+    # Async
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await self.inner.aget_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        async for item in self.inner.alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self.inner.aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self.inner.aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.inner.adelete_thread(thread_id)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self.inner.get_tuple(config)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        return self.inner.list(config, filter=filter, before=before, limit=limit)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.inner.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.inner.put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.inner.delete_thread(thread_id)
+
+    # ------------------------------------------------------------------
+    # Resto de la API
+    # ------------------------------------------------------------------
+
+    def get_next_version(self, current: Any, channel: None) -> Any:
+        return self.inner.get_next_version(current, channel)
+
+    @property
+    def config_specs(self) -> list:
+        return self.inner.config_specs
+
+    def with_allowlist(self, extra_allowlist: Collection[tuple[str, ...]]) -> BaseCheckpointSaver:
+        inner = self.inner.with_allowlist(extra_allowlist)
+        if inner is self.inner:
+            return self
+        return self._rewrap(inner)
+
+    def __getattr__(self, name: str) -> Any:
+        # asetup, aprune, _redis, total_bytes, etc. Guard: durante copy `inner` aún no existe
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> Any:
+        if hasattr(self.inner, "__aexit__"):
+            return await self.inner.__aexit__(exc_type, exc, tb)
+        return None
+
+
+def innermost_saver(saver: BaseCheckpointSaver) -> BaseCheckpointSaver:
+    """Saver real (Redis o memoria) debajo de cualquier cadena de wrappers."""
+    while isinstance(saver, DelegatingCheckpointSaver):
+        saver = saver.inner
+    return saver
+
+
+__all__ = ["DelegatingCheckpointSaver", "innermost_saver"]
@@ -0,0 +1,262 @@
+"""
+Cache local (por proceso) del último checkpoint de cada thread, delante de AsyncRedisSaver.
+
+Cada agent.ainvoke lee el último checkpoint del thread: puntero checkpoint_latest,
+JSON.GET del checkpoint, FT.SEARCH de pending writes y deserialización completa —
+aunque este mismo proceso haya escrito ese checkpoint segundos antes.
+
+HotThreadCacheSaver envuelve al saver Redis:
+  - Write-through: aput/aput_writes escriben en Redis y guardan el CheckpointTuple
+    resultante en un LRU local (REDIS_CHECKPOINT_HOT_CACHE_THREADS).
+  - Read-through con chequeo de versión: en aget_tuple sin checkpoint_id se hace un
+    solo round trip con GET del puntero checkpoint_latest:{thread}:{ns} y ZCARD del
+    registro de pending writes de ese checkpoint. Si el puntero apunta al checkpoint
+    cacheado y la cantidad de writes coincide, se devuelve el tuple local (hit); si
+    otra réplica escribió un checkpoint más nuevo o agregó writes al mismo, se
+    descarta (stale) y se lee de Redis como siempre.
+  - Cada hit devuelve copias (checkpoint, metadata y valores de los writes): lo que
+    un run modifique no se filtra al siguiente.
+
+Todo lo demás (alist, lecturas por checkpoint_id, borrados) se delega al saver Redis;
+adelete_thread también invalida la entrada local.
+"""
+
+from __future__ import annotations
+
+import copy
+from collections import OrderedDict
+from typing import Any, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    copy_checkpoint,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.redis.util import (
+    safely_decode,
+    to_storage_safe_id,
+    to_storage_safe_str,
+)
+
+from ...logger import get_logger
+from ...metrics import record_checkpoint_hot_cache, update_cache_stats
+from ._delegating_saver import DelegatingCheckpointSaver
+
+logger = get_logger(__name__)
+
+
+class _HotEntry:
+    """Último checkpoint conocido de un (thread, ns) y sus pending writes."""
+
+    __slots__ = ("checkpoint_key", "config", "checkpoint", "metadata", "parent_config", "writes")
+
+    def __init__(
+        self,
+        checkpoint_key: str,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        parent_config: RunnableConfig | None,
+    ):
+        self.checkpoint_key = checkpoint_key
+        self.config = config
+        self.checkpoint = checkpoint
+        self.metadata = metadata
+        self.parent_config = parent_config
+        # (task_id, idx) → (task_id, channel, value); misma semántica que put_writes
+        self.writes: dict[tuple[str, int], tuple[str, str, Any]] = {}
+
+    def to_tuple(self) -> CheckpointTuple:
+        return CheckpointTuple(
+            config=self.config,
+            checkpoint=copy_checkpoint(self.checkpoint),
+            metadata=copy.deepcopy(self.metadata),
+            parent_config=self.parent_config,
+            pending_writes=copy.deepcopy(list(self.writes.values())),
+        )
+
+
+class HotThreadCacheSaver(DelegatingCheckpointSaver):
+    """
+    Wrapper write-through sobre AsyncRedisSaver con LRU de threads recientes.
+
+    El saver envuelto debe exponer el cliente `_redis`, `_make_redis_checkpoint_key`
+    y el registro de writes `_key_registry` (AsyncRedisSaver y CompactAsyncRedisSaver,
+    después de asetup). Sin registro no se puede verificar los writes y todo es miss.
+    """
+
+    def __init__(self, inner: BaseCheckpointSaver, *, max_threads: int = 1000) -> None:
+        super().__init__(inner)
+        self.max_threads = max_threads
+        self._entries: OrderedDict[tuple[str, str], _HotEntry] = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # LRU
+    # ------------------------------------------------------------------
+
+    def _checkpoint_key(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+        return self.inner._make_redis_checkpoint_key(thread_id, checkpoint_ns, checkpoint_id)
+
+    def _store(self, key: tuple[str, str], entry: _HotEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_threads:
+            self._entries.popitem(last=False)
+        update_cache_stats("checkpoint_hot", len(self._entries))
+
+    def _invalidate_thread(self, thread_id: str) -> None:
+        for key in [k for k in self._entries if k[0] == thread_id]:
+            del self._entries[key]
+        update_cache_stats("checkpoint_hot", len(self._entries))
+
+    # ------------------------------------------------------------------
+    # Lectura con chequeo de versión
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        if get_checkpoint_id(config):
+            return await self.inner.aget_tuple(config)
+
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        key = (thread_id, checkpoint_ns)
+        entry = self._entries.get(key)
+        registry = self.inner._key_registry
+        if entry is not None and registry is not None:
+            pointer_key = (
+                f"checkpoint_latest:{to_storage_safe_id(thread_id)}:"
+                f"{to_storage_safe_str(checkpoint_ns)}"
+            )
+            writes_key = registry.make_write_keys_zset_key(
+                thread_id, checkpoint_ns, entry.config["configurable"]["checkpoint_id"]
+            )
+            pipeline = self.inner._redis.pipeline(transaction=False)
+            pipeline.get(pointer_key)
+            pipeline.zcard(writes_key)
+            latest, writes_count = await pipeline.execute()
+            if safely_decode(latest) == entry.checkpoint_key and writes_count == len(entry.writes):
+                self._entries.move_to_end(key)
+                record_checkpoint_hot_cache("hit")
+                return entry.to_tuple()
+            # Otra réplica escribió un checkpoint más nuevo, agregó writes o expiró en Redis
+            del self._entries[key]
+            record_checkpoint_hot_cache("stale")
+        else:
+            record_checkpoint_hot_cache("miss")
+
+        result = await self.inner.aget_tuple(config)
+        if result is not None:
+            cfg = result.config["configurable"]
+            loaded = _HotEntry(
+                self._checkpoint_key(thread_id, checkpoint_ns, cfg["checkpoint_id"]),
+                result.config,
+                result.checkpoint,
+                result.metadata,
+                result.parent_config,
+            )
+            # Mismas claves que aput_writes: (task_id, WRITES_IDX_MAP o posición en la tarea)
+            task_idx: dict[str, int] = {}
+            for task_id, channel, value in result.pending_writes or []:
+                idx = task_idx.get(task_id, 0)
+                task_idx[task_id] = idx + 1
+                loaded.writes[(task_id, WRITES_IDX_MAP.get(channel, idx))] = (task_id, channel, value)
+            self._store(key, loaded)
+            return loaded.to_tuple()
+        return None
+
+    # ------------------------------------------------------------------
+    # Escritura write-through
+    # ------------------------------------------------------------------
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config = await self.inner.aput(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = next_config["configurable"]["checkpoint_id"]
+        parent_id = config["configurable"].get("checkpoint_id")
+        parent_config: RunnableConfig | None = None
+        if parent_id and parent_id != checkpoint_id:
+            parent_config = {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_id,
+                }
+            }
+        self._store(
+            (thread_id, checkpoint_ns),
+            _HotEntry(
+                self._checkpoint_key(thread_id, checkpoint_ns, checkpoint_id),
+                next_config,
+                copy_checkpoint(checkpoint),
+                copy.deepcopy(metadata),
+                parent_config,
+            ),
+        )
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self.inner.aput_writes(config, writes, task_id, task_path)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        entry = self._entries.get((thread_id, checkpoint_ns))
+        if entry is None or entry.config["configurable"]["checkpoint_id"] != config["configurable"]["checkpoint_id"]:
+            return
+        for idx, (channel, value) in enumerate(writes):
+            inner_key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+            if inner_key[1] >= 0 and inner_key in entry.writes:
+                continue
+            entry.writes[inner_key] = (task_id, channel, copy.deepcopy(value))
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self._invalidate_thread(str(thread_id))
+        await self.inner.adelete_thread(thread_id)
+
+    # ------------------------------------------------------------------
+    # Escrituras sync (no las usa ainvoke): invalidan en vez de cachear
+    # ------------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        self._invalidate_thread(str(config["configurable"]["thread_id"]))
+        return self.inner.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._invalidate_thread(str(config["configurable"]["thread_id"]))
+        self.inner.put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._invalidate_thread(str(thread_id))
+        self.inner.delete_thread(thread_id)
+
+
+__all__ = ["HotThreadCacheSaver"]
@@ -0,0 +1,234 @@
+"""
+Instrumentación del checkpointer: latencia y bytes serializados por operación.
+
+InstrumentedCheckpointSaver envuelve el saver que devuelve get_checkpointer()
+(Redis, con o sin HotThreadCacheSaver, o BoundedInMemorySaver) y registra:
+
+  - citas_checkpoint_op_duration_seconds{op}  get | list | put | put_writes
+  - citas_checkpoint_serialized_bytes{op}     bytes producidos/consumidos por el serde
+
+Los bytes se miden con _MeasuredSerde, instalado sobre el serde del saver real: cada
+dumps_typed/dumps_json_typed/loads_typed suma al acumulador de la operación en curso
+(ContextVar, así las operaciones concurrentes de distintos requests no se mezclan).
+Con CHECKPOINT_SERDE=compact el checkpoint y la metadata van por dumps_json_typed.
+
+En list/alist el acumulador es local al generador y la ContextVar se fija solo
+alrededor de cada paso del iterador interno, nunca a través de un yield: si el
+consumidor corta antes, el cierre del generador puede correr en otro contexto.
+La duración de list suma solo el tiempo dentro del iterador interno.
+
+Un get servido por HotThreadCacheSaver no deserializa nada: se registra con 0 bytes.
+Cada operación cuenta además como fase checkpoint_io del request (timing.py).
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Collection, Iterator, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.serde.base import SerializerProtocol
+
+from ...metrics import CHECKPOINT_OP_DURATION, CHECKPOINT_SERIALIZED_BYTES
+from ...timing import record_phase
+from ._delegating_saver import DelegatingCheckpointSaver, innermost_saver
+
+_bytes_acc: ContextVar[list[int] | None] = ContextVar("checkpoint_bytes_acc", default=None)
+
+
+class _MeasuredSerde:
+    """Proxy del serde que suma los bytes de dumps/loads a la operación en curso."""
+
+    def __init__(self, serde: SerializerProtocol) -> None:
+        self.serde = serde
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        _count(data)
+        return type_, data
+
+    def dumps_json_typed(self, obj: Any) -> tuple[str, bytes]:
+        # Camino JSON del serde compacto: checkpoint y metadata en CompactAsyncRedisSaver
+        type_, data = self.serde.dumps_json_typed(obj)
+        _count(data)
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        _count(data[1])
+        return self.serde.loads_typed(data)
+
+    def __getattr__(self, name: str) -> Any:
+        # _revive_if_needed (Redis), codec (serde compacto), etc.
+        if name == "serde":
+            raise AttributeError(name)
+        return getattr(self.serde, name)
+
+
+def _count(data: bytes) -> None:
+    acc = _bytes_acc.get()
+    if acc is not None and data:
+        acc[0] += len(data)
+
+
+def _observe(op: str, elapsed: float, nbytes: int) -> None:
+    CHECKPOINT_OP_DURATION.labels(op=op).observe(elapsed)
+    record_phase("checkpoint_io", elapsed, op)
+    CHECKPOINT_SERIALIZED_BYTES.labels(op=op).observe(nbytes)
+
+
+@contextmanager
+def _track(op: str):
+    acc = [0]
+    token = _bytes_acc.set(acc)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _bytes_acc.reset(token)
+        _observe(op, time.perf_counter() - start, acc[0])
+
+
+def _install_measured_serde(saver: BaseCheckpointSaver) -> None:
+    base = innermost_saver(saver)
+    if not isinstance(base.serde, _MeasuredSerde):
+        base.serde = _MeasuredSerde(base.serde)
+
+
+class InstrumentedCheckpointSaver(DelegatingCheckpointSaver):
+    """Wrapper que mide latencia y bytes serializados de cada operación del checkpointer."""
+
+    def __init__(self, inner: BaseCheckpointSaver) -> None:
+        _install_measured_serde(inner)
+        super().__init__(inner)
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        with _track("get"):
+            return await self.inner.aget_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        acc = [0]
+        elapsed = 0.0
+        iterator = self.inner.alist(config, filter=filter, before=before, limit=limit)
+        try:
+            while True:
+                token = _bytes_acc.set(acc)
+                start = time.perf_counter()
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                    _bytes_acc.reset(token)
+                yield item
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            _observe("list", elapsed, acc[0])
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        with _track("put"):
+            return await self.inner.aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with _track("put_writes"):
+            await self.inner.aput_writes(config, writes, task_id, task_path)
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        with _track("get"):
+            return self.inner.get_tuple(config)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        acc = [0]
+        elapsed = 0.0
+        iterator = iter(self.inner.list(config, filter=filter, before=before, limit=limit))
+        try:
+            while True:
+                token = _bytes_acc.set(acc)
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                    _bytes_acc.reset(token)
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            _observe("list", elapsed, acc[0])
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        with _track("put"):
+            return self.inner.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with _track("put_writes"):
+            self.inner.put_writes(config, writes, task_id, task_path)
+
+    def with_allowlist(self, extra_allowlist: Collection[tuple[str, ...]]) -> BaseCheckpointSaver:
+        # El allowlist se aplica sobre el serde real (JsonPlusSerializer), no sobre el proxy
+        base = innermost_saver(self.inner)
+        measured = base.serde
+        base.serde = measured.serde
+        try:
+            inner = self.inner.with_allowlist(extra_allowlist)
+        finally:
+            base.serde = measured
+        if inner is self.inner:
+            return self
+        _install_measured_serde(inner)
+        return self._rewrap(inner)
+
+
+__all__ = ["InstrumentedCheckpointSaver"]
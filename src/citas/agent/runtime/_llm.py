@@ -10,11 +10,14 @@ from __future__ import annotations
 from typing import Any
 
 from langchain.chat_models import init_chat_model
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 
 from ... import config as app_config
 from ...logger import get_logger
+from ._bounded_saver import BoundedInMemorySaver
+from ._delegating_saver import innermost_saver
+from ._instrumented_saver import InstrumentedCheckpointSaver
+from ._serde import CompactCheckpointSerializer
 
 logger = get_logger(__name__)
 
@@ -24,13 +27,35 @@ logger = get_logger(__name__)
 
 _checkpointer: Any = None
 
+_ALLOWED_JSON_MODULES = [("citas", "agent", "content", "CitaStructuredResponse")]
+_ALLOWED_MSGPACK_MODULES = [("citas.agent.content", "CitaStructuredResponse")]
 
-def _make_memory_saver() -> InMemorySaver:
-    """Crea InMemorySaver con allowlist para CitaStructuredResponse (path msgpack)."""
-    return InMemorySaver(
-        serde=JsonPlusSerializer(
-            allowed_msgpack_modules=[("citas.agent.content", "CitaStructuredResponse")]
-        )
+
+def _make_compact_serde() -> CompactCheckpointSerializer:
+    """Serializer msgpack + compresión (CHECKPOINT_SERDE=compact) con las mismas allowlists."""
+    return CompactCheckpointSerializer(
+        codec=app_config.CHECKPOINT_COMPRESSION,
+        min_size=app_config.CHECKPOINT_COMPRESSION_MIN_BYTES,
+        allowed_json_modules=_ALLOWED_JSON_MODULES,
+        allowed_msgpack_modules=_ALLOWED_MSGPACK_MODULES,
+    )
+
+
+def _make_memory_saver() -> BoundedInMemorySaver:
+    """
+    Crea el checkpointer en memoria con allowlist para CitaStructuredResponse (path msgpack).
+    Acotado por MEMORY_CHECKPOINT_MAX_THREADS / _MAX_MB / _TTL_HOURS (LRU + TTL por thread).
+    Con CHECKPOINT_SERDE=compact los blobs se comprimen (más threads dentro del mismo techo).
+    """
+    if app_config.CHECKPOINT_SERDE == "compact":
+        serde = _make_compact_serde()
+    else:
+        serde = JsonPlusSerializer(allowed_msgpack_modules=_ALLOWED_MSGPACK_MODULES)
+    return BoundedInMemorySaver(
+        serde=serde,
+        max_threads=app_config.MEMORY_CHECKPOINT_MAX_THREADS,
+        max_bytes=app_config.MEMORY_CHECKPOINT_MAX_MB * 1024 * 1024,
+        ttl_seconds=app_config.MEMORY_CHECKPOINT_TTL_HOURS * 3600,
     )
 
 
@@ -38,50 +63,99 @@ async def init_checkpointer() -> None:
     """
     Inicializa el checkpointer LangGraph.
 
-    Si REDIS_URL está configurado, intenta AsyncRedisSaver con serialización
-    JSON (JsonPlusRedisSerializer). Si Redis no está disponible o el paquete
-    no está instalado, cae a InMemorySaver como fallback.
+    Si REDIS_URL está configurado, intenta PipelinedAsyncRedisSaver (AsyncRedisSaver
+    con pool configurable y escrituras en pipeline) con serialización
+    JSON (JsonPlusRedisSerializer), o CompactAsyncRedisSaver (writes en msgpack
+    comprimido) si CHECKPOINT_SERDE=compact, envuelto en HotThreadCacheSaver
+    (REDIS_CHECKPOINT_HOT_CACHE_THREADS > 0). Si Redis no está disponible o el paquete
+    no está instalado, cae a BoundedInMemorySaver (InMemorySaver con LRU/TTL) como fallback.
+
+    El saver resultante siempre queda envuelto en InstrumentedCheckpointSaver
+    (latencia y bytes por operación).
 
     Debe llamarse una sola vez al arrancar la app (FastAPI lifespan).
     """
     global _checkpointer
 
     if not app_config.REDIS_URL:
-        _checkpointer = _make_memory_saver()
-        logger.info("[LLM] Checkpointer: InMemorySaver (REDIS_URL vacío)")
+        _checkpointer = InstrumentedCheckpointSaver(_make_memory_saver())
+        logger.info(
+            "[LLM] Checkpointer: BoundedInMemorySaver (REDIS_URL vacío, max_threads=%s, max_mb=%s)",
+            app_config.MEMORY_CHECKPOINT_MAX_THREADS, app_config.MEMORY_CHECKPOINT_MAX_MB,
+        )
         return
 
     try:
-        from langgraph.checkpoint.redis.aio import AsyncRedisSaver
         from langgraph.checkpoint.redis.jsonplus_redis import (
             JsonPlusRedisSerializer,
         )
 
+        from ._redis_saver import (
+            CompactAsyncRedisSaver,
+            PipelinedAsyncRedisSaver,
+            build_redis_client,
+        )
+
         ttl_hours = app_config.REDIS_CHECKPOINT_TTL_HOURS
         ttl_config = {"default_ttl": ttl_hours * 60} if ttl_hours > 0 else None
 
-        saver = AsyncRedisSaver(redis_url=app_config.REDIS_URL, ttl=ttl_config)
-        saver.serde = JsonPlusRedisSerializer(
-            allowed_json_modules=[
-                ("citas", "agent", "content", "CitaStructuredResponse")
-            ],
-            allowed_msgpack_modules=[
-                ("citas.agent.content", "CitaStructuredResponse")
-            ],
+        redis_client = build_redis_client(
+            app_config.REDIS_URL,
+            max_connections=app_config.REDIS_MAX_CONNECTIONS,
+            pool_timeout=app_config.REDIS_POOL_TIMEOUT,
+            socket_timeout=app_config.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=app_config.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=app_config.REDIS_HEALTH_CHECK_INTERVAL,
         )
+        saver_kwargs: dict[str, Any] = {
+            "ttl": ttl_config,
+            "pipeline_writes": app_config.REDIS_CHECKPOINT_PIPELINE,
+        }
+        if redis_client is not None:
+            saver_kwargs["redis_client"] = redis_client
+        else:
+            # Sentinel: el cliente lo arma langgraph-checkpoint-redis con estos timeouts
+            saver_kwargs["redis_url"] = app_config.REDIS_URL
+            saver_kwargs["connection_args"] = {
+                "socket_timeout": app_config.REDIS_SOCKET_TIMEOUT,
+                "socket_connect_timeout": app_config.REDIS_SOCKET_CONNECT_TIMEOUT,
+                "health_check_interval": app_config.REDIS_HEALTH_CHECK_INTERVAL,
+            }
+
+        if app_config.CHECKPOINT_SERDE == "compact":
+            saver = CompactAsyncRedisSaver(**saver_kwargs)
+            saver.serde = _make_compact_serde()
+            _serde_label = f"compact/{saver.serde.codec}"
+        else:
+            saver = PipelinedAsyncRedisSaver(**saver_kwargs)
+            saver.serde = JsonPlusRedisSerializer(
+                allowed_json_modules=_ALLOWED_JSON_MODULES,
+                allowed_msgpack_modules=_ALLOWED_MSGPACK_MODULES,
+            )
+            _serde_label = "json"
         await saver.asetup()
-        _checkpointer = saver
+        hot_threads = app_config.REDIS_CHECKPOINT_HOT_CACHE_THREADS
+        if hot_threads > 0:
+            from ._hot_cache import HotThreadCacheSaver
+
+            _checkpointer = InstrumentedCheckpointSaver(
+                HotThreadCacheSaver(saver, max_threads=hot_threads)
+            )
+        else:
+            _checkpointer = InstrumentedCheckpointSaver(saver)
         _ttl_label = f"TTL={ttl_hours}h" if ttl_hours > 0 else "sin TTL"
         logger.info(
-            "[LLM] Checkpointer: AsyncRedisSaver (%s, %s)",
-            app_config.REDIS_URL, _ttl_label,
+            "[LLM] Checkpointer: AsyncRedisSaver (%s, %s, serde=%s, hot_cache=%s, "
+            "pool=%s, pipeline=%s)",
+            app_config.REDIS_URL, _ttl_label, _serde_label, hot_threads,
+            app_config.REDIS_MAX_CONNECTIONS, app_config.REDIS_CHECKPOINT_PIPELINE,
         )
 
     except Exception as e:
         logger.warning(
-            "[LLM] No se pudo conectar a Redis (%s) — usando InMemorySaver", e
+            "[LLM] No se pudo conectar a Redis (%s) — usando BoundedInMemorySaver", e
         )
-        _checkpointer = _make_memory_saver()
+        _checkpointer = InstrumentedCheckpointSaver(_make_memory_saver())
 
 
 def get_model(api_key: str):
@@ -100,7 +174,10 @@ def get_model(api_key: str):
 
 
 def get_checkpointer():
-    """Retorna el checkpointer LangGraph singleton (InMemorySaver o AsyncRedisSaver)."""
+    """
+    Retorna el checkpointer LangGraph singleton: BoundedInMemorySaver o AsyncRedisSaver,
+    envuelto en InstrumentedCheckpointSaver.
+    """
     if _checkpointer is None:
         raise RuntimeError(
             "Checkpointer no inicializado. Llamar await init_checkpointer() primero."
@@ -119,7 +196,7 @@ async def close_checkpointer() -> None:
     if _checkpointer is None:
         return
 
-    if hasattr(_checkpointer, "__aexit__"):
+    if hasattr(innermost_saver(_checkpointer), "__aexit__"):
         try:
             await _checkpointer.__aexit__(None, None, None)
             logger.info("[LLM] AsyncRedisSaver cerrado correctamente")
@@ -0,0 +1,371 @@
+"""
+AsyncRedisSaver del agente: cliente con pool configurable, escrituras en pipeline,
+métricas por operación y variante compatible con CompactCheckpointSerializer.
+
+PipelinedAsyncRedisSaver
+    - aput: JSON.SET del checkpoint + SET del puntero checkpoint_latest en un
+      pipeline y los dos EXPIRE en un segundo pipeline best-effort (upstream: 4
+      round trips). Igual que upstream, EXPIRE nunca va en el mismo pipeline que
+      comandos JSON (el proxy de Redis Enterprise puede abortar el pipeline entero).
+    - aput_writes: JSON.SET de cada write + JSON.MERGE has_writes + ZADD en un
+      pipeline, y todos los EXPIRE en un segundo pipeline best-effort (upstream:
+      un EXPIRE por key, uno por round trip).
+    - Métricas citas_redis_checkpoint_* por operación (get_tuple, list, put,
+      put_writes, delete_thread).
+    En modo cluster (o REDIS_CHECKPOINT_PIPELINE=false) delega en la implementación
+    original, que ya maneja keys repartidas en slots distintos.
+
+CompactAsyncRedisSaver
+    langgraph-checkpoint-redis guarda el checkpoint (con channel_values inline) y la
+    metadata como documentos RedisJSON indexados por RediSearch: esas dos partes
+    tienen que seguir siendo JSON. Este saver las serializa con el camino JSON del
+    serde (dumps_json_typed) y deja que los pending writes — el grueso de cada turno:
+    mensajes del LLM, tool calls y structured response — usen msgpack comprimido.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Sequence, cast
+
+import orjson
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+from langgraph.checkpoint.redis.util import to_storage_safe_id, to_storage_safe_str
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from ...logger import get_logger
+from ...metrics import track_redis_checkpoint_op
+from ._serde import CompactCheckpointSerializer
+
+logger = get_logger(__name__)
+
+
+def build_redis_client(
+    redis_url: str,
+    *,
+    max_connections: int,
+    pool_timeout: float,
+    socket_timeout: float,
+    socket_connect_timeout: float,
+    health_check_interval: int,
+) -> Redis | None:
+    """
+    Crea el cliente Redis del checkpointer con BlockingConnectionPool.
+
+    El pool default de redis-py lanza ConnectionError al superar max_connections;
+    el bloqueante espera hasta pool_timeout segundos por una conexión libre, que es
+    lo que queremos con picos de MAX_CONCURRENT_AGENT.
+
+    Retorna None para URLs Sentinel (redis+sentinel://): ahí se deja que
+    langgraph-checkpoint-redis arme el cliente.
+    """
+    if redis_url.startswith("redis+sentinel"):
+        return None
+    pool = BlockingConnectionPool.from_url(
+        redis_url,
+        max_connections=max_connections,
+        timeout=pool_timeout,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=socket_connect_timeout,
+        socket_keepalive=True,
+        health_check_interval=health_check_interval,
+        retry_on_timeout=True,
+    )
+    return Redis(connection_pool=pool)
+
+
+class PipelinedAsyncRedisSaver(AsyncRedisSaver):
+    """AsyncRedisSaver con escrituras en pipeline y métricas por operación."""
+
+    def __init__(
+        self,
+        redis_url: str | None = None,
+        *,
+        redis_client: Redis | None = None,
+        pipeline_writes: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(redis_url, redis_client=redis_client, **kwargs)
+        if redis_client is not None:
+            # El cliente lo creamos nosotros (build_redis_client): __aexit__ debe cerrarlo
+            self._owns_its_client = True
+        self.pipeline_writes = pipeline_writes
+
+    def _ttl_seconds(self) -> int | None:
+        if self.ttl_config and "default_ttl" in self.ttl_config:
+            return int(self.ttl_config["default_ttl"] * 60)
+        return None
+
+    # ------------------------------------------------------------------
+    # Lecturas (solo métricas)
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        with track_redis_checkpoint_op("get_tuple"):
+            return await super().aget_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        with track_redis_checkpoint_op("list"):
+            async for item in super().alist(config, filter=filter, before=before, limit=limit):
+                yield item
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        with track_redis_checkpoint_op("delete_thread"):
+            await super().adelete_thread(thread_id)
+
+    # ------------------------------------------------------------------
+    # Escrituras en pipeline
+    # ------------------------------------------------------------------
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+        stream_mode: str = "values",
+    ) -> RunnableConfig:
+        with track_redis_checkpoint_op("put"):
+            if self.cluster_mode or not self.pipeline_writes:
+                return await super().aput(config, checkpoint, metadata, new_versions, stream_mode)
+            return await self._aput_pipelined(config, checkpoint, metadata, stream_mode)
+
+    async def _aput_pipelined(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        stream_mode: str,
+    ) -> RunnableConfig:
+        """
+        Mismo documento que AsyncRedisSaver.aput: escritura en un round trip y TTL en
+        otro (best-effort). Si se cancela a mitad, guarda el checkpoint marcado como
+        interrumpido antes de propagar la cancelación, igual que upstream.
+        """
+        configurable = config["configurable"].copy()
+        run_id = configurable.pop("run_id", metadata.get("run_id"))
+        thread_id = configurable.pop("thread_id")
+        checkpoint_ns = configurable.pop("checkpoint_ns")
+        config_checkpoint_id = configurable.pop("checkpoint_id", None)
+        thread_ts = configurable.pop("thread_ts", "")
+
+        checkpoint_id = config_checkpoint_id or thread_ts or checkpoint.get("id", "")
+        parent_checkpoint_id = None
+        if checkpoint.get("id") and config_checkpoint_id and checkpoint.get("id") != config_checkpoint_id:
+            parent_checkpoint_id = config_checkpoint_id
+            checkpoint_id = checkpoint["id"]
+
+        storage_safe_thread_id = to_storage_safe_id(thread_id)
+        storage_safe_checkpoint_ns = to_storage_safe_str(checkpoint_ns)
+
+        try:
+            from ulid import ULID
+
+            checkpoint_ts = ULID.from_str(checkpoint_id).timestamp
+        except Exception:
+            checkpoint_ts = time.time() * 1000
+
+        checkpoint_data: dict[str, Any] = {
+            "thread_id": storage_safe_thread_id,
+            "run_id": to_storage_safe_id(run_id) if run_id else "",
+            "checkpoint_ns": storage_safe_checkpoint_ns,
+            "checkpoint_id": to_storage_safe_id(checkpoint_id),
+            "parent_checkpoint_id": (
+                to_storage_safe_id(parent_checkpoint_id) if parent_checkpoint_id else ""
+            ),
+            "checkpoint_ts": checkpoint_ts,
+            "checkpoint": self._dump_checkpoint(checkpoint.copy()),
+            "metadata": self._dump_metadata(metadata),
+            "has_writes": False,
+        }
+        if "source" in metadata and "step" in metadata:
+            checkpoint_data["source"] = metadata["source"]
+            checkpoint_data["step"] = metadata["step"]
+
+        checkpoint_key = self._make_redis_checkpoint_key_cached(thread_id, checkpoint_ns, checkpoint_id)
+        latest_pointer_key = f"checkpoint_latest:{storage_safe_thread_id}:{storage_safe_checkpoint_ns}"
+        ttl_seconds = self._ttl_seconds()
+
+        try:
+            pipeline = self._redis.pipeline(transaction=False)
+            pipeline.json().set(checkpoint_key, "$", checkpoint_data)
+            pipeline.set(latest_pointer_key, checkpoint_key)
+            for result in await pipeline.execute(raise_on_error=False):
+                if isinstance(result, Exception):
+                    raise result
+        except asyncio.CancelledError:
+            if stream_mode in ("values", "messages"):
+                await self._save_interrupted(checkpoint_key, checkpoint_data, checkpoint, metadata, stream_mode)
+            raise
+
+        if ttl_seconds is not None:
+            ttl_keys = (checkpoint_key, latest_pointer_key)
+            ttl_pipeline = self._redis.pipeline(transaction=False)
+            for key in ttl_keys:
+                ttl_pipeline.expire(key, ttl_seconds)
+            for key, result in zip(ttl_keys, await ttl_pipeline.execute(raise_on_error=False)):
+                if isinstance(result, Exception):
+                    logger.warning("[CHECKPOINT] No se pudo aplicar TTL a %s: %s", key, result)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    async def _save_interrupted(
+        self,
+        checkpoint_key: str,
+        checkpoint_data: dict[str, Any],
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        stream_mode: str,
+    ) -> None:
+        """Rama CancelledError de upstream: deja el checkpoint (marcado interrupted) para poder retomar."""
+        try:
+            interrupted = {
+                **checkpoint_data,
+                "parent_checkpoint_id": (
+                    to_storage_safe_id(str(checkpoint.get("parent_checkpoint_id", "")))
+                    if checkpoint.get("parent_checkpoint_id")
+                    else ""
+                ),
+                "metadata": self._dump_metadata({**metadata, "interrupted": True, "stream_mode": stream_mode}),
+            }
+            interrupted.pop("checkpoint_ts", None)
+            interrupted.pop("source", None)
+            interrupted.pop("step", None)
+            pipeline = self._redis.pipeline(transaction=False)
+            pipeline.json().set(checkpoint_key, "$", interrupted)
+            await pipeline.execute()
+        except Exception:
+            # Si esto también falla, solo se propaga la cancelación original
+            pass
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with track_redis_checkpoint_op("put_writes"):
+            if self.cluster_mode or not self.pipeline_writes or not writes:
+                await super().aput_writes(config, writes, task_id, task_path)
+                return
+            await self._aput_writes_pipelined(config, writes, task_id, task_path)
+
+    async def _aput_writes_pipelined(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str,
+    ) -> None:
+        """Mismos documentos que AsyncRedisSaver.aput_writes; TTL en un segundo pipeline."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        pipeline = self._redis.pipeline(transaction=False)
+        created_keys: list[str] = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            write_obj = {
+                "thread_id": to_storage_safe_id(thread_id),
+                "checkpoint_ns": to_storage_safe_str(checkpoint_ns),
+                "checkpoint_id": to_storage_safe_id(checkpoint_id),
+                "task_id": task_id,
+                "task_path": task_path,
+                "idx": write_idx,
+                "channel": channel,
+                "type": type_,
+                "blob": self._encode_blob(blob),
+            }
+            key = self._make_redis_checkpoint_writes_key_cached(
+                thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx
+            )
+            pipeline.json().set(key, "$", cast(Any, write_obj))
+            created_keys.append(key)
+
+        checkpoint_key = self._make_redis_checkpoint_key(thread_id, checkpoint_ns, checkpoint_id)
+        pipeline.json().merge(checkpoint_key, "$", {"has_writes": True})
+
+        zset_key = ""
+        if self._key_registry:
+            zset_key = self._key_registry.make_write_keys_zset_key(thread_id, checkpoint_ns, checkpoint_id)
+            pipeline.zadd(zset_key, {key: i for i, key in enumerate(created_keys)})
+
+        results = await pipeline.execute(raise_on_error=False)
+        merge_failed = False
+        for result in results:
+            if isinstance(result, Exception):
+                if "merge" in str(result).lower():
+                    merge_failed = True
+                else:
+                    raise result
+
+        if merge_failed:
+            # Redis sin JSON.MERGE (RedisJSON < 2.6): mismo fallback que upstream
+            try:
+                checkpoint_doc = await self._redis.json().get(checkpoint_key)
+                if isinstance(checkpoint_doc, dict) and not checkpoint_doc.get("has_writes"):
+                    checkpoint_doc["has_writes"] = True
+                    await self._redis.json().set(checkpoint_key, "$", checkpoint_doc)
+            except Exception:
+                pass
+
+        ttl_seconds = self._ttl_seconds()
+        if ttl_seconds is None:
+            return
+        ttl_keys = created_keys + ([zset_key] if zset_key else [])
+        ttl_pipeline = self._redis.pipeline(transaction=False)
+        for key in ttl_keys:
+            ttl_pipeline.expire(key, ttl_seconds)
+        for key, result in zip(ttl_keys, await ttl_pipeline.execute(raise_on_error=False)):
+            if isinstance(result, Exception):
+                logger.warning("[CHECKPOINT] No se pudo aplicar TTL a %s: %s", key, result)
+
+
+class CompactAsyncRedisSaver(PipelinedAsyncRedisSaver):
+    """Saver Redis que mantiene checkpoint/metadata en JSON y comprime los writes."""
+
+    serde: CompactCheckpointSerializer
+
+    def _dump_checkpoint(self, checkpoint: Checkpoint) -> dict[str, Any]:
+        type_, data = self.serde.dumps_json_typed(checkpoint)
+        if type_ != "json":
+            # Objeto no serializable a JSON: camino msgpack original del saver
+            return super()._dump_checkpoint(checkpoint)
+        checkpoint_data = cast(dict, orjson.loads(data))
+        if "channel_versions" in checkpoint_data:
+            checkpoint_data["channel_versions"] = {
+                k: str(v) for k, v in checkpoint_data["channel_versions"].items()
+            }
+        return {"type": type_, **checkpoint_data, "pending_sends": []}
+
+    def _dump_metadata(self, metadata: CheckpointMetadata) -> str:
+        _, serialized_bytes = self.serde.dumps_json_typed(metadata)
+        return serialized_bytes.decode().replace("\\u0000", "")
+
+
+__all__ = ["CompactAsyncRedisSaver", "PipelinedAsyncRedisSaver", "build_redis_client"]
@@ -0,0 +1,173 @@
+"""
+Serializer compacto para checkpoints: msgpack + compresión con header versionado.
+
+CompactCheckpointSerializer extiende JsonPlusRedisSerializer (mismas allowlists para
+CitaStructuredResponse) y cambia el path de escritura:
+
+    dumps_typed(obj) → ("cmsgpack", HEADER + payload)
+
+    HEADER = b"CK" + versión (1 byte) + codec (1 byte)
+    codec:  0 = sin comprimir, 1 = zlib, 2 = zstd, 3 = lz4
+
+Payloads menores a min_size bytes no se comprimen (codec 0): el header ya
+identifica el formato y evita gastar CPU en blobs chicos.
+
+Lectura retrocompatible: "json" y "msgpack" (checkpoints existentes) siguen el
+camino de JsonPlusRedisSerializer, así que activar CHECKPOINT_SERDE=compact no
+invalida conversaciones guardadas. Volver a "json" sí requiere que los blobs
+"cmsgpack" ya escritos expiren (TTL) — el serializer JSON no los entiende.
+
+zstd (paquete zstandard) y lz4 son opcionales; si el codec pedido no está
+instalado se usa zlib (stdlib) y se loguea un warning al crear el serializer.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Any, Callable
+
+from langgraph.checkpoint.redis.jsonplus_redis import JsonPlusRedisSerializer
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from ...logger import get_logger
+
+logger = get_logger(__name__)
+
+_MAGIC = b"CK"
+_VERSION = 1
+_HEADER_LEN = 4
+
+_CODEC_NONE = 0
+_CODEC_ZLIB = 1
+_CODEC_ZSTD = 2
+_CODEC_LZ4 = 3
+
+# codec_id → (nombre, compress(bytes, level), decompress(bytes))
+_CODECS: dict[int, tuple[str, Callable[[bytes, int], bytes], Callable[[bytes], bytes]]] = {
+    _CODEC_NONE: ("none", lambda data, level: data, lambda data: data),
+    _CODEC_ZLIB: ("zlib", lambda data, level: zlib.compress(data, level), zlib.decompress),
+}
+
+try:
+    import zstandard as _zstd
+
+    _CODECS[_CODEC_ZSTD] = (
+        "zstd",
+        lambda data, level: _zstd.ZstdCompressor(level=level).compress(data),
+        lambda data: _zstd.ZstdDecompressor().decompress(data),
+    )
+except ImportError:  # pragma: no cover - depende del entorno
+    _zstd = None
+
+try:
+    import lz4.frame as _lz4
+
+    _CODECS[_CODEC_LZ4] = (
+        "lz4",
+        lambda data, level: _lz4.compress(data, compression_level=level),
+        _lz4.decompress,
+    )
+except ImportError:  # pragma: no cover - depende del entorno
+    _lz4 = None
+
+_CODEC_IDS: dict[str, int] = {"none": _CODEC_NONE, "zlib": _CODEC_ZLIB, "zstd": _CODEC_ZSTD, "lz4": _CODEC_LZ4}
+
+# Nivel por defecto por codec: prioriza latencia por turno sobre ratio máximo.
+_DEFAULT_LEVELS: dict[int, int] = {_CODEC_NONE: 0, _CODEC_ZLIB: 6, _CODEC_ZSTD: 3, _CODEC_LZ4: 0}
+
+
+def available_codecs() -> list[str]:
+    """Codecs de compresión instalados en este entorno."""
+    return [_CODECS[cid][0] for cid in sorted(_CODECS)]
+
+
+class CompactCheckpointSerializer(JsonPlusRedisSerializer):
+    """
+    msgpack + compresión para blobs y writes del checkpointer.
+
+    dumps_json_typed() expone el camino JSON original para las partes que el
+    backend necesita como documento JSON (checkpoint inline y metadata en Redis).
+    """
+
+    TYPE = "cmsgpack"
+
+    def __init__(
+        self,
+        *,
+        codec: str = "zstd",
+        min_size: int = 512,
+        level: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Args:
+            codec: "zstd" | "lz4" | "zlib" | "none". Si no está instalado, cae a zlib.
+            min_size: Bytes msgpack mínimos para comprimir; debajo se guarda sin comprimir.
+            level: Nivel de compresión. None = default del codec.
+            **kwargs: allowlists de JsonPlusRedisSerializer.
+        """
+        super().__init__(**kwargs)
+        codec_id = _CODEC_IDS.get(codec)
+        if codec_id is None:
+            raise ValueError(f"Codec de checkpoint desconocido: {codec!r}")
+        if codec_id not in _CODECS:
+            logger.warning(
+                "[SERDE] Codec %s no instalado — usando zlib (instalar '%s' para activarlo)",
+                codec, "zstandard" if codec == "zstd" else codec,
+            )
+            codec_id = _CODEC_ZLIB
+        self._codec_id = codec_id
+        self._compress = _CODECS[codec_id][1]
+        self._level = _DEFAULT_LEVELS[codec_id] if level is None else level
+        self._min_size = min_size
+
+    @property
+    def codec(self) -> str:
+        """Nombre del codec efectivo (tras el fallback a zlib)."""
+        return _CODECS[self._codec_id][0]
+
+    # ------------------------------------------------------------------
+    # Header versionado
+    # ------------------------------------------------------------------
+
+    def _encode(self, raw: bytes) -> bytes:
+        codec_id = self._codec_id if len(raw) >= self._min_size else _CODEC_NONE
+        body = self._compress(raw, self._level) if codec_id != _CODEC_NONE else raw
+        return _MAGIC + bytes((_VERSION, codec_id)) + body
+
+    @staticmethod
+    def _decode(data: bytes) -> bytes:
+        if len(data) < _HEADER_LEN or data[:2] != _MAGIC:
+            raise ValueError("Blob cmsgpack sin header válido")
+        version, codec_id = data[2], data[3]
+        if version != _VERSION:
+            raise ValueError(f"Versión de blob cmsgpack no soportada: {version}")
+        codec = _CODECS.get(codec_id)
+        if codec is None:
+            raise RuntimeError(f"Codec {codec_id} no instalado; no se puede leer el checkpoint")
+        return codec[2](data[_HEADER_LEN:])
+
+    # ------------------------------------------------------------------
+    # SerializerProtocol
+    # ------------------------------------------------------------------
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        if obj is None or isinstance(obj, (bytes, bytearray)):
+            return super().dumps_typed(obj)
+        type_, data = JsonPlusSerializer.dumps_typed(self, obj)
+        if type_ != "msgpack":
+            return type_, data
+        return self.TYPE, self._encode(data)
+
+    def dumps_json_typed(self, obj: Any) -> tuple[str, bytes]:
+        """Camino JSON de JsonPlusRedisSerializer (para documentos que Redis indexa)."""
+        return JsonPlusRedisSerializer.dumps_typed(self, obj)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_ == self.TYPE:
+            return JsonPlusSerializer.loads_typed(self, ("msgpack", self._decode(payload)))
+        return super().loads_typed(data)
+
+
+__all__ = ["CompactCheckpointSerializer", "available_codecs"]
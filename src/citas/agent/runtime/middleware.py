@@ -1,15 +1,26 @@
 """
-Middleware LangChain para limitar la ventana de mensajes enviados al LLM.
+Middleware LangChain del agente de citas.
 
-Recorta el historial a MAX_MESSAGES_HISTORY mensajes antes de cada llamada al LLM,
-preservando el historial completo en el checkpointer (InMemorySaver o Redis en C1).
-Compatible con C1 (Redis migration): el checkpointer no se toca.
+- message_window: recorta el historial a MAX_MESSAGES_HISTORY mensajes antes de cada
+  llamada al LLM, preservando el historial completo en el checkpointer (InMemorySaver
+  o Redis en C1). Compatible con C1 (Redis migration): el checkpointer no se toca.
+- model_call_timer: mide cada llamada al modelo por separado. track_llm_call mide el
+  ainvoke completo (modelo + tools + checkpointer); este timer aísla el tiempo de OpenAI.
+  También la registra como fase llm_call del request (timing.py), abre el span
+  llm.call (tracing.py) y, con grabación activa, guarda la respuesta (recording.py).
+- tool_call_recorder: con grabación activa guarda args y salida de cada tool.
 """
 
-from langchain.agents.middleware import wrap_model_call, ModelRequest, ModelResponse
-from langchain_core.messages import trim_messages
+import time
+
+from langchain.agents.middleware import wrap_model_call, wrap_tool_call, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, trim_messages
 
 from ... import config as app_config
+from ...metrics import track_model_call
+from ...recording import record_llm_call, record_tool_call
+from ...timing import track_phase
+from ...tracing import start_span
 
 
 @wrap_model_call
@@ -32,4 +43,26 @@ async def message_window(request: ModelRequest, handler) -> ModelResponse:
     return await handler(request.override(messages=trimmed))
 
 
-__all__ = ["message_window"]
+@wrap_model_call
+async def model_call_timer(request: ModelRequest, handler) -> ModelResponse:
+    """Mide la latencia de la llamada al modelo (citas_model_call_duration_seconds).
+    Va último en la lista de middleware para no contar el recorte de mensajes.
+    """
+    start = time.perf_counter()
+    with start_span("llm.call"), track_phase("llm_call"), track_model_call():
+        response = await handler(request)
+    ai_message = next((m for m in reversed(response.result) if isinstance(m, AIMessage)), None)
+    record_llm_call(ai_message, time.perf_counter() - start)
+    return response
+
+
+@wrap_tool_call
+async def tool_call_recorder(request, handler):
+    """Registra nombre, args y salida de cada tool para replay (no-op sin grabación)."""
+    result = await handler(request)
+    call = request.tool_call
+    record_tool_call(call.get("name"), call.get("args") or {}, getattr(result, "content", None))
+    return result
+
+
+__all__ = ["message_window", "model_call_timer", "tool_call_recorder"]
@@ -7,6 +7,18 @@ from .config import (
     SERVER_PORT,
     LOG_LEVEL,
     LOG_FILE,
+    REQUEST_TIMING_LOG,
+    OTEL_ENABLED,
+    OTEL_SERVICE_NAME,
+    OTEL_EXPORTER,
+    OTEL_EXPORTER_FILE,
+    DEBUG_PROFILER_ENABLED,
+    DEBUG_PROFILER_MAX_SECONDS,
+    EVENT_LOOP_LAG_INTERVAL,
+    SLOW_CALLBACK_THRESHOLD_MS,
+    CPU_OFFLOAD_WORKERS,
+    CONVERSATION_RECORD_FILE,
+    CONVERSATION_RECORD_SAMPLE_RATE,
     OPENAI_TIMEOUT,
     API_TIMEOUT,
     CHAT_TIMEOUT,
@@ -16,6 +28,15 @@ from .config import (
     AGENT_CACHE_MAXSIZE,
     SEARCH_CACHE_TTL_MINUTES,
     SEARCH_CACHE_MAXSIZE,
+    SEARCH_NEGATIVE_CACHE_TTL_SECONDS,
+    SEARCH_NEGATIVE_CACHE_MAXSIZE,
+    SEARCH_FAILURE_BACKOFF_MAX_SECONDS,
+    CONFIG_CACHE_MAXSIZE,
+    AGENT_CONTEXT_CACHE_MAXSIZE,
+    CATALOG_INDEX_ENABLED,
+    CATALOG_INDEX_MAX_EMPRESAS,
+    CATALOG_SNAPSHOT_TTL_MINUTES,
+    CATALOG_SNAPSHOT_MAX_EMPRESAS,
     HTTP_RETRY_ATTEMPTS,
     HTTP_RETRY_WAIT_MIN,
     HTTP_RETRY_WAIT_MAX,
@@ -24,9 +45,50 @@ from .config import (
     CB_MAX_KEYS,
     HTTP_MAX_CONNECTIONS,
     HTTP_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP2_ENABLED,
+    HTTP_WARM_CONNECTIONS,
+    HTTP_WARM_INTERVAL_SECONDS,
+    HTTP_POOL_TIMEOUT,
+    HTTP_INFORMACION_MAX_CONNECTIONS,
+    HTTP_INFORMACION_TIMEOUT,
+    HTTP_CALENDAR_MAX_CONNECTIONS,
+    HTTP_CALENDAR_TIMEOUT,
+    HTTP_AGENDAR_REUNION_MAX_CONNECTIONS,
+    HTTP_AGENDAR_REUNION_TIMEOUT,
+    HTTP_PREGUNTAS_FRECUENTES_MAX_CONNECTIONS,
+    HTTP_PREGUNTAS_FRECUENTES_TIMEOUT,
+    HEDGE_ENABLED,
+    HEDGE_COD_OPES,
+    HEDGE_QUANTILE,
+    HEDGE_MIN_DELAY_MS,
+    HEDGE_BUDGET_PERCENT,
+    ADAPTIVE_TIMEOUT_ENABLED,
+    ADAPTIVE_TIMEOUT_QUANTILE,
+    ADAPTIVE_TIMEOUT_MULTIPLIER,
+    ADAPTIVE_TIMEOUT_FLOOR_SECONDS,
+    ADAPTIVE_RETRY_WAIT_MIN_MS,
+    ADAPTIVE_TIMEOUT_MIN_FRACTION,
+    PHP_BATCH_ENABLED,
+    PHP_BATCH_COD_OPE,
+    PHP_BATCH_WINDOW_MS,
+    PHP_BATCH_MAX_OPS,
     MAX_CONCURRENT_AGENT,
     REDIS_URL,
     REDIS_CHECKPOINT_TTL_HOURS,
+    REDIS_CHECKPOINT_HOT_CACHE_THREADS,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_SOCKET_CONNECT_TIMEOUT,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_CHECKPOINT_PIPELINE,
+    MEMORY_CHECKPOINT_MAX_THREADS,
+    MEMORY_CHECKPOINT_MAX_MB,
+    MEMORY_CHECKPOINT_TTL_HOURS,
+    CHECKPOINT_SERDE,
+    CHECKPOINT_COMPRESSION,
+    CHECKPOINT_COMPRESSION_MIN_BYTES,
     API_CALENDAR_URL,
     API_AGENDAR_REUNION_URL,
     API_INFORMACION_URL,
@@ -49,6 +111,18 @@ __all__ = [
     "SERVER_PORT",
     "LOG_LEVEL",
     "LOG_FILE",
+    "REQUEST_TIMING_LOG",
+    "OTEL_ENABLED",
+    "OTEL_SERVICE_NAME",
+    "OTEL_EXPORTER",
+    "OTEL_EXPORTER_FILE",
+    "DEBUG_PROFILER_ENABLED",
+    "DEBUG_PROFILER_MAX_SECONDS",
+    "EVENT_LOOP_LAG_INTERVAL",
+    "SLOW_CALLBACK_THRESHOLD_MS",
+    "CPU_OFFLOAD_WORKERS",
+    "CONVERSATION_RECORD_FILE",
+    "CONVERSATION_RECORD_SAMPLE_RATE",
     "OPENAI_TIMEOUT",
     "API_TIMEOUT",
     "CHAT_TIMEOUT",
@@ -58,6 +132,15 @@ __all__ = [
     "AGENT_CACHE_MAXSIZE",
     "SEARCH_CACHE_TTL_MINUTES",
     "SEARCH_CACHE_MAXSIZE",
+    "SEARCH_NEGATIVE_CACHE_TTL_SECONDS",
+    "SEARCH_NEGATIVE_CACHE_MAXSIZE",
+    "SEARCH_FAILURE_BACKOFF_MAX_SECONDS",
+    "CONFIG_CACHE_MAXSIZE",
+    "AGENT_CONTEXT_CACHE_MAXSIZE",
+    "CATALOG_INDEX_ENABLED",
+    "CATALOG_INDEX_MAX_EMPRESAS",
+    "CATALOG_SNAPSHOT_TTL_MINUTES",
+    "CATALOG_SNAPSHOT_MAX_EMPRESAS",
     "API_CALENDAR_URL",
     "API_AGENDAR_REUNION_URL",
     "API_INFORMACION_URL",
@@ -71,9 +154,50 @@ __all__ = [
     "CB_MAX_KEYS",
     "HTTP_MAX_CONNECTIONS",
     "HTTP_MAX_KEEPALIVE",
+    "HTTP_KEEPALIVE_EXPIRY",
+    "HTTP2_ENABLED",
+    "HTTP_WARM_CONNECTIONS",
+    "HTTP_WARM_INTERVAL_SECONDS",
+    "HTTP_POOL_TIMEOUT",
+    "HTTP_INFORMACION_MAX_CONNECTIONS",
+    "HTTP_INFORMACION_TIMEOUT",
+    "HTTP_CALENDAR_MAX_CONNECTIONS",
+    "HTTP_CALENDAR_TIMEOUT",
+    "HTTP_AGENDAR_REUNION_MAX_CONNECTIONS",
+    "HTTP_AGENDAR_REUNION_TIMEOUT",
+    "HTTP_PREGUNTAS_FRECUENTES_MAX_CONNECTIONS",
+    "HTTP_PREGUNTAS_FRECUENTES_TIMEOUT",
+    "HEDGE_ENABLED",
+    "HEDGE_COD_OPES",
+    "HEDGE_QUANTILE",
+    "HEDGE_MIN_DELAY_MS",
+    "HEDGE_BUDGET_PERCENT",
+    "ADAPTIVE_TIMEOUT_ENABLED",
+    "ADAPTIVE_TIMEOUT_QUANTILE",
+    "ADAPTIVE_TIMEOUT_MULTIPLIER",
+    "ADAPTIVE_TIMEOUT_FLOOR_SECONDS",
+    "ADAPTIVE_RETRY_WAIT_MIN_MS",
+    "ADAPTIVE_TIMEOUT_MIN_FRACTION",
+    "PHP_BATCH_ENABLED",
+    "PHP_BATCH_COD_OPE",
+    "PHP_BATCH_WINDOW_MS",
+    "PHP_BATCH_MAX_OPS",
     "MAX_CONCURRENT_AGENT",
     "REDIS_URL",
     "REDIS_CHECKPOINT_TTL_HOURS",
+    "REDIS_CHECKPOINT_HOT_CACHE_THREADS",
+    "REDIS_MAX_CONNECTIONS",
+    "REDIS_POOL_TIMEOUT",
+    "REDIS_SOCKET_TIMEOUT",
+    "REDIS_SOCKET_CONNECT_TIMEOUT",
+    "REDIS_HEALTH_CHECK_INTERVAL",
+    "REDIS_CHECKPOINT_PIPELINE",
+    "MEMORY_CHECKPOINT_MAX_THREADS",
+    "MEMORY_CHECKPOINT_MAX_MB",
+    "MEMORY_CHECKPOINT_TTL_HOURS",
+    "CHECKPOINT_SERDE",
+    "CHECKPOINT_COMPRESSION",
+    "CHECKPOINT_COMPRESSION_MIN_BYTES",
     "INTERNAL_API_TOKEN",
     "informacion_cb",
     "preguntas_cb",
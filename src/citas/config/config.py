@@ -80,6 +80,35 @@ def _get_log_level(key: str, default: str) -> str:
         return value
     return default.upper()
 
+
+def _get_choice(key: str, default: str, choices: tuple[str, ...]) -> str:
+    """Obtiene variable de entorno restringida a un conjunto de valores (lowercase)."""
+    value = (os.getenv(key) or default).strip().lower()
+    if value in choices:
+        return value
+    return default
+
+
+def _get_set(key: str, default: str) -> frozenset[str]:
+    """Obtiene variable de entorno como conjunto de valores separados por coma."""
+    raw = os.getenv(key)
+    if raw is None:
+        raw = default
+    return frozenset(item.strip() for item in raw.split(",") if item.strip())
+
+
+def _get_bool(key: str, default: bool) -> bool:
+    """Obtiene variable de entorno como bool (true/false, 1/0, yes/no)."""
+    raw = os.getenv(key)
+    if raw is None or not raw.strip():
+        return default
+    value = raw.strip().lower()
+    if value in ("true", "1", "yes", "on"):
+        return True
+    if value in ("false", "0", "no", "off"):
+        return False
+    return default
+
 # ---------------------------------------------------------------------------
 # OpenAI (agente especializado en citas)
 # ---------------------------------------------------------------------------
@@ -103,6 +132,46 @@ REDIS_URL: str = _get_str("REDIS_URL", "")
 REDIS_CHECKPOINT_TTL_HOURS: int = _get_int(
     "REDIS_CHECKPOINT_TTL_HOURS", 24, min_val=0, max_val=8760
 )  # 0 = sin TTL, max 1 año
+REDIS_CHECKPOINT_HOT_CACHE_THREADS: int = _get_int(
+    "REDIS_CHECKPOINT_HOT_CACHE_THREADS", 1000, min_val=0, max_val=100_000
+)  # Threads con su último checkpoint cacheado en el proceso. 0 = desactivado
+
+# Cliente Redis del checkpointer (pool bloqueante: espera conexión libre en vez de fallar)
+REDIS_MAX_CONNECTIONS: int = _get_int("REDIS_MAX_CONNECTIONS", 50, min_val=5, max_val=1000)
+REDIS_POOL_TIMEOUT: float = _get_float(
+    "REDIS_POOL_TIMEOUT", 5.0, min_val=0.1, max_val=60.0
+)  # Segundos esperando conexión libre del pool
+REDIS_SOCKET_TIMEOUT: float = _get_float("REDIS_SOCKET_TIMEOUT", 5.0, min_val=0.1, max_val=60.0)
+REDIS_SOCKET_CONNECT_TIMEOUT: float = _get_float(
+    "REDIS_SOCKET_CONNECT_TIMEOUT", 3.0, min_val=0.1, max_val=30.0
+)
+REDIS_HEALTH_CHECK_INTERVAL: int = _get_int(
+    "REDIS_HEALTH_CHECK_INTERVAL", 30, min_val=0, max_val=3600
+)  # Segundos de inactividad antes de PING al reusar una conexión. 0 = desactivado
+REDIS_CHECKPOINT_PIPELINE: bool = _get_bool(
+    "REDIS_CHECKPOINT_PIPELINE", True
+)  # Agrupa los comandos de aput/aput_writes en pipelines (menos round trips por turno)
+
+# Checkpointer en memoria (fallback sin Redis): límites para no crecer sin techo
+MEMORY_CHECKPOINT_MAX_THREADS: int = _get_int(
+    "MEMORY_CHECKPOINT_MAX_THREADS", 5000, min_val=100, max_val=1_000_000
+)
+MEMORY_CHECKPOINT_MAX_MB: int = _get_int(
+    "MEMORY_CHECKPOINT_MAX_MB", 512, min_val=16, max_val=65536
+)
+MEMORY_CHECKPOINT_TTL_HOURS: int = _get_int(
+    "MEMORY_CHECKPOINT_TTL_HOURS", 24, min_val=0, max_val=8760
+)  # 0 = sin TTL (solo evicta por límites)
+
+# Serialización de checkpoints: "json" (default, formato original) o "compact"
+# (msgpack + compresión con header versionado; los checkpoints JSON siguen legibles)
+CHECKPOINT_SERDE: str = _get_choice("CHECKPOINT_SERDE", "json", ("json", "compact"))
+CHECKPOINT_COMPRESSION: str = _get_choice(
+    "CHECKPOINT_COMPRESSION", "zstd", ("zstd", "lz4", "zlib", "none")
+)  # Solo con CHECKPOINT_SERDE=compact; si el codec no está instalado cae a zlib
+CHECKPOINT_COMPRESSION_MIN_BYTES: int = _get_int(
+    "CHECKPOINT_COMPRESSION_MIN_BYTES", 512, min_val=0, max_val=1_048_576
+)  # Blobs más chicos se guardan sin comprimir
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -110,6 +179,44 @@ REDIS_CHECKPOINT_TTL_HOURS: int = _get_int(
 
 LOG_LEVEL: str = _get_log_level("LOG_LEVEL", "INFO")
 LOG_FILE: str = _get_str("LOG_FILE", "")  # Si está vacío, no guarda en archivo
+REQUEST_TIMING_LOG: bool = _get_bool(
+    "REQUEST_TIMING_LOG", False
+)  # Línea [TIMING] en JSON por request con el desglose de latencia por fase
+
+# ---------------------------------------------------------------------------
+# Tracing OpenTelemetry (opcional, requiere el extra `tracing`)
+# ---------------------------------------------------------------------------
+
+OTEL_ENABLED: bool = _get_bool("OTEL_ENABLED", False)
+OTEL_SERVICE_NAME: str = _get_str("OTEL_SERVICE_NAME", "agent-citas")
+OTEL_EXPORTER: str = _get_choice("OTEL_EXPORTER", "console", ("console", "file", "otlp"))
+OTEL_EXPORTER_FILE: str = _get_str(
+    "OTEL_EXPORTER_FILE", "logs/traces.jsonl"
+)  # Solo con OTEL_EXPORTER=file: un span JSON por línea
+
+# ---------------------------------------------------------------------------
+# Diagnóstico en producción (profiler por muestreo, lag del event loop)
+# ---------------------------------------------------------------------------
+
+DEBUG_PROFILER_ENABLED: bool = _get_bool(
+    "DEBUG_PROFILER_ENABLED", False
+)  # GET /debug/profile; además exige INTERNAL_API_TOKEN configurado
+DEBUG_PROFILER_MAX_SECONDS: int = _get_int("DEBUG_PROFILER_MAX_SECONDS", 60, min_val=1, max_val=600)
+EVENT_LOOP_LAG_INTERVAL: float = _get_float(
+    "EVENT_LOOP_LAG_INTERVAL", 0.5, min_val=0.0, max_val=60.0
+)  # Segundos entre mediciones de citas_event_loop_lag_seconds. 0 = desactivado
+SLOW_CALLBACK_THRESHOLD_MS: int = _get_int(
+    "SLOW_CALLBACK_THRESHOLD_MS", 0, min_val=0, max_val=60_000
+)  # Callbacks del loop más lentos se loguean y cuentan. 0 = desactivado; solo con el loop de asyncio
+CPU_OFFLOAD_WORKERS: int = _get_int(
+    "CPU_OFFLOAD_WORKERS", 2, min_val=0, max_val=32
+)  # Threads para pasos CPU pesados (create_agent, render del prompt). 0 = inline en el loop
+CONVERSATION_RECORD_FILE: str = _get_str(
+    "CONVERSATION_RECORD_FILE", ""
+)  # JSONL (o .gz) con requests, tools y respuestas PHP sanitizados para replay. Vacío = off
+CONVERSATION_RECORD_SAMPLE_RATE: float = _get_float(
+    "CONVERSATION_RECORD_SAMPLE_RATE", 1.0, min_val=0.0, max_val=1.0
+)  # Fracción de session_id grabadas (conversaciones completas)
 
 # ---------------------------------------------------------------------------
 # Timeouts y límites
@@ -137,6 +244,79 @@ CB_MAX_KEYS: int = _get_int("CB_MAX_KEYS", 500, min_val=50, max_val=10000)
 # ---------------------------------------------------------------------------
 HTTP_MAX_CONNECTIONS: int = _get_int("HTTP_MAX_CONNECTIONS", 50, min_val=10, max_val=500)
 HTTP_MAX_KEEPALIVE: int = _get_int("HTTP_MAX_KEEPALIVE", 20, min_val=5, max_val=200)
+HTTP_KEEPALIVE_EXPIRY: float = _get_float(
+    "HTTP_KEEPALIVE_EXPIRY", 30.0, min_val=1.0, max_val=600.0
+)  # Segundos que se guarda una conexión ociosa; menor que el keep-alive del servidor PHP
+HTTP2_ENABLED: bool = _get_bool("HTTP2_ENABLED", False)  # Requiere el extra `http2` (h2)
+HTTP_WARM_CONNECTIONS: int = _get_int(
+    "HTTP_WARM_CONNECTIONS", 2, min_val=0, max_val=50
+)  # Conexiones abiertas por host PHP al arrancar. 0 = sin precalentar
+HTTP_WARM_INTERVAL_SECONDS: int = _get_int(
+    "HTTP_WARM_INTERVAL_SECONDS", 0, min_val=0, max_val=3600
+)  # Renovar las conexiones precalentadas cada N s (menor que HTTP_KEEPALIVE_EXPIRY). 0 = solo al arrancar
+
+# Pool propio por API PHP (límite y read timeout independientes): un endpoint lento
+# no agota las conexiones de otro (p. ej. catálogo lento vs CREAR_EVENTO)
+HTTP_POOL_TIMEOUT: float = _get_float(
+    "HTTP_POOL_TIMEOUT", 2.0, min_val=0.1, max_val=30.0
+)  # Espera máxima por una conexión libre del pool (PoolTimeout)
+HTTP_INFORMACION_MAX_CONNECTIONS: int = _get_int(
+    "HTTP_INFORMACION_MAX_CONNECTIONS", HTTP_MAX_CONNECTIONS, min_val=2, max_val=500
+)
+HTTP_INFORMACION_TIMEOUT: int = _get_int("HTTP_INFORMACION_TIMEOUT", API_TIMEOUT, min_val=1, max_val=120)
+HTTP_CALENDAR_MAX_CONNECTIONS: int = _get_int("HTTP_CALENDAR_MAX_CONNECTIONS", 20, min_val=2, max_val=500)
+HTTP_CALENDAR_TIMEOUT: int = _get_int("HTTP_CALENDAR_TIMEOUT", API_TIMEOUT, min_val=1, max_val=120)
+HTTP_AGENDAR_REUNION_MAX_CONNECTIONS: int = _get_int(
+    "HTTP_AGENDAR_REUNION_MAX_CONNECTIONS", 10, min_val=2, max_val=500
+)
+HTTP_AGENDAR_REUNION_TIMEOUT: int = _get_int("HTTP_AGENDAR_REUNION_TIMEOUT", API_TIMEOUT, min_val=1, max_val=120)
+HTTP_PREGUNTAS_FRECUENTES_MAX_CONNECTIONS: int = _get_int(
+    "HTTP_PREGUNTAS_FRECUENTES_MAX_CONNECTIONS", 10, min_val=2, max_val=500
+)
+HTTP_PREGUNTAS_FRECUENTES_TIMEOUT: int = _get_int(
+    "HTTP_PREGUNTAS_FRECUENTES_TIMEOUT", API_TIMEOUT, min_val=1, max_val=120
+)
+
+# Hedging de lecturas lentas: segundo request si el primero supera el p95 de su codOpe
+HEDGE_ENABLED: bool = _get_bool("HEDGE_ENABLED", False)
+HEDGE_COD_OPES: frozenset[str] = _get_set(
+    "HEDGE_COD_OPES",
+    "CONSULTAR_DISPONIBILIDAD,SUGERIR_HORARIOS,BUSCAR_PRODUCTOS_SERVICIOS_CITAS,OBTENER_HORARIO_REUNIONES",
+)  # Solo lecturas idempotentes
+HEDGE_QUANTILE: float = _get_float(
+    "HEDGE_QUANTILE", 0.95, min_val=0.5, max_val=0.999
+)  # Latencia (cuantil por upstream y codOpe) tras la cual sale el segundo request
+HEDGE_MIN_DELAY_MS: int = _get_int(
+    "HEDGE_MIN_DELAY_MS", 50, min_val=0, max_val=10_000
+)  # Piso de esa espera: no duplicar llamadas que ya son rápidas
+HEDGE_BUDGET_PERCENT: float = _get_float(
+    "HEDGE_BUDGET_PERCENT", 5.0, min_val=0.1, max_val=50.0
+)  # Máximo de requests extra por upstream, en % de sus requests
+
+# Timeouts adaptativos: read timeout y espera de retry por (upstream, codOpe) según la
+# latencia observada, acotados por el piso y por el timeout fijo del pool (techo)
+ADAPTIVE_TIMEOUT_ENABLED: bool = _get_bool("ADAPTIVE_TIMEOUT_ENABLED", False)
+ADAPTIVE_TIMEOUT_QUANTILE: float = _get_float("ADAPTIVE_TIMEOUT_QUANTILE", 0.99, min_val=0.5, max_val=0.999)
+ADAPTIVE_TIMEOUT_MULTIPLIER: float = _get_float(
+    "ADAPTIVE_TIMEOUT_MULTIPLIER", 3.0, min_val=1.0, max_val=20.0
+)  # read timeout = cuantil observado × multiplicador
+ADAPTIVE_TIMEOUT_FLOOR_SECONDS: float = _get_float(
+    "ADAPTIVE_TIMEOUT_FLOOR_SECONDS", 2.0, min_val=0.1, max_val=60.0
+)
+ADAPTIVE_RETRY_WAIT_MIN_MS: int = _get_int(
+    "ADAPTIVE_RETRY_WAIT_MIN_MS", 100, min_val=0, max_val=10_000
+)  # Piso de la espera entre reintentos (el techo es HTTP_RETRY_WAIT_MAX)
+ADAPTIVE_TIMEOUT_MIN_FRACTION: float = _get_float(
+    "ADAPTIVE_TIMEOUT_MIN_FRACTION", 0.25, min_val=0.0, max_val=1.0
+)  # Piso relativo a los valores fijos: timeout >= timeout del pool × fracción, espera >= HTTP_RETRY_WAIT_MIN × fracción
+
+# Agrupación de lecturas a API_INFORMACION_URL (requiere soporte multi-operación en el PHP)
+PHP_BATCH_ENABLED: bool = _get_bool("PHP_BATCH_ENABLED", False)
+PHP_BATCH_COD_OPE: str = _get_str("PHP_BATCH_COD_OPE", "MULTI_OPERACION")
+PHP_BATCH_WINDOW_MS: int = _get_int(
+    "PHP_BATCH_WINDOW_MS", 5, min_val=0, max_val=100
+)  # Espera para juntar lecturas de la misma empresa antes de enviar
+PHP_BATCH_MAX_OPS: int = _get_int("PHP_BATCH_MAX_OPS", 10, min_val=2, max_val=50)
 
 # ---------------------------------------------------------------------------
 # Concurrencia del agente (backpressure)
@@ -158,6 +338,31 @@ SEARCH_CACHE_TTL_MINUTES: int = _get_int(
     "SEARCH_CACHE_TTL_MINUTES", 15, min_val=1, max_val=60
 )
 SEARCH_CACHE_MAXSIZE: int = _get_int("SEARCH_CACHE_MAXSIZE", 2000, min_val=10, max_val=10000)
+SEARCH_NEGATIVE_CACHE_TTL_SECONDS: int = _get_int(
+    "SEARCH_NEGATIVE_CACHE_TTL_SECONDS", 120, min_val=0, max_val=3600
+)  # Búsquedas sin resultados / success:false. 0 = no cachear negativos
+SEARCH_NEGATIVE_CACHE_MAXSIZE: int = _get_int(
+    "SEARCH_NEGATIVE_CACHE_MAXSIZE", 1000, min_val=10, max_val=10000
+)
+SEARCH_FAILURE_BACKOFF_MAX_SECONDS: int = _get_int(
+    "SEARCH_FAILURE_BACKOFF_MAX_SECONDS", 60, min_val=0, max_val=600
+)  # Tope del backoff por empresa tras errores de la búsqueda. 0 = sin backoff
+CONFIG_CACHE_MAXSIZE: int = _get_int(
+    "CONFIG_CACHE_MAXSIZE", 2048, min_val=0, max_val=100_000
+)  # CitasConfig validados reutilizables por huella del payload. 0 = validar siempre
+AGENT_CONTEXT_CACHE_MAXSIZE: int = _get_int(
+    "AGENT_CONTEXT_CACHE_MAXSIZE", 4096, min_val=0, max_val=100_000
+)  # AgentContext por (empresa, sesión, huella de config). 0 = construir siempre
+CATALOG_INDEX_ENABLED: bool = _get_bool("CATALOG_INDEX_ENABLED", True)
+CATALOG_INDEX_MAX_EMPRESAS: int = _get_int(
+    "CATALOG_INDEX_MAX_EMPRESAS", 500, min_val=10, max_val=10_000
+)
+CATALOG_SNAPSHOT_TTL_MINUTES: int = _get_int(
+    "CATALOG_SNAPSHOT_TTL_MINUTES", 15, min_val=1, max_val=1440
+)  # Antigüedad a partir de la cual el catálogo (prompt + índice) se refresca en segundo plano
+CATALOG_SNAPSHOT_MAX_EMPRESAS: int = _get_int(
+    "CATALOG_SNAPSHOT_MAX_EMPRESAS", 500, min_val=10, max_val=10_000
+)
 
 # ---------------------------------------------------------------------------
 # APIs MaravIA (calendario, agendar reunión, información/horarios)
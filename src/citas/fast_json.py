@@ -0,0 +1,51 @@
+"""
+Decode/encode JSON del hot path HTTP (/api/chat).
+
+- ORJSONRoute: route class de FastAPI cuyo Request parsea el body con orjson en vez
+  de json.loads (orjson.JSONDecodeError hereda de json.JSONDecodeError, así que el
+  422 de FastAPI para JSON inválido no cambia).
+- json_response: serializa un modelo Pydantic directo a bytes con pydantic-core y
+  devuelve la Response ya armada. FastAPI no vuelve a validar el modelo de respuesta
+  (lo hace con cualquier valor que no sea un Response), y `response_model` sigue
+  documentando el contrato en OpenAPI.
+"""
+
+from typing import Any, Callable, Coroutine
+
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+
+class ORJSONRequest(Request):
+    """Request cuyo json() usa orjson."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """APIRoute que entrega ORJSONRequest al handler de FastAPI."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
+
+
+def json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Response JSON de un modelo ya validado, sin la re-validación de FastAPI."""
+    return Response(
+        content=model.__pydantic_serializer__.to_json(model),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+__all__ = ["ORJSONRequest", "ORJSONRoute", "json_response"]
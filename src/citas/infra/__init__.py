@@ -1,14 +1,26 @@
-"""Infraestructura transversal: HTTP client, circuit breaker y resiliencia."""
+"""Infraestructura transversal: HTTP client, circuit breaker, resiliencia y pool de CPU."""
 
 from .circuit_breaker import CircuitBreaker
-from .http_client import get_client, close_http_client, post_with_logging, post_with_retry
+from .http_client import (
+    get_client,
+    send_post,
+    warm_http_client,
+    close_http_client,
+    post_with_logging,
+    post_with_retry,
+)
 from ._resilience import resilient_call
+from .offload import run_cpu_bound, shutdown_cpu_pool
 
 __all__ = [
     "get_client",
+    "send_post",
+    "warm_http_client",
     "close_http_client",
     "post_with_logging",
     "post_with_retry",
     "CircuitBreaker",
     "resilient_call",
+    "run_cpu_bound",
+    "shutdown_cpu_pool",
 ]
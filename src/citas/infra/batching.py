@@ -0,0 +1,184 @@
+"""
+Agrupación de lecturas a ws_informacion_ia.php en un solo POST multi-operación.
+
+Al construir un agente se piden varias lecturas de la misma empresa casi a la vez
+(horario, productos, servicios, contexto de negocio, funciones especiales). Con
+PHP_BATCH_ENABLED, post_with_logging las deriva a PostBatcher: las que llegan dentro
+de PHP_BATCH_WINDOW_MS para la misma (url, id_empresa) salen en un solo request:
+
+    {"codOpe": PHP_BATCH_COD_OPE, "id_empresa": 42, "operaciones": [payload, payload, ...]}
+    → {"success": true, "resultados": [respuesta, respuesta, ...]}   (mismo orden)
+
+Cada llamador recibe su respuesta como si hubiera hecho su propio POST. Si el backend
+no entiende la operación (HTTP 4xx, o la respuesta no trae `resultados` con una
+entrada por operación), esa URL se marca como no soportada por 30 minutos y las
+lecturas se mandan por separado, en paralelo (fan-out, el comportamiento de siempre).
+Un error de red del POST agrupado se propaga a todos los llamadores, igual que si
+sus POST individuales hubieran fallado.
+
+Cada lote corre en un contexto vacío (como los refrescos de catalogo_snapshot): el
+POST agrupado no pertenece al request que abrió la ventana. La grabación, el timing
+(php_call) y el span php.post de cada lectura los pone post_with_logging en el
+contexto de su llamador, alrededor de submit(); `send` es el POST sin instrumentar.
+
+El batcher guarda referencia a las tareas de envío en vuelo (el loop solo guarda
+referencias débiles); close() las cancela en el teardown y los llamadores que
+esperaban reciben CancelledError.
+"""
+
+import asyncio
+import contextvars
+import time
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from ..logger import get_logger
+from ..metrics import PHP_BATCH
+
+logger = get_logger(__name__)
+
+PostFn = Callable[[str, dict[str, Any]], Awaitable[dict[str, Any]]]
+
+# Tras detectar que una URL no soporta multi-operación, no reintentar en este tiempo
+_UNSUPPORTED_RETRY_SECONDS = 30 * 60
+
+
+class _Batch:
+    __slots__ = ("payloads", "futures")
+
+    def __init__(self) -> None:
+        self.payloads: list[dict[str, Any]] = []
+        self.futures: list[asyncio.Future] = []
+
+
+class PostBatcher:
+    """
+    Junta POSTs de lectura por (url, id_empresa) durante una ventana corta.
+
+    Args:
+        send: POST individual (sin agrupar ni instrumentar) usado para el request
+            multi-operación, para lotes de una sola operación y para el fan-out de respaldo.
+        cod_ope: codOpe del request multi-operación.
+        window_seconds: cuánto se espera a que lleguen más operaciones del mismo lote.
+        max_ops: tope de operaciones por lote; al llenarse se envía sin esperar.
+    """
+
+    def __init__(self, send: PostFn, cod_ope: str, window_seconds: float, max_ops: int) -> None:
+        self._send = send
+        self._cod_ope = cod_ope
+        self._window = window_seconds
+        self._max_ops = max_ops
+        self._pending: dict[tuple[str, Any], _Batch] = {}
+        self._unsupported_until: dict[str, float] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def supports(self, url: str) -> bool:
+        until = self._unsupported_until.get(url)
+        return until is None or time.monotonic() >= until
+
+    async def submit(self, url: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Encola la lectura en el lote de su (url, id_empresa) y espera su respuesta."""
+        key = (url, payload.get("id_empresa"))
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _Batch()
+            # El lote se envía desde su propia tarea: si el primer llamador se cancela,
+            # los demás igual reciben su respuesta. Contexto vacío: sin el registro,
+            # timing ni trace del primer llamador.
+            task = asyncio.create_task(self._run(key, batch), context=contextvars.Context())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        future = asyncio.get_running_loop().create_future()
+        batch.payloads.append(payload)
+        batch.futures.append(future)
+        if len(batch.payloads) >= self._max_ops:
+            self._pending.pop(key, None)
+        return await future
+
+    async def close(self) -> None:
+        """Cancela los lotes en vuelo. Llamar en el teardown del servidor (close_http_client)."""
+        self._pending.clear()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, key: tuple[str, Any], batch: _Batch) -> None:
+        try:
+            await self._send_batch(key, batch)
+        except asyncio.CancelledError:
+            for future in batch.futures:
+                future.cancel()
+            raise
+
+    async def _send_batch(self, key: tuple[str, Any], batch: _Batch) -> None:
+        await asyncio.sleep(self._window)
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        url = key[0]
+        if len(batch.payloads) == 1:
+            PHP_BATCH.labels(result="single").inc()
+            await self._resolve_one(batch.futures[0], self._send(url, batch.payloads[0]))
+            return
+        if not self.supports(url):
+            await self._fan_out(url, batch)
+            return
+
+        multi = {"codOpe": self._cod_ope, "id_empresa": key[1], "operaciones": batch.payloads}
+        try:
+            data = await self._send(url, multi)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                _fail_all(batch, e)
+                return
+            self._mark_unsupported(url, f"HTTP {e.response.status_code}")
+            await self._fan_out(url, batch)
+            return
+        except Exception as e:
+            _fail_all(batch, e)
+            return
+
+        resultados = data.get("resultados") if isinstance(data, dict) else None
+        if not isinstance(resultados, list) or len(resultados) != len(batch.payloads):
+            self._mark_unsupported(url, "respuesta sin 'resultados'")
+            await self._fan_out(url, batch)
+            return
+        PHP_BATCH.labels(result="batched").inc()
+        for future, resultado in zip(batch.futures, resultados):
+            if not future.done():
+                future.set_result(resultado if isinstance(resultado, dict) else {"success": False})
+
+    def _mark_unsupported(self, url: str, reason: str) -> None:
+        self._unsupported_until[url] = time.monotonic() + _UNSUPPORTED_RETRY_SECONDS
+        logger.warning(
+            "[BATCH] %s no soporta %s (%s) — lecturas en paralelo por %s min",
+            url, self._cod_ope, reason, _UNSUPPORTED_RETRY_SECONDS // 60,
+        )
+
+    async def _fan_out(self, url: str, batch: _Batch) -> None:
+        PHP_BATCH.labels(result="fallback").inc()
+        await asyncio.gather(*(
+            self._resolve_one(future, self._send(url, payload))
+            for future, payload in zip(batch.futures, batch.payloads)
+        ))
+
+    @staticmethod
+    async def _resolve_one(future: asyncio.Future, call: Awaitable[dict[str, Any]]) -> None:
+        try:
+            result = await call
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+
+def _fail_all(batch: _Batch, exc: BaseException) -> None:
+    for future in batch.futures:
+        if not future.done():
+            future.set_exception(exc)
+
+
+__all__ = ["PostBatcher", "PostFn"]
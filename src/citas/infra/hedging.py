@@ -0,0 +1,84 @@
+"""
+Hedging de lecturas idempotentes: si la respuesta tarda más que el p95 habitual de
+ese codOpe, se manda un segundo request idéntico y gana el primero que responda
+bien; el otro se cancela.
+
+La carga extra se acota con un presupuesto por upstream (HedgeBudget): cada request
+suma HEDGE_BUDGET_PERCENT/100 de crédito y cada hedge gasta 1, con un tope de
+crédito acumulado. Con HEDGE_BUDGET_PERCENT=5, como mucho ~5% de requests de más
+aunque el backend entero se ponga lento (ahí el hedge ya no ayuda y solo sumaría carga).
+
+Solo para operaciones de LECTURA: el backend puede recibir el request dos veces.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+# Crédito máximo acumulable: hedges seguidos permitidos tras un rato tranquilo
+_MAX_TOKENS = 10.0
+
+
+class HedgeBudget:
+    """Presupuesto de hedges de un upstream (token bucket alimentado por requests)."""
+
+    __slots__ = ("_ratio", "_tokens")
+
+    def __init__(self, ratio: float) -> None:
+        self._ratio = ratio
+        self._tokens = 0.0
+
+    def on_request(self) -> None:
+        self._tokens = min(_MAX_TOKENS, self._tokens + self._ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+async def hedged(
+    call: Callable[[], Awaitable[Any]],
+    delay: float,
+    budget: HedgeBudget,
+    on_event: Callable[[str], None],
+) -> Any:
+    """
+    Ejecuta `call()`; si no terminó en `delay` segundos y hay presupuesto, lanza una
+    segunda `call()` y retorna el primer resultado exitoso. Si ambas fallan se propaga
+    el error de la primera.
+
+    on_event recibe "sent" (se lanzó el hedge), "won" (el hedge respondió primero)
+    o "budget_exhausted" (hacía falta pero no había presupuesto).
+    """
+    primary = asyncio.ensure_future(call())
+    hedge: asyncio.Future | None = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+        if not budget.try_spend():
+            on_event("budget_exhausted")
+            return await primary
+        on_event("sent")
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        on_event("won")
+                    return task.result()
+        return primary.result()  # ambas fallaron: error del request original
+    finally:
+        for task in (primary, hedge):
+            if task is None:
+                continue
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()  # marcar como recuperada (sin warning "never retrieved")
+
+
+__all__ = ["HedgeBudget", "hedged"]
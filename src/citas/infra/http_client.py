@@ -1,63 +1,372 @@
 """
-Cliente HTTP compartido para todos los servicios de agent_citas.
+Clientes HTTP compartidos para todos los servicios de agent_citas.
 
-Inicialización lazy: el cliente se crea en la primera llamada a get_client()
-y se cierra limpiamente en el lifespan del servidor MCP (close_http_client).
-Esto permite reutilizar el connection pool entre todas las llamadas a las APIs
-de MaravIA (informacion, agendar_reunion, calendario).
+Hay un httpx.AsyncClient (connection pool) por API PHP: ws_informacion_ia,
+ws_calendario, ws_agendar_reunion y ws_preguntas_frecuentes, cada uno con su propio
+límite de conexiones y read timeout (HTTP_<API>_MAX_CONNECTIONS, HTTP_<API>_TIMEOUT).
+Así un ws_informacion_ia.php lento puede agotar su pool, pero CREAR_EVENTO sigue
+teniendo conexiones en el de ws_calendario. Una URL que no es ninguna de las
+configuradas usa un pool "default" (HTTP_MAX_CONNECTIONS, API_TIMEOUT).
+
+Los clientes se crean en el arranque (warm_http_client, desde el lifespan; si no, en
+la primera llamada a get_client(url)) y se cierran en el lifespan (close_http_client).
+
+Conexiones:
+  - HTTP2_ENABLED: multiplexa los requests a un mismo host sobre una conexión
+    (requiere el extra `http2`, paquete h2; sin él se usa HTTP/1.1 y se loguea un warning).
+  - warm_http_client abre HTTP_WARM_CONNECTIONS conexiones por pool al arrancar
+    (HEAD a la raíz del host de su API) y, con HTTP_WARM_INTERVAL_SECONDS, las renueva
+    periódicamente para que una ráfaga tras un rato sin tráfico no pague TCP+TLS.
+  - HTTP_KEEPALIVE_EXPIRY: cuánto se guarda una conexión ociosa; debe ser menor que
+    el keep-alive del servidor PHP para no reutilizar conexiones que él ya cerró.
+  - Cada request exporta la espera por una conexión del pool y, si abrió una
+    conexión nueva, cuánto tardó TCP+TLS (citas_http_pool_wait_seconds,
+    citas_http_connect_seconds; label upstream = nombre del .php = pool). Además,
+    por pool: requests en curso, límite y PoolTimeouts (citas_http_pool_*).
 
 post_with_retry: wrapper con retry automático (tenacity) para operaciones de
 LECTURA. No usar en operaciones de escritura (CREAR_EVENTO) por riesgo de
 duplicados si el servidor recibió la request pero la respuesta timeouteó.
+
+Con HEDGE_ENABLED, cada intento de una lectura de HEDGE_COD_OPES que tarda más que
+el p95 (HEDGE_QUANTILE) de su (upstream, codOpe) lanza un segundo request y usa el
+que responda primero, dentro de un presupuesto por upstream (hedging.py). La
+latencia de cada respuesta exitosa alimenta esas ventanas (latency.py); cuando gana
+el hedge, el original cancelado suma lo que ya había esperado como muestra censurada
+(su latencia real es al menos eso), así los hedges no bajan el p95 que los dispara.
+
+Con ADAPTIVE_TIMEOUT_ENABLED, las mismas ventanas fijan el read timeout de cada
+lectura (cuantil × ADAPTIVE_TIMEOUT_MULTIPLIER, entre el piso y el timeout fijo del
+pool) y la espera entre reintentos (p50 × 2^intento, entre el piso y
+HTTP_RETRY_WAIT_MAX). El piso es el mayor entre el absoluto
+(ADAPTIVE_TIMEOUT_FLOOR_SECONDS / ADAPTIVE_RETRY_WAIT_MIN_MS) y el valor fijo ×
+ADAPTIVE_TIMEOUT_MIN_FRACTION: las muestras censuradas (timeouts, hedges perdidos)
+acotan la latencia por abajo, y sin ese piso una ventana dominada por respuestas
+rápidas podría dejar el timeout muy por debajo del fijo. Una llamada colgada falla en
+segundos en vez de esperar el timeout completo en cada intento. Sin muestras
+suficientes se usan los valores fijos. Los cuantiles y timeouts vigentes se
+exportan en /metrics (citas_http_latency_quantile_seconds,
+citas_http_adaptive_timeout_seconds).
+
+Con PHP_BATCH_ENABLED, post_with_logging agrupa las lecturas de datos del prompt a
+ws_informacion_ia.php de una misma empresa en un POST multi-operación (batching.py).
 """
 
+import asyncio
+import contextvars
+import functools
 import json
 import logging
-from typing import Any
+import time
+from typing import Any, NamedTuple
+from urllib.parse import urlsplit
 
 import httpx
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from tenacity import RetryCallState, retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from .. import config as app_config
 from ..logger import get_logger
+from ..metrics import (
+    HTTP_ADAPTIVE_TIMEOUTS,
+    HTTP_CONNECT,
+    HTTP_HEDGE,
+    HTTP_POOL_IN_USE,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_TIMEOUTS,
+    HTTP_POOL_WAIT,
+    UPSTREAM_LATENCY,
+)
+from ..recording import record_php_call
+from ..timing import track_phase
+from ..tracing import start_span, trace_headers
+from .batching import PostBatcher, PostFn
+from .hedging import HedgeBudget, hedged
+from .latency import LatencyTracker
 
 logger = get_logger(__name__)
 
-_client: httpx.AsyncClient | None = None
-
-
-def get_client() -> httpx.AsyncClient:
-    """Devuelve el cliente HTTP compartido; lo crea en la primera llamada (lazy init)."""
-    global _client
-    if _client is None:
-        _client = httpx.AsyncClient(
-            timeout=httpx.Timeout(
-                connect=5.0,
-                read=app_config.API_TIMEOUT,
-                write=5.0,
-                pool=2.0,
-            ),
-            limits=httpx.Limits(
-                max_connections=app_config.HTTP_MAX_CONNECTIONS,
-                max_keepalive_connections=app_config.HTTP_MAX_KEEPALIVE,
-                keepalive_expiry=30.0,
-            ),
-            headers={"Content-Type": "application/json", "Accept": "application/json"},
-        )
-    return _client
+_DEFAULT_POOL = "default"
+
+# Un cliente (connection pool) por upstream; ver _pool_specs
+_clients: dict[str, httpx.AsyncClient] = {}
+
+# Latencia de respuestas exitosas por (upstream, codOpe) y presupuesto de hedges por upstream
+_latencies = LatencyTracker()
+_hedge_budgets: dict[str, HedgeBudget] = {}
+
+# Cuantiles exportados en citas_http_latency_quantile_seconds
+_EXPORTED_QUANTILES = (0.5, 0.95, 0.99)
+
+# Lecturas que se piden juntas al construir el agente (mismo id_empresa, misma URL)
+_BATCHABLE_COD_OPES = frozenset({
+    "OBTENER_HORARIO_REUNIONES",
+    "OBTENER_PRODUCTOS_CITAS",
+    "OBTENER_SERVICIOS_CITAS",
+    "OBTENER_CONTEXTO_NEGOCIO",
+    "OBTENER_FUNCIONES_ESPECIALES",
+})
+
+_batcher: PostBatcher | None = None
+
+
+_warm_task: asyncio.Task | None = None
+
+# Eventos de httpcore que marcan el fin de la espera por una conexión del pool
+_CONNECTION_ACQUIRED = frozenset({
+    "connection.connect_tcp.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+})
+_SEND_STARTED = frozenset({"http11.send_request_headers.started", "http2.send_request_headers.started"})
+_CONNECT_DONE = frozenset({"connection.connect_tcp.complete", "connection.start_tls.complete"})
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=64)
+def upstream_name(url: str) -> str:
+    """Nombre corto del endpoint para labels: ".../ws_informacion_ia.php" → "ws_informacion_ia"."""
+    path = urlsplit(url).path.rstrip("/")
+    name = path.rsplit("/", 1)[-1]
+    return name.removesuffix(".php") or urlsplit(url).hostname or "unknown"
+
+
+class _ConnectionTrace:
+    """Callback `trace` de httpx: espera por conexión del pool y tiempo de conexión nueva."""
+
+    __slots__ = ("_upstream", "_started", "_acquired", "_connect_started", "_connect_done")
+
+    def __init__(self, upstream: str) -> None:
+        self._upstream = upstream
+        self._started = time.perf_counter()
+        self._acquired = False
+        self._connect_started = 0.0
+        self._connect_done = 0.0
+
+    async def __call__(self, event_name: str, info: dict[str, Any]) -> None:
+        if event_name in _CONNECTION_ACQUIRED and not self._acquired:
+            self._acquired = True
+            HTTP_POOL_WAIT.labels(upstream=self._upstream).observe(time.perf_counter() - self._started)
+        if event_name == "connection.connect_tcp.started":
+            self._connect_started = time.perf_counter()
+        elif event_name in _CONNECT_DONE:
+            self._connect_done = time.perf_counter()
+        elif event_name in _SEND_STARTED and self._connect_started and self._connect_done:
+            HTTP_CONNECT.labels(upstream=self._upstream).observe(self._connect_done - self._connect_started)
+            self._connect_started = 0.0
+
+
+def request_extensions(url: str) -> dict[str, Any]:
+    """Extensiones httpx por request (métricas de pool y conexión). Pasar a client.post(extensions=...)."""
+    return {"trace": _ConnectionTrace(upstream_name(url))}
+
+
+class _PoolSpec(NamedTuple):
+    url: str
+    max_connections: int
+    read_timeout: float
+
+
+def _pool_specs() -> dict[str, _PoolSpec]:
+    """Pool por upstream (nombre del .php) con su límite de conexiones y read timeout."""
+    specs = (
+        _PoolSpec(app_config.API_INFORMACION_URL, app_config.HTTP_INFORMACION_MAX_CONNECTIONS,
+                  app_config.HTTP_INFORMACION_TIMEOUT),
+        _PoolSpec(app_config.API_CALENDAR_URL, app_config.HTTP_CALENDAR_MAX_CONNECTIONS,
+                  app_config.HTTP_CALENDAR_TIMEOUT),
+        _PoolSpec(app_config.API_AGENDAR_REUNION_URL, app_config.HTTP_AGENDAR_REUNION_MAX_CONNECTIONS,
+                  app_config.HTTP_AGENDAR_REUNION_TIMEOUT),
+        _PoolSpec(app_config.API_PREGUNTAS_FRECUENTES_URL, app_config.HTTP_PREGUNTAS_FRECUENTES_MAX_CONNECTIONS,
+                  app_config.HTTP_PREGUNTAS_FRECUENTES_TIMEOUT),
+    )
+    return {upstream_name(spec.url): spec for spec in specs}
+
+
+@functools.lru_cache(maxsize=64)
+def pool_name(url: str | None) -> str:
+    """Pool que atiende `url`: el de su upstream si es una API configurada, si no "default"."""
+    if url is None:
+        return _DEFAULT_POOL
+    name = upstream_name(url)
+    return name if name in _pool_specs() else _DEFAULT_POOL
+
+
+def _read_timeout(pool: str) -> float:
+    """Read timeout fijo del pool (techo del timeout adaptativo)."""
+    spec = _pool_specs().get(pool)
+    return spec.read_timeout if spec else app_config.API_TIMEOUT
+
+
+def _new_client(pool: str) -> httpx.AsyncClient:
+    spec = _pool_specs().get(pool)
+    max_connections = spec.max_connections if spec else app_config.HTTP_MAX_CONNECTIONS
+    http2 = app_config.HTTP2_ENABLED and _http2_available()
+    if app_config.HTTP2_ENABLED and not http2 and not _clients:
+        logger.warning("[HTTP] HTTP2_ENABLED sin el paquete h2 (pip install .[http2]); se usa HTTP/1.1")
+    HTTP_POOL_LIMIT.labels(upstream=pool).set(max_connections)
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(
+            connect=5.0,
+            read=_read_timeout(pool),
+            write=5.0,
+            pool=app_config.HTTP_POOL_TIMEOUT,
+        ),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(app_config.HTTP_MAX_KEEPALIVE, max_connections),
+            keepalive_expiry=app_config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        headers={"Content-Type": "application/json", "Accept": "application/json"},
+    )
+
+
+def get_client(url: str | None = None) -> httpx.AsyncClient:
+    """Cliente (pool) del upstream de `url`; lo crea en la primera llamada si el arranque no lo hizo."""
+    pool = pool_name(url)
+    client = _clients.get(pool)
+    if client is None:
+        client = _clients[pool] = _new_client(pool)
+    return client
+
+
+async def send_post(url: str, payload: dict[str, Any], read_timeout: float | None = None) -> httpx.Response:
+    """
+    POST JSON por el pool del upstream de `url`, con métricas de pool y traceparent.
+    No reintenta ni valida el status: base de post_with_retry y de las escrituras
+    (CREAR_EVENTO), que llaman raise_for_status() por su cuenta.
+    read_timeout reemplaza el read timeout del pool solo para este request.
+    """
+    pool = pool_name(url)
+    timeout = (
+        httpx.USE_CLIENT_DEFAULT if read_timeout is None
+        else httpx.Timeout(connect=5.0, read=read_timeout, write=5.0, pool=app_config.HTTP_POOL_TIMEOUT)
+    )
+    try:
+        with HTTP_POOL_IN_USE.labels(upstream=pool).track_inprogress():
+            return await get_client(url).post(
+                url, json=payload, headers=trace_headers(), extensions=request_extensions(url), timeout=timeout,
+            )
+    except httpx.PoolTimeout:
+        HTTP_POOL_TIMEOUTS.labels(upstream=pool).inc()
+        logger.warning("[HTTP] Pool %s sin conexiones libres (PoolTimeout)", pool)
+        raise
+
+
+def _warm_targets() -> list[tuple[str, str]]:
+    """(url de la API, raíz de su host) por cada pool configurado."""
+    targets = []
+    for spec in _pool_specs().values():
+        parts = urlsplit(spec.url)
+        if parts.netloc:
+            targets.append((spec.url, f"{parts.scheme}://{parts.netloc}/"))
+    return targets
+
+
+async def _open_connections() -> None:
+    # Con HTTP/2 una conexión por pool alcanza: los requests se multiplexan sobre ella
+    per_pool = 1 if app_config.HTTP2_ENABLED else app_config.HTTP_WARM_CONNECTIONS
+    targets = _warm_targets()
+    results = await asyncio.gather(
+        *(
+            get_client(url).head(origin, timeout=5.0, extensions=request_extensions(url))
+            for url, origin in targets
+            for _ in range(per_pool)
+        ),
+        return_exceptions=True,
+    )
+    failed = sum(isinstance(r, Exception) for r in results)
+    logger.debug(
+        "[HTTP] Conexiones precalentadas: %s pools x %s (%s fallidas)", len(targets), per_pool, failed,
+    )
+
+
+async def _warm_loop() -> None:
+    await _open_connections()
+    while app_config.HTTP_WARM_INTERVAL_SECONDS > 0:
+        await asyncio.sleep(app_config.HTTP_WARM_INTERVAL_SECONDS)
+        await _open_connections()
+
+
+def warm_http_client() -> None:
+    """
+    Crea los clientes ya en el arranque y abre conexiones de cada pool en segundo plano
+    (no bloquea el arranque si algún host no responde). Llamar en el lifespan.
+    """
+    global _warm_task
+    for spec in _pool_specs().values():
+        get_client(spec.url)
+    if app_config.HTTP_WARM_CONNECTIONS <= 0 or _warm_task is not None:
+        return
+    # Contexto vacío: el precalentamiento no pertenece a ningún request (timing, grabación)
+    _warm_task = asyncio.create_task(_warm_loop(), context=contextvars.Context())
 
 
 async def close_http_client() -> None:
-    """Cierra el cliente HTTP compartido. Llamar en el teardown del servidor (lifespan)."""
-    global _client
-    if _client is not None:
-        await _client.aclose()
-        _client = None
+    """Cierra los clientes HTTP de todos los pools. Llamar en el teardown del servidor (lifespan)."""
+    global _warm_task, _batcher
+    if _warm_task is not None:
+        _warm_task.cancel()
+        await asyncio.gather(_warm_task, return_exceptions=True)
+        _warm_task = None
+    if _batcher is not None:
+        await _batcher.close()
+        _batcher = None
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(client.aclose() for client in clients))
+
+
+def _adaptive_timeout(pool: str, cod_ope: str | None) -> float | None:
+    """Read timeout según la latencia observada, o None (timeout fijo del pool)."""
+    if not app_config.ADAPTIVE_TIMEOUT_ENABLED:
+        return None
+    observed = _latencies.quantile((pool, cod_ope), app_config.ADAPTIVE_TIMEOUT_QUANTILE)
+    if observed is None:
+        return None
+    static = _read_timeout(pool)
+    floor = max(app_config.ADAPTIVE_TIMEOUT_FLOOR_SECONDS, static * app_config.ADAPTIVE_TIMEOUT_MIN_FRACTION)
+    return min(max(observed * app_config.ADAPTIVE_TIMEOUT_MULTIPLIER, floor), static)
+
+
+_static_retry_wait = wait_exponential(min=app_config.HTTP_RETRY_WAIT_MIN, max=app_config.HTTP_RETRY_WAIT_MAX)
+
+
+def _retry_wait(retry_state: RetryCallState) -> float:
+    """Espera antes del reintento: p50 observado × 2^intento si hay datos, si no la fija."""
+    if app_config.ADAPTIVE_TIMEOUT_ENABLED:
+        url = retry_state.args[0] if retry_state.args else retry_state.kwargs.get("url")
+        payload = retry_state.args[1] if len(retry_state.args) > 1 else retry_state.kwargs.get("payload", {})
+        typical = _latencies.quantile((pool_name(url), payload.get("codOpe")), 0.5)
+        if typical is not None:
+            wait = typical * 2 ** (retry_state.attempt_number - 1)
+            floor = max(
+                app_config.ADAPTIVE_RETRY_WAIT_MIN_MS / 1000,
+                app_config.HTTP_RETRY_WAIT_MIN * app_config.ADAPTIVE_TIMEOUT_MIN_FRACTION,
+            )
+            return min(max(wait, floor), app_config.HTTP_RETRY_WAIT_MAX)
+    return _static_retry_wait(retry_state)
+
+
+def _latency_snapshot():
+    """Fuente de UPSTREAM_LATENCY: cuantiles y timeout vigente por (upstream, codOpe)."""
+    for (pool, cod_ope), window in _latencies.windows():
+        values = {q: window.quantile(q) for q in _EXPORTED_QUANTILES}
+        yield pool, cod_ope or "", values, _adaptive_timeout(pool, cod_ope)
+
+
+UPSTREAM_LATENCY.set_source(_latency_snapshot)
 
 
 @retry(
     stop=stop_after_attempt(app_config.HTTP_RETRY_ATTEMPTS),
-    wait=wait_exponential(min=app_config.HTTP_RETRY_WAIT_MIN, max=app_config.HTTP_RETRY_WAIT_MAX),
+    wait=_retry_wait,
     retry=retry_if_exception_type(httpx.TransportError),
     reraise=True,
 )
@@ -70,16 +379,76 @@ async def post_with_retry(url: str, payload: dict[str, Any]) -> dict[str, Any]:
       HTTP_RETRY_WAIT_MIN  (default 1s)
       HTTP_RETRY_WAIT_MAX  (default 4s)
 
-    Reintenta solo httpx.TransportError (timeouts, connect errors).
+    Reintenta solo httpx.TransportError (timeouts, connect errors, PoolTimeout).
     NO reintenta httpx.HTTPStatusError (respuestas 4xx/5xx del servidor).
+    Con HEDGE_ENABLED, cada intento puede ir con hedge (ver _hedge_delay).
+    Con ADAPTIVE_TIMEOUT_ENABLED, read timeout y espera salen de la latencia
+    observada (ver _adaptive_timeout y _retry_wait).
 
     ADVERTENCIA: usar solo en operaciones de LECTURA idempotentes.
     Para escrituras (ej. CREAR_EVENTO) usar client.post() directamente.
     """
-    client = get_client()
-    response = await client.post(url, json=payload)
+    pool = pool_name(url)
+    budget = _hedge_budgets.get(pool)
+    if budget is None:
+        budget = _hedge_budgets[pool] = HedgeBudget(app_config.HEDGE_BUDGET_PERCENT / 100)
+    budget.on_request()
+    key = (pool, payload.get("codOpe"))
+    delay = _hedge_delay(*key)
+    if delay is None:
+        return await _post_once(url, payload)
+    start = time.perf_counter()
+
+    def on_event(result: str) -> None:
+        HTTP_HEDGE.labels(upstream=pool, result=result).inc()
+        if result == "won":
+            # El original pierde y se cancela sin latencia propia: muestra censurada con lo
+            # que ya esperó (si no, el p95 solo vería las respuestas rápidas y bajaría)
+            _latencies.observe(key, time.perf_counter() - start)
+
+    return await hedged(lambda: _post_once(url, payload), delay, budget, on_event)
+
+
+def _hedge_delay(pool: str, cod_ope: str | None) -> float | None:
+    """Espera antes del hedge (cuantil observado, con piso), o None si no corresponde."""
+    if not app_config.HEDGE_ENABLED or cod_ope not in app_config.HEDGE_COD_OPES:
+        return None
+    observed = _latencies.quantile((pool, cod_ope), app_config.HEDGE_QUANTILE)
+    if observed is None:
+        return None
+    return max(observed, app_config.HEDGE_MIN_DELAY_MS / 1000)
+
+
+async def _post_once(url: str, payload: dict[str, Any]) -> dict[str, Any]:
+    """Un request: POST, status y JSON. Registra la latencia si fue exitoso."""
+    pool = pool_name(url)
+    key = (pool, payload.get("codOpe"))
+    read_timeout = _adaptive_timeout(*key)
+    start = time.perf_counter()
+    try:
+        response = await send_post(url, payload, read_timeout)
+    except httpx.ReadTimeout:
+        if read_timeout is not None:
+            HTTP_ADAPTIVE_TIMEOUTS.labels(upstream=pool).inc()
+            # Muestra censurada: si el backend se volvió más lento, el timeout sube solo
+            _latencies.observe(key, read_timeout)
+        raise
     response.raise_for_status()
-    return response.json()
+    data = response.json()
+    _latencies.observe(key, time.perf_counter() - start)
+    return data
+
+
+def _get_batcher() -> PostBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = PostBatcher(
+            post_with_retry,
+            cod_ope=app_config.PHP_BATCH_COD_OPE,
+            window_seconds=app_config.PHP_BATCH_WINDOW_MS / 1000,
+            max_ops=app_config.PHP_BATCH_MAX_OPS,
+        )
+    return _batcher
 
 
 async def post_with_logging(url: str, payload: dict[str, Any]) -> dict[str, Any]:
@@ -91,14 +460,42 @@ async def post_with_logging(url: str, payload: dict[str, Any]) -> dict[str, Any]
     - Loguea warnings en HTTPStatusError y TransportError (ya los maneja tenacity,
       pero el log queda visible antes del CB).
     - Propaga todas las excepciones sin modificarlas.
+    - Con tracing activo abre el span php.post (atributo cod_ope) y propaga traceparent.
+    - Con grabación activa (recording.py) registra payload y respuesta para replay.
+
+    - Con PHP_BATCH_ENABLED, las lecturas de datos del prompt a API_INFORMACION_URL
+      se agrupan por empresa en un POST multi-operación (ver batching.py).
 
     ADVERTENCIA: usar solo en operaciones de LECTURA idempotentes (igual que post_with_retry).
     """
+    if (
+        app_config.PHP_BATCH_ENABLED
+        and payload.get("codOpe") in _BATCHABLE_COD_OPES
+        and url == app_config.API_INFORMACION_URL
+    ):
+        # Timing, span y grabación en el contexto de cada llamador; el POST agrupado
+        # corre en el contexto vacío del lote y no pertenece a ningún request.
+        return await _post_logged(url, payload, _get_batcher().submit)
+    return await _post_logged(url, payload)
+
+
+async def _post_logged(
+    url: str,
+    payload: dict[str, Any],
+    send: PostFn = post_with_retry,
+) -> dict[str, Any]:
+    """POST con logging, timing, tracing y grabación (cuerpo de post_with_logging)."""
     cod_ope = payload.get("codOpe", "")
     if logger.isEnabledFor(logging.DEBUG):
         logger.debug("[API] POST %s - %s", url, json.dumps(payload, ensure_ascii=False))
     try:
-        data = await post_with_retry(url, payload)
+        start = time.perf_counter()
+        with (
+            track_phase("php_call", cod_ope),
+            start_span("php.post", kind="client", cod_ope=cod_ope, **{"url.full": url}),
+        ):
+            data = await send(url, payload)
+        record_php_call(cod_ope, payload, data, time.perf_counter() - start)
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug("[API] Response (codOpe=%s): %s", cod_ope, json.dumps(data, ensure_ascii=False))
         return data
@@ -114,4 +511,13 @@ async def post_with_logging(url: str, payload: dict[str, Any]) -> dict[str, Any]
         raise
 
 
-__all__ = ["get_client", "close_http_client", "post_with_retry", "post_with_logging"]
+__all__ = [
+    "get_client",
+    "pool_name",
+    "send_post",
+    "warm_http_client",
+    "close_http_client",
+    "upstream_name",
+    "post_with_retry",
+    "post_with_logging",
+]
@@ -0,0 +1,80 @@
+"""
+Latencia observada de las APIs PHP por (upstream, codOpe).
+
+Cada clave guarda una ventana deslizante con las últimas N latencias de respuestas
+exitosas; los cuantiles (p50, p95, p99) se calculan sobre esa ventana ordenada, y
+el orden se cachea hasta la siguiente observación. Con menos de `min_samples`
+muestras el cuantil es None: quien lo usa (hedging, timeouts adaptativos) sigue
+con su comportamiento por defecto hasta tener datos.
+"""
+
+from collections import deque
+from typing import Hashable, Iterator
+
+from cachetools import LRUCache
+
+
+class LatencyWindow:
+    """Últimas `size` latencias (segundos) de una clave."""
+
+    __slots__ = ("_samples", "_sorted")
+
+    def __init__(self, size: int) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._sorted: list[float] | None = None
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def quantile(self, q: float) -> float:
+        """Cuantil `q` (0-1) de la ventana. La ventana no debe estar vacía."""
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class LatencyTracker:
+    """
+    Ventanas de latencia por clave (acotadas por LRU).
+
+    Args:
+        window: muestras que guarda cada clave.
+        min_samples: muestras mínimas para reportar un cuantil.
+        max_keys: claves distintas como máximo (las menos usadas se descartan).
+    """
+
+    def __init__(self, window: int = 256, min_samples: int = 20, max_keys: int = 512) -> None:
+        self._window = window
+        self._min_samples = min_samples
+        self._windows: LRUCache = LRUCache(maxsize=max_keys)
+
+    def observe(self, key: Hashable, seconds: float) -> None:
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = LatencyWindow(self._window)
+        window.observe(seconds)
+
+    def quantile(self, key: Hashable, q: float) -> float | None:
+        """Cuantil `q` de la clave, o None si todavía no hay muestras suficientes."""
+        window = self._windows.get(key)
+        if window is None or len(window) < self._min_samples:
+            return None
+        return window.quantile(q)
+
+    def windows(self) -> Iterator[tuple[Hashable, LatencyWindow]]:
+        """(clave, ventana) de las claves con muestras suficientes (para exportar métricas)."""
+        # Recorre en orden LRU y toca cada clave una vez: el orden relativo no cambia
+        for key in list(self._windows):
+            window = self._windows.get(key)
+            if window is not None and len(window) >= self._min_samples:
+                yield key, window
+
+    def clear(self) -> None:
+        self._windows.clear()
+
+
+__all__ = ["LatencyWindow", "LatencyTracker"]
@@ -0,0 +1,61 @@
+"""
+Pool de threads para pasos CPU pesados del request path.
+
+Algunos pasos son trabajo síncrono puro (compilar el grafo en create_agent, renderizar
+el system prompt, limpiar HTML de descripciones largas). Ejecutados en el event loop
+congelan todas las conversaciones en curso mientras duran; en un thread, el loop sigue
+atendiendo I/O de los demás requests (el GIL se alterna cada pocos ms).
+
+No da paralelismo real de CPU: el objetivo es latencia de cola, no throughput.
+
+CPU_OFFLOAD_WORKERS=0 ejecuta todo inline (comportamiento original).
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from .. import config as app_config
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app_config.CPU_OFFLOAD_WORKERS,
+            thread_name_prefix="citas-cpu",
+        )
+    return _executor
+
+
+async def run_cpu_bound(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Ejecuta func(*args, **kwargs) en el pool de CPU y espera el resultado.
+
+    Copia el contexto (trace_id, timing, span activo) al thread. Con
+    CPU_OFFLOAD_WORKERS=0 llama a func directamente en el loop.
+    """
+    if app_config.CPU_OFFLOAD_WORKERS <= 0:
+        return func(*args, **kwargs)
+    ctx = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), functools.partial(ctx.run, func, *args, **kwargs)
+    )
+
+
+def shutdown_cpu_pool() -> None:
+    """Cierra el pool de CPU. Llamar en el teardown del servidor (lifespan)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+__all__ = ["run_cpu_bound", "shutdown_cpu_pool"]
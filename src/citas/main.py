@@ -6,23 +6,35 @@ Versión mejorada con logging, métricas y observabilidad.
 """
 
 import asyncio
+import contextlib
 import logging
+import threading
 import time
 import uuid
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import Depends, FastAPI, Header, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
 from prometheus_client import make_asgi_app
 
 from . import config as app_config, __version__
 from .agent import process_cita_message, init_checkpointer, close_checkpointer
 from .logger import setup_logging, get_logger, trace_id
 from .metrics import initialize_agent_info, HTTP_REQUESTS, HTTP_DURATION
-from .infra import close_http_client
+from .infra import close_http_client, warm_http_client, run_cpu_bound, shutdown_cpu_pool
 from .config import get_health_issues
+from .fast_json import ORJSONRoute, json_response
+from .services.catalogo_index import shutdown_catalog_index
+from .services.catalogo_snapshot import shutdown_catalog_snapshot
 from .schemas import ChatRequest, ChatResponse
+from .recording import configure_recording, close_recording, start_recording, finish_recording
+from .timing import start_request_timing, log_request_timing
+from .tracing import init_tracing, shutdown_tracing, start_span, annotate_current_span
+from .profiling import (
+    sample_stacks, format_collapsed, monitor_event_loop_lag,
+    install_slow_callback_detector, uninstall_slow_callback_detector,
+)
 
 # Configurar logging antes de cualquier otra cosa
 log_level = getattr(logging, app_config.LOG_LEVEL.upper(), logging.INFO)
@@ -36,19 +48,44 @@ logger = get_logger(__name__)
 # Inicializar información del agente para métricas
 initialize_agent_info(model=app_config.OPENAI_MODEL, version=__version__)
 
+# Tracing OpenTelemetry opcional (no-op si está desactivado o falta el extra `tracing`)
+_tracing_active = app_config.OTEL_ENABLED and init_tracing(
+    service_name=app_config.OTEL_SERVICE_NAME,
+    exporter=app_config.OTEL_EXPORTER,
+    export_file=app_config.OTEL_EXPORTER_FILE,
+)
+
 
 # ---------------------------------------------------------------------------
-# Lifespan (cierra el cliente HTTP compartido al apagar)
+# Lifespan (precalienta el cliente HTTP compartido al arrancar y lo cierra al apagar)
 # ---------------------------------------------------------------------------
 
 @asynccontextmanager
 async def app_lifespan(app: FastAPI):
     await init_checkpointer()
+    if app_config.CONVERSATION_RECORD_FILE:
+        configure_recording(app_config.CONVERSATION_RECORD_FILE, app_config.CONVERSATION_RECORD_SAMPLE_RATE)
+    warm_http_client()
+    if app_config.SLOW_CALLBACK_THRESHOLD_MS > 0:
+        install_slow_callback_detector(app_config.SLOW_CALLBACK_THRESHOLD_MS / 1000)
+    lag_task = None
+    if app_config.EVENT_LOOP_LAG_INTERVAL > 0:
+        lag_task = asyncio.create_task(monitor_event_loop_lag(app_config.EVENT_LOOP_LAG_INTERVAL))
     try:
         yield
     finally:
+        if lag_task is not None:
+            lag_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await lag_task
+        uninstall_slow_callback_detector()
         await close_checkpointer()
         await close_http_client()
+        await shutdown_catalog_index()
+        await shutdown_catalog_snapshot()
+        shutdown_cpu_pool()
+        shutdown_tracing()
+        close_recording()
 
 
 # ---------------------------------------------------------------------------
@@ -61,11 +98,31 @@ app = FastAPI(
     description="Agente especializado en gestión de citas y reuniones",
     version=__version__,
 )
+# Body JSON parseado con orjson (fast_json.py); aplica a las rutas declaradas abajo
+app.router.route_class = ORJSONRoute
 
 # Endpoint de métricas para Prometheus
 app.mount("/metrics", make_asgi_app())
 
 
+# Span server por request a /api/chat, hijo del `traceparent` que envía el gateway Go.
+# Solo se registra con tracing activo: sin él no se agrega middleware al request.
+if _tracing_active:
+    @app.middleware("http")
+    async def trace_chat_requests(request: Request, call_next):
+        if request.url.path != "/api/chat":
+            return await call_next(request)
+        with start_span(
+            "POST /api/chat",
+            kind="server",
+            carrier=dict(request.headers),
+            **{"http.request.method": request.method, "http.route": "/api/chat"},
+        ) as span:
+            response = await call_next(request)
+            span.set_attribute("http.response.status_code", response.status_code)
+            return response
+
+
 # ---------------------------------------------------------------------------
 # Auth inter-servicio (desactivable)
 # ---------------------------------------------------------------------------
@@ -79,12 +136,23 @@ async def verify_token(x_internal_token: str = Header(default=None)):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
+async def verify_debug_access(x_internal_token: str = Header(default=None)):
+    """Endpoints /debug/*: requieren DEBUG_PROFILER_ENABLED y token siempre (no desactivable)."""
+    if not app_config.DEBUG_PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = app_config.INTERNAL_API_TOKEN
+    if not token:
+        raise HTTPException(status_code=403, detail="INTERNAL_API_TOKEN no configurado")
+    if x_internal_token != token:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+
 # ---------------------------------------------------------------------------
 # Endpoint principal
 # ---------------------------------------------------------------------------
 
 @app.post("/api/chat", response_model=ChatResponse, dependencies=[Depends(verify_token)])
-async def chat(req: ChatRequest) -> ChatResponse:
+async def chat(req: ChatRequest) -> Response:
     """
     Agente especializado en citas / reuniones.
 
@@ -112,6 +180,13 @@ async def chat(req: ChatRequest) -> ChatResponse:
         JSON con campo reply: respuesta del agente
     """
     trace_id.set(uuid.uuid4().hex[:8])
+    timing = start_request_timing()
+    record = start_recording(req)
+    annotate_current_span(**{
+        "citas.trace_id": trace_id.get(),
+        "citas.session_id": req.session_id,
+        "citas.id_empresa": req.id_empresa,
+    })
     config = req.config
 
     logger.info("[HTTP] Mensaje recibido - Session: %s, Empresa: %s, Length: %s chars", req.session_id, req.id_empresa, len(req.message))
@@ -120,6 +195,7 @@ async def chat(req: ChatRequest) -> ChatResponse:
 
     _start = time.perf_counter()
     _http_status = "success"
+    response: ChatResponse | None = None
 
     try:
         reply, url = await asyncio.wait_for(
@@ -135,19 +211,22 @@ async def chat(req: ChatRequest) -> ChatResponse:
 
         logger.info("[HTTP] Respuesta generada - Length: %s chars", len(reply))
         logger.debug("[HTTP] Reply: %s...", reply[:200])
-        return ChatResponse(reply=reply, url=url)
+        response = ChatResponse(reply=reply, url=url)
+        return json_response(response)
 
     except asyncio.TimeoutError:
         _http_status = "timeout"
         error_msg = f"La solicitud tardó más de {app_config.CHAT_TIMEOUT}s. Por favor, intenta de nuevo."
         logger.error("[HTTP] Timeout en process_cita_message (CHAT_TIMEOUT=%s)", app_config.CHAT_TIMEOUT)
-        return ChatResponse(reply=error_msg, url=None)
+        response = ChatResponse(reply=error_msg, url=None)
+        return json_response(response)
 
     except ValueError as e:
         _http_status = "error"
         error_msg = f"Error de configuración: {str(e)}"
         logger.error("[HTTP] %s", error_msg)
-        return ChatResponse(reply=error_msg, url=None)
+        response = ChatResponse(reply=error_msg, url=None)
+        return json_response(response)
 
     except asyncio.CancelledError:
         _http_status = None  # No contar requests abortados externamente
@@ -157,12 +236,20 @@ async def chat(req: ChatRequest) -> ChatResponse:
         _http_status = "error"
         error_msg = f"Error procesando mensaje: {str(e)}"
         logger.error("[HTTP] %s", error_msg, exc_info=True)
-        return ChatResponse(reply=error_msg, url=None)
+        response = ChatResponse(reply=error_msg, url=None)
+        return json_response(response)
 
     finally:
         if _http_status is not None:
             HTTP_REQUESTS.labels(status=_http_status).inc()
             HTTP_DURATION.observe(time.perf_counter() - _start)
+        if app_config.REQUEST_TIMING_LOG:
+            log_request_timing(
+                timing, session_id=req.session_id, id_empresa=req.id_empresa, status=_http_status,
+            )
+        if record is not None and response is not None:
+            # Sanitizar y serializar el registro es CPU: fuera del loop
+            await run_cpu_bound(finish_recording, record, response.reply, response.url, _http_status)
 
 
 # ---------------------------------------------------------------------------
@@ -182,6 +269,37 @@ async def health():
     )
 
 
+# ---------------------------------------------------------------------------
+# Profiler por muestreo (diagnóstico en producción)
+# ---------------------------------------------------------------------------
+
+_profile_lock = asyncio.Lock()
+
+
+@app.get("/debug/profile", dependencies=[Depends(verify_debug_access)])
+async def debug_profile(seconds: float = 10.0, interval_ms: float = 10.0, all_threads: bool = False):
+    """
+    Perfila el proceso en vivo durante `seconds` y devuelve collapsed stacks
+    (flamegraph.pl / speedscope). Por default muestrea solo el thread del event loop;
+    all_threads=true incluye los workers de asyncio.to_thread.
+    """
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="Ya hay un profile en curso")
+    seconds = min(max(seconds, 0.1), app_config.DEBUG_PROFILER_MAX_SECONDS)
+    interval = min(max(interval_ms, 1.0), 1000.0) / 1000
+    thread_id = None if all_threads else threading.get_ident()
+
+    async with _profile_lock:
+        logger.info("[PROFILE] Muestreando %.1fs cada %.0fms (all_threads=%s)", seconds, interval * 1000, all_threads)
+        counts = await asyncio.to_thread(sample_stacks, seconds, interval, thread_id)
+
+    logger.info("[PROFILE] %s muestras, %s stacks distintos", sum(counts.values()), len(counts))
+    return PlainTextResponse(
+        format_collapsed(counts),
+        headers={"Content-Disposition": 'attachment; filename="citas-profile.collapsed"'},
+    )
+
+
 # ---------------------------------------------------------------------------
 # Entrypoint
 # ---------------------------------------------------------------------------
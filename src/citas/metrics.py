@@ -6,8 +6,10 @@ Expone contadores, histogramas e info estática para Prometheus.
 
 import time
 from contextlib import contextmanager
+from typing import Callable, Iterable
 
-from prometheus_client import Counter, Gauge, Histogram, Info
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, Info
+from prometheus_client.core import GaugeMetricFamily
 
 # ---------------------------------------------------------------------------
 # Info estática (versión, modelo)
@@ -61,6 +63,19 @@ LLM_DURATION = Histogram(
     buckets=[0.5, 1, 2, 5, 10, 20, 30, 60, 90],
 )
 
+MODEL_CALLS = Counter(
+    "citas_model_calls_total",
+    "Llamadas al modelo (cada round trip a OpenAI dentro de un ainvoke)",
+    ["status"],
+)
+
+MODEL_CALL_DURATION = Histogram(
+    "citas_model_call_duration_seconds",
+    "Latencia de cada llamada al modelo, sin tools ni checkpointer",
+    ["status"],
+    buckets=[0.25, 0.5, 1, 2, 3, 5, 10, 20, 30, 60],
+)
+
 CHAT_RESPONSE_DURATION = Histogram(
     "citas_chat_response_duration_seconds",
     "Latencia total del procesamiento de mensaje (lock + ainvoke + resultado)",
@@ -68,6 +83,19 @@ CHAT_RESPONSE_DURATION = Histogram(
     buckets=[0.1, 0.5, 1, 2, 5, 10, 20, 30, 60, 90],
 )
 
+# ---------------------------------------------------------------------------
+# Desglose por fase de cada request (timing.py)
+# ---------------------------------------------------------------------------
+
+REQUEST_PHASE_DURATION = Histogram(
+    "citas_request_phase_duration_seconds",
+    "Latencia de cada fase de un turno de chat",
+    ["phase"],
+    # semaphore_wait | session_lock_wait | agent_lookup | agent_build |
+    # llm_call | tool_call | php_call | checkpoint_io
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30],
+)
+
 # ---------------------------------------------------------------------------
 # Cache del agente (por empresa)
 # ---------------------------------------------------------------------------
@@ -78,6 +106,18 @@ AGENT_CACHE = Counter(
     ["result"],  # hit | miss
 )
 
+CONFIG_CACHE = Counter(
+    "citas_config_cache_total",
+    "CitasConfig reutilizados (hit) o validados (miss) por huella del payload",
+    ["result"],  # hit | miss
+)
+
+AGENT_CONTEXT_CACHE = Counter(
+    "citas_agent_context_cache_total",
+    "AgentContext reutilizados (hit) o construidos (miss) por (empresa, sesión, huella de config)",
+    ["result"],  # hit | miss
+)
+
 # ---------------------------------------------------------------------------
 # Tool calls
 # ---------------------------------------------------------------------------
@@ -118,6 +158,44 @@ API_CALL_DURATION = Histogram(
     buckets=[0.1, 0.25, 0.5, 1, 2.5, 5, 10],
 )
 
+HTTP_POOL_WAIT = Histogram(
+    "citas_http_pool_wait_seconds",
+    "Espera por una conexión del pool httpx antes de enviar el request",
+    ["upstream"],
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2],
+)
+
+HTTP_CONNECT = Histogram(
+    "citas_http_connect_seconds",
+    "Tiempo de apertura de una conexión nueva (TCP + TLS)",
+    ["upstream"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5],
+)
+
+HTTP_POOL_TIMEOUTS = Counter(
+    "citas_http_pool_timeouts_total",
+    "Requests que no consiguieron conexión libre en el pool de su upstream (PoolTimeout)",
+    ["upstream"],
+)
+
+HTTP_HEDGE = Counter(
+    "citas_http_hedge_total",
+    "Hedging de lecturas lentas (segundo request tras el p95 del codOpe)",
+    ["upstream", "result"],  # sent | won | budget_exhausted
+)
+
+HTTP_ADAPTIVE_TIMEOUTS = Counter(
+    "citas_http_adaptive_timeouts_total",
+    "Lecturas cortadas por el read timeout adaptativo (menor que el timeout fijo del pool)",
+    ["upstream"],
+)
+
+PHP_BATCH = Counter(
+    "citas_php_batch_total",
+    "Lotes de lecturas a ws_informacion_ia.php (PHP_BATCH_ENABLED)",
+    ["result"],  # batched | single | fallback
+)
+
 # ---------------------------------------------------------------------------
 # Cache de búsqueda de productos
 # ---------------------------------------------------------------------------
@@ -125,7 +203,31 @@ API_CALL_DURATION = Histogram(
 SEARCH_CACHE = Counter(
     "citas_search_cache_total",
     "Resultados del cache de búsqueda de productos",
-    ["result"],  # hit | miss | circuit_open
+    ["result"],  # hit | superset | miss | circuit_open
+)
+
+SEARCH_NEGATIVE_CACHE = Counter(
+    "citas_search_negative_cache_total",
+    "Búsquedas resueltas sin llamar a la API por el cache negativo o el backoff por empresa",
+    ["result"],  # hit | backoff
+)
+
+CATALOG_INDEX = Counter(
+    "citas_catalog_index_total",
+    "Búsquedas resueltas por el índice local del catálogo",
+    ["result"],  # hit | empty (ningún ítem pasa la regla de cobertura → API) | not_ready
+)
+
+CATALOG_INDEX_REFRESH = Counter(
+    "citas_catalog_index_refresh_total",
+    "Reconstrucciones del índice local del catálogo",
+    ["status"],  # ok | error
+)
+
+CATALOG_SNAPSHOT_REFRESH = Counter(
+    "citas_catalog_snapshot_refresh_total",
+    "Descargas del catálogo compartido por el system prompt y el índice local",
+    ["status"],  # changed | unchanged | partial | error
 )
 
 # ---------------------------------------------------------------------------
@@ -138,6 +240,110 @@ CACHE_ENTRIES = Gauge(
     ["cache_type"],
 )
 
+HTTP_POOL_IN_USE = Gauge(
+    "citas_http_pool_requests_in_flight",
+    "Requests en curso por pool de upstream (comparar con su límite de conexiones)",
+    ["upstream"],
+)
+
+HTTP_POOL_LIMIT = Gauge(
+    "citas_http_pool_max_connections",
+    "Límite de conexiones configurado para el pool de cada upstream",
+    ["upstream"],
+)
+
+# (upstream, codOpe, {cuantil: segundos}, read timeout adaptativo o None)
+LatencySource = Callable[[], Iterable[tuple[str, str, dict[float, float], float | None]]]
+
+
+class _UpstreamLatencyCollector:
+    """Cuantiles de latencia por (upstream, codOpe), calculados al momento del scrape."""
+
+    def __init__(self) -> None:
+        self._source: LatencySource | None = None
+
+    def set_source(self, source: LatencySource) -> None:
+        self._source = source
+
+    def collect(self):
+        quantiles = GaugeMetricFamily(
+            "citas_http_latency_quantile_seconds",
+            "Latencia de respuestas exitosas por upstream y codOpe (ventana de las últimas 256)",
+            labels=["upstream", "cod_ope", "quantile"],
+        )
+        timeouts = GaugeMetricFamily(
+            "citas_http_adaptive_timeout_seconds",
+            "Read timeout adaptativo vigente por upstream y codOpe",
+            labels=["upstream", "cod_ope"],
+        )
+        if self._source is not None:
+            for upstream, cod_ope, values, timeout in self._source():
+                for q, seconds in values.items():
+                    quantiles.add_metric([upstream, cod_ope, str(q)], seconds)
+                if timeout is not None:
+                    timeouts.add_metric([upstream, cod_ope], timeout)
+        yield quantiles
+        yield timeouts
+
+
+UPSTREAM_LATENCY = _UpstreamLatencyCollector()
+REGISTRY.register(UPSTREAM_LATENCY)
+
+EVENT_LOOP_SLOW_CALLBACKS = Counter(
+    "citas_event_loop_slow_callbacks_total",
+    "Callbacks del event loop que superaron SLOW_CALLBACK_THRESHOLD_MS",
+)
+
+EVENT_LOOP_LAG = Gauge(
+    "citas_event_loop_lag_seconds",
+    "Atraso del event loop en la última medición (trabajo síncrono bloqueando el loop)",
+)
+
+# ---------------------------------------------------------------------------
+# Checkpointer en memoria (modo sin Redis)
+# ---------------------------------------------------------------------------
+
+CHECKPOINT_MEMORY_BYTES = Gauge(
+    "citas_checkpoint_memory_bytes",
+    "Bytes serializados retenidos por el checkpointer en memoria",
+)
+
+CHECKPOINT_MEMORY_EVICTIONS = Counter(
+    "citas_checkpoint_memory_evictions_total",
+    "Threads evictados del checkpointer en memoria",
+    ["reason"],  # ttl | max_threads | max_bytes
+)
+
+# ---------------------------------------------------------------------------
+# Checkpointer Redis
+# ---------------------------------------------------------------------------
+
+CHECKPOINT_OP_DURATION = Histogram(
+    "citas_checkpoint_op_duration_seconds",
+    "Latencia de operaciones del checkpointer (cualquier backend)",
+    ["op"],  # get | list | put | put_writes
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5],
+)
+
+CHECKPOINT_SERIALIZED_BYTES = Histogram(
+    "citas_checkpoint_serialized_bytes",
+    "Bytes serializados/deserializados por operación del checkpointer",
+    ["op"],
+    buckets=[0, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304],
+)
+
+REDIS_CHECKPOINT_OPS = Counter(
+    "citas_redis_checkpoint_ops_total",
+    "Operaciones del checkpointer Redis",
+    ["op", "status"],  # op: get_tuple | list | put | put_writes | delete_thread
+)
+
+CHECKPOINT_HOT_CACHE = Counter(
+    "citas_checkpoint_hot_cache_total",
+    "Lecturas del cache local de checkpoints sobre Redis",
+    ["result"],  # hit | miss | stale
+)
+
 # ---------------------------------------------------------------------------
 # Tokens LLM
 # ---------------------------------------------------------------------------
@@ -237,6 +443,21 @@ def track_llm_call():
         LLM_DURATION.labels(status=status).observe(time.perf_counter() - start)
 
 
+@contextmanager
+def track_model_call():
+    """Context manager para medir una llamada al modelo (sin tools ni checkpointer)."""
+    status = "success"
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        MODEL_CALLS.labels(status=status).inc()
+        MODEL_CALL_DURATION.labels(status=status).observe(time.perf_counter() - start)
+
+
 @contextmanager
 def track_tool_execution(tool_name: str):
     """Context manager para trackear duración de ejecución de tools."""
@@ -275,6 +496,24 @@ def track_api_call(endpoint: str):
         API_CALLS.labels(endpoint=endpoint, status=status).inc()
 
 
+@contextmanager
+def track_redis_checkpoint_op(op: str):
+    """
+    Context manager para contar una operación del checkpointer Redis por resultado.
+
+    La latencia no se mide aquí: la registra InstrumentedCheckpointSaver en
+    citas_checkpoint_op_duration_seconds (una sola fuente para cualquier backend).
+    """
+    status = "success"
+    try:
+        yield
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        REDIS_CHECKPOINT_OPS.labels(op=op, status=status).inc()
+
+
 # ---------------------------------------------------------------------------
 # Funciones de utilidad
 # ---------------------------------------------------------------------------
@@ -309,6 +548,27 @@ def update_cache_stats(cache_type: str, count: int) -> None:
     CACHE_ENTRIES.labels(cache_type=cache_type).set(count)
 
 
+def record_checkpoint_eviction(reason: str) -> None:
+    """Registra un thread evictado del checkpointer en memoria."""
+    CHECKPOINT_MEMORY_EVICTIONS.labels(reason=reason).inc()
+
+
+def update_checkpoint_memory_stats(threads: int, nbytes: int) -> None:
+    """Actualiza threads retenidos y bytes del checkpointer en memoria."""
+    CACHE_ENTRIES.labels(cache_type="checkpoint_threads").set(threads)
+    CHECKPOINT_MEMORY_BYTES.set(nbytes)
+
+
+def record_checkpoint_hot_cache(result: str) -> None:
+    """Registra una lectura del cache local de checkpoints (hit | miss | stale)."""
+    CHECKPOINT_HOT_CACHE.labels(result=result).inc()
+
+
+def record_slow_callback() -> None:
+    """Registra un callback que bloqueó el event loop por encima del umbral."""
+    EVENT_LOOP_SLOW_CALLBACKS.inc()
+
+
 def record_token_usage(empresa_id: str, input_tokens: int, output_tokens: int) -> None:
     """Registra tokens consumidos (global + por empresa)."""
     total = input_tokens + output_tokens
@@ -331,12 +591,31 @@ __all__ = [
     "LLM_REQUESTS",
     "LLM_DURATION",
     "CHAT_RESPONSE_DURATION",
+    "MODEL_CALLS",
+    "MODEL_CALL_DURATION",
     "LLM_TOKENS",
     "LLM_TOKENS_BY_EMPRESA",
+    # Fases del request
+    "REQUEST_PHASE_DURATION",
     # Cache
     "AGENT_CACHE",
+    "CONFIG_CACHE",
+    "AGENT_CONTEXT_CACHE",
     "SEARCH_CACHE",
+    "SEARCH_NEGATIVE_CACHE",
+    "CATALOG_INDEX",
+    "CATALOG_INDEX_REFRESH",
+    "CATALOG_SNAPSHOT_REFRESH",
     "CACHE_ENTRIES",
+    "EVENT_LOOP_LAG",
+    "EVENT_LOOP_SLOW_CALLBACKS",
+    # Checkpointer
+    "CHECKPOINT_MEMORY_BYTES",
+    "CHECKPOINT_MEMORY_EVICTIONS",
+    "CHECKPOINT_HOT_CACHE",
+    "CHECKPOINT_OP_DURATION",
+    "CHECKPOINT_SERIALIZED_BYTES",
+    "REDIS_CHECKPOINT_OPS",
     # Tools
     "TOOL_CALLS",
     "TOOL_ERRORS",
@@ -344,6 +623,15 @@ __all__ = [
     # API
     "API_CALLS",
     "API_CALL_DURATION",
+    "HTTP_POOL_WAIT",
+    "HTTP_CONNECT",
+    "HTTP_POOL_TIMEOUTS",
+    "HTTP_HEDGE",
+    "HTTP_ADAPTIVE_TIMEOUTS",
+    "UPSTREAM_LATENCY",
+    "HTTP_POOL_IN_USE",
+    "HTTP_POOL_LIMIT",
+    "PHP_BATCH",
     # Por empresa
     "CHAT_REQUESTS",
     "CHAT_ERRORS",
@@ -356,8 +644,10 @@ __all__ = [
     # Context managers
     "track_chat_response",
     "track_llm_call",
+    "track_model_call",
     "track_tool_execution",
     "track_api_call",
+    "track_redis_checkpoint_op",
     # Funciones
     "update_cache_stats",
     "record_booking_attempt",
@@ -366,4 +656,8 @@ __all__ = [
     "record_chat_error",
     "record_tool_validation_error",
     "record_token_usage",
+    "record_checkpoint_eviction",
+    "update_checkpoint_memory_stats",
+    "record_checkpoint_hot_cache",
+    "record_slow_callback",
 ]
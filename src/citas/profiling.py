@@ -0,0 +1,170 @@
+"""
+Diagnóstico del hot path en producción: profiler por muestreo y lag del event loop.
+
+- sample_stacks: profiler por muestreo en proceso. Un thread aparte lee el stack del
+  thread objetivo (sys._current_frames) cada `interval` segundos durante `duration`
+  y cuenta stacks idénticos. No instrumenta nada: el overhead sobre el event loop es
+  solo el GIL que toma el muestreo.
+- format_collapsed: formato "collapsed stacks" (frame;frame;frame N por línea),
+  compatible con flamegraph.pl, speedscope e inferno.
+- monitor_event_loop_lag: task de fondo que mide cuánto se atrasa un sleep respecto de
+  lo pedido → citas_event_loop_lag_seconds. Un lag alto indica trabajo CPU síncrono
+  bloqueando el loop (render de templates, validación, serialización).
+- install_slow_callback_detector: mide cada callback del loop (asyncio.Handle._run) y
+  loguea/cuenta los que superan el umbral → citas_event_loop_slow_callbacks_total.
+  Es lo que hace el debug mode de asyncio (slow_callback_duration) sin el resto de su
+  overhead; el costo es un par de perf_counter por callback. Es opt-in
+  (SLOW_CALLBACK_THRESHOLD_MS=0 por defecto) y solo funciona con el loop de asyncio:
+  uvloop ejecuta sus callbacks en C y nunca llama a Handle._run. Bajo uvloop (el loop
+  que uvicorn elige si está instalado) el detector queda inactivo y lo avisa al
+  instalarse; la señal disponible ahí es citas_event_loop_lag_seconds.
+
+El endpoint GET /debug/profile (main.py) usa sample_stacks sobre el thread del loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+from .logger import get_logger
+from .metrics import EVENT_LOOP_LAG, record_slow_callback
+
+logger = get_logger(__name__)
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _collapse(frame: FrameType | None, root: str | None = None) -> str:
+    labels: list[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    if root is not None:
+        labels.append(root)
+    labels.reverse()
+    return ";".join(labels)
+
+
+def sample_stacks(
+    duration: float,
+    interval: float = 0.01,
+    thread_id: int | None = None,
+) -> Counter[str]:
+    """
+    Muestrea stacks durante `duration` segundos. Bloqueante: ejecutar en un thread.
+
+    Args:
+        duration: Segundos de muestreo
+        interval: Segundos entre muestras
+        thread_id: Thread a muestrear (threading.get_ident()). None = todos menos el
+            propio muestreador; cada stack lleva el nombre del thread como raíz.
+
+    Returns:
+        Counter stack colapsado → número de muestras
+    """
+    own = threading.get_ident()
+    counts: Counter[str] = Counter()
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        frames = sys._current_frames()
+        if thread_id is not None:
+            frame = frames.get(thread_id)
+            if frame is not None:
+                counts[_collapse(frame)] += 1
+        else:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident != own:
+                    counts[_collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+        del frames
+        time.sleep(interval)
+    return counts
+
+
+def format_collapsed(counts: Counter[str]) -> str:
+    """Una línea `stack count` por stack, de mayor a menor cantidad de muestras."""
+    return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """Actualiza citas_event_loop_lag_seconds cada `interval` segundos (corre hasta cancelarse)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(0.0, loop.time() - start - interval))
+
+
+_original_handle_run = None
+
+
+def _describe_callback(handle: asyncio.Handle) -> str:
+    callback = handle._callback
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return f"task {owner.get_name()} ({getattr(coro, '__qualname__', coro)})"
+    return repr(callback)[:200]
+
+
+def install_slow_callback_detector(threshold: float) -> None:
+    """
+    Loguea (WARNING) y cuenta los callbacks del event loop que tardan >= threshold s.
+
+    Parchea asyncio.Handle._run a nivel de proceso (cubre también TimerHandle y los
+    pasos de cada Task). Idempotente. Sin efecto bajo uvloop (ver docstring del módulo).
+    """
+    global _original_handle_run
+    if _original_handle_run is not None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None and not isinstance(loop, asyncio.BaseEventLoop):
+        logger.warning(
+            "[LOOP] Detector de callbacks lentos inactivo: el loop %s no usa asyncio.Handle "
+            "(usar citas_event_loop_lag_seconds)", type(loop).__module__,
+        )
+    original = asyncio.Handle._run
+
+    def _run(self: asyncio.Handle) -> None:
+        start = time.perf_counter()
+        original(self)
+        elapsed = time.perf_counter() - start
+        if elapsed >= threshold:
+            record_slow_callback()
+            # En el contexto del callback: el log lleva el trace_id del request culpable
+            self._context.run(
+                logger.warning,
+                "[LOOP] Callback bloqueó el event loop %.0f ms: %s",
+                elapsed * 1000, _describe_callback(self),
+            )
+
+    _original_handle_run = original
+    asyncio.Handle._run = _run
+
+
+def uninstall_slow_callback_detector() -> None:
+    """Restaura asyncio.Handle._run original."""
+    global _original_handle_run
+    if _original_handle_run is not None:
+        asyncio.Handle._run = _original_handle_run
+        _original_handle_run = None
+
+
+__all__ = [
+    "sample_stacks",
+    "format_collapsed",
+    "monitor_event_loop_lag",
+    "install_slow_callback_detector",
+    "uninstall_slow_callback_detector",
+]
@@ -0,0 +1,291 @@
+"""
+Grabación de conversaciones para replay offline (pruebas de regresión de rendimiento).
+
+Con CONVERSATION_RECORD_FILE configurado, main.py abre un ConversationRecord por
+request de /api/chat (ContextVar, mismo patrón que timing.py) y al final escribe una
+línea JSON compacta con:
+
+  request   ChatRequest sin api_key (message, session_id, id_empresa, config)
+  reply     respuesta entregada, status y elapsed_ms del request
+  llm       cada llamada al modelo: tool_calls (nombre + args), content, usage, ms
+  tools     cada tool ejecutada: nombre, args, output
+  php       cada POST a las APIs PHP: codOpe, payload, respuesta, ms
+
+Todos los strings pasan por sanitize(): emails y teléfonos se reemplazan por valores
+sintéticos estables (el mismo email siempre da el mismo reemplazo), así la conversación
+conserva su forma sin datos personales. Los nombres de clientes se enmascaran por clave
+(nombre_completo y customer_name en args de tools; titulo del payload CREAR_EVENTO,
+"Reunion para el usuario: <nombre>") con un nombre sintético estable, solo letras
+(pasa la validación de create_booking en el replay), y ese mismo nombre se reemplaza
+en el resto de los strings del registro (mensajes del usuario, respuestas, outputs).
+Un archivo terminado en .gz se escribe gzip.
+
+El muestreo (sample_rate) es por session_id: se graban conversaciones completas.
+benchmarks/load/replay.py reproduce el log contra un build con backends simulados.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+RECORD_VERSION = 1
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# 9 a 12 dígitos, con espacios opcionales (ej. 987654321, +51 987 654 321); no toca fechas
+_PHONE_RE = re.compile(r"(?<![\d-])\+?\d(?: ?\d){8,11}(?![\d-])")
+
+
+def _stable_token(value: str) -> str:
+    return hashlib.sha1(value.lower().encode("utf-8")).hexdigest()[:10]
+
+
+def _mask_phone(match: re.Match[str]) -> str:
+    digits = re.sub(r"\D", "", match.group(0))
+    token = int(_stable_token(digits), 16) % 10 ** len(digits)
+    return str(token).zfill(len(digits))
+
+
+# Claves cuyo valor es el nombre del cliente, y claves "<prefijo>: <nombre>"
+_NAME_KEYS = frozenset({"nombre_completo", "customer_name"})
+_TITLE_KEYS = frozenset({"titulo"})
+_TITLE_SEP = ": "
+_MIN_NAME_LEN = 3
+
+
+def _fake_name(name: str) -> str:
+    letters = "".join(chr(ord("a") + int(c, 16)) for c in _stable_token(" ".join(name.split())))
+    return f"Cliente {letters[:6].capitalize()}"
+
+
+def _collect_names(value: Any, names: set[str]) -> None:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, str):
+                if key in _NAME_KEYS:
+                    names.add(item.strip())
+                elif key in _TITLE_KEYS and _TITLE_SEP in item:
+                    names.add(item.rpartition(_TITLE_SEP)[2].strip())
+            else:
+                _collect_names(item, names)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_names(item, names)
+
+
+def _sanitize(value: Any, names_re: re.Pattern[str] | None) -> Any:
+    if isinstance(value, str):
+        if names_re is not None:
+            value = names_re.sub(lambda m: _fake_name(m.group(0)), value)
+        value = _EMAIL_RE.sub(lambda m: f"u{_stable_token(m.group(0))}@example.com", value)
+        return _PHONE_RE.sub(_mask_phone, value)
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key in _NAME_KEYS and isinstance(item, str):
+                result[key] = _fake_name(item) if item.strip() else item
+            elif key in _TITLE_KEYS and isinstance(item, str):
+                prefix, sep, name = item.rpartition(_TITLE_SEP)
+                result[key] = f"{prefix}{sep}{_fake_name(name)}" if sep and name.strip() else _sanitize(item, names_re)
+            else:
+                result[key] = _sanitize(item, names_re)
+        return result
+    if isinstance(value, (list, tuple)):
+        return [_sanitize(v, names_re) for v in value]
+    return value
+
+
+def sanitize(value: Any) -> Any:
+    """
+    Reemplaza emails, teléfonos y nombres de clientes en strings (recursivo en
+    dicts/listas). Los nombres se toman de las claves conocidas (_NAME_KEYS,
+    _TITLE_KEYS) y se reemplazan también donde aparezcan en el resto de `value`.
+    """
+    names = set()
+    _collect_names(value, names)
+    names = sorted((n for n in names if len(n) >= _MIN_NAME_LEN), key=len, reverse=True)
+    names_re = (
+        re.compile("|".join(r"\s+".join(map(re.escape, n.split())) for n in names), re.IGNORECASE)
+        if names else None
+    )
+    return _sanitize(value, names_re)
+
+
+class ConversationRecord:
+    """Lo observado durante un request; se serializa al terminar."""
+
+    __slots__ = ("request", "start", "llm", "tools", "php")
+
+    def __init__(self, request: dict[str, Any]) -> None:
+        self.request = request
+        self.start = time.perf_counter()
+        self.llm: list[dict[str, Any]] = []
+        self.tools: list[dict[str, Any]] = []
+        self.php: list[dict[str, Any]] = []
+
+
+_current: ContextVar[ConversationRecord | None] = ContextVar("citas_conversation_record", default=None)
+
+
+class _Recorder:
+    """Archivo de salida compartido (escrituras serializadas con un lock)."""
+
+    def __init__(self, path: str, sample_rate: float) -> None:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        self.path = target
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._file: IO[str] = (
+            gzip.open(target, "at", encoding="utf-8")
+            if target.suffix == ".gz"
+            else target.open("a", encoding="utf-8", buffering=1)
+        )
+
+    def sampled(self, session_id: int) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        bucket = int(_stable_token(str(session_id)), 16) % 10_000
+        return bucket < self.sample_rate * 10_000
+
+    def write(self, line: str) -> None:
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_recorder: _Recorder | None = None
+
+
+def configure_recording(path: str, sample_rate: float = 1.0) -> None:
+    """Activa la grabación hacia `path` (JSONL; gzip si termina en .gz). Idempotente."""
+    global _recorder
+    if _recorder is not None:
+        return
+    _recorder = _Recorder(path, sample_rate)
+    logger.info("[RECORD] Grabando conversaciones en %s (sample_rate=%.2f)", path, sample_rate)
+
+
+def close_recording() -> None:
+    """Cierra el archivo de grabación. Llamar en el lifespan."""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+def start_recording(request: Any) -> ConversationRecord | None:
+    """
+    Abre el registro del request actual si la grabación está activa y la sesión
+    cae en la muestra. `request` es el ChatRequest (se descarta api_key).
+    """
+    if _recorder is None or not _recorder.sampled(request.session_id):
+        return None
+    record = ConversationRecord(request.model_dump(exclude={"api_key"}))
+    _current.set(record)
+    return record
+
+
+def record_llm_call(message: Any, seconds: float) -> None:
+    """Registra la respuesta del modelo (AIMessage): tool_calls, content y usage."""
+    record = _current.get()
+    if record is None or message is None:
+        return
+    usage = getattr(message, "usage_metadata", None) or {}
+    record.llm.append({
+        "tool_calls": [
+            {"name": call.get("name"), "args": call.get("args")}
+            for call in getattr(message, "tool_calls", None) or []
+        ],
+        "content": getattr(message, "content", ""),
+        "usage": {
+            "input": usage.get("input_tokens", 0),
+            "output": usage.get("output_tokens", 0),
+            "total": usage.get("total_tokens", 0),
+        },
+        "ms": round(seconds * 1000, 1),
+    })
+
+
+def record_tool_call(name: str, args: dict[str, Any], output: Any) -> None:
+    """Registra una tool ejecutada con sus argumentos y su salida."""
+    record = _current.get()
+    if record is not None:
+        record.tools.append({"name": name, "args": args, "output": output})
+
+
+def record_php_call(cod_ope: str, payload: dict[str, Any], response: Any, seconds: float) -> None:
+    """Registra un POST a las APIs PHP con su respuesta."""
+    record = _current.get()
+    if record is not None:
+        record.php.append({
+            "cod_ope": cod_ope,
+            "payload": payload,
+            "response": response,
+            "ms": round(seconds * 1000, 1),
+        })
+
+
+def finish_recording(
+    record: ConversationRecord | None,
+    reply: str | None,
+    url: str | None,
+    status: str | None,
+) -> None:
+    """Serializa el registro (sanitizado) como una línea del archivo de grabación."""
+    if record is None or _recorder is None:
+        return
+    entry = {
+        "v": RECORD_VERSION,
+        "ts": round(time.time(), 3),
+        "request": record.request,
+        "reply": reply,
+        "url": url,
+        "status": status,
+        "elapsed_ms": round((time.perf_counter() - record.start) * 1000, 1),
+        "llm": record.llm,
+        "tools": record.tools,
+        "php": record.php,
+    }
+    try:
+        _recorder.write(json.dumps(sanitize(entry), ensure_ascii=False, separators=(",", ":"), default=str))
+    except Exception as e:
+        logger.warning("[RECORD] No se pudo escribir el registro: %s", e)
+
+
+def iter_records(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Itera los registros de un archivo de grabación (JSONL o .gz)."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+__all__ = [
+    "ConversationRecord",
+    "sanitize",
+    "configure_recording",
+    "close_recording",
+    "start_recording",
+    "record_llm_call",
+    "record_tool_call",
+    "record_php_call",
+    "finish_recording",
+    "iter_records",
+]
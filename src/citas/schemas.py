@@ -1,11 +1,23 @@
 """
 Modelos Pydantic del agente.
 Define el contrato HTTP (request/response) y la configuración tipada.
+
+El gateway reenvía la misma `config` en cada mensaje de una empresa. ChatRequest
+calcula una huella (blake2b del JSON canónico) del dict recibido y reutiliza el
+CitasConfig ya validado de un LRU (CONFIG_CACHE_MAXSIZE) en vez de correr los
+validators otra vez. Por eso CitasConfig es inmutable (frozen).
 """
 
-from pydantic import BaseModel, Field, field_validator
+import hashlib
+from typing import Any
+
+import orjson
+from cachetools import LRUCache
+from pydantic import BaseModel, Field, PrivateAttr, ValidatorFunctionWrapHandler, field_validator
 
+from . import config as app_config
 from .logger import get_logger
+from .metrics import CONFIG_CACHE
 
 logger = get_logger(__name__)
 
@@ -74,7 +86,38 @@ class CitasConfig(BaseModel):
             return None
         return v
 
-    model_config = {"extra": "ignore"}
+    _fingerprint: str | None = PrivateAttr(default=None)
+    _dump: dict[str, Any] | None = PrivateAttr(default=None)
+
+    model_config = {"extra": "ignore", "frozen": True}
+
+    @property
+    def fingerprint(self) -> str | None:
+        """Huella del payload original (None si no vino de un dict JSON)."""
+        # Lectura directa: self._fingerprint pasa por BaseModel.__getattr__ (~2 µs)
+        return self.__pydantic_private__["_fingerprint"]
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        model_dump(exclude_none=True) calculado una sola vez (el modelo es inmutable).
+        El dict es compartido: quien necesite modificarlo debe copiarlo.
+        """
+        private = self.__pydantic_private__
+        if private["_dump"] is None:
+            private["_dump"] = self.model_dump(exclude_none=True)
+        return private["_dump"]
+
+
+def config_fingerprint(raw: dict[str, Any]) -> str:
+    """Huella estable de un payload de config: mismo contenido → misma huella (orden de claves irrelevante)."""
+    return hashlib.blake2b(orjson.dumps(raw, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+_config_cache: LRUCache | None = (
+    LRUCache(maxsize=app_config.CONFIG_CACHE_MAXSIZE) if app_config.CONFIG_CACHE_MAXSIZE > 0 else None
+)
+_config_cache_hit = CONFIG_CACHE.labels(result="hit")
+_config_cache_miss = CONFIG_CACHE.labels(result="miss")
 
 
 class ChatRequest(BaseModel):
@@ -86,6 +129,26 @@ class ChatRequest(BaseModel):
     api_key: str
     config: CitasConfig | None = None
 
+    @field_validator("config", mode="wrap")
+    @classmethod
+    def reuse_validated_config(cls, v: object, handler: ValidatorFunctionWrapHandler) -> CitasConfig | None:
+        """Reutiliza el CitasConfig validado si el gateway manda el mismo payload."""
+        if not isinstance(v, dict) or _config_cache is None:
+            return handler(v)
+        try:
+            key = config_fingerprint(v)
+        except TypeError:  # payload no serializable (no viene de JSON)
+            return handler(v)
+        cached = _config_cache.get(key)
+        if cached is not None:
+            _config_cache_hit.inc()
+            return cached
+        _config_cache_miss.inc()
+        validated = handler(v)
+        validated._fingerprint = key
+        _config_cache[key] = validated
+        return validated
+
 
 class ChatResponse(BaseModel):
     reply: str
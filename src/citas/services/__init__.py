@@ -6,7 +6,7 @@ schedule_recommender, productos_servicios_citas, busqueda_productos.
 from .scheduling import confirm_booking, ScheduleValidator, ScheduleRecommender, parse_time, parse_time_range, is_time_blocked
 from .prompt_data import fetch_contexto_negocio, fetch_horario_reuniones
 from .prompt_data import fetch_nombres_productos_servicios, format_nombres_para_prompt
-from .busqueda_productos import buscar_productos_servicios, format_productos_para_respuesta
+from .busqueda_productos import buscar_productos_servicios, format_productos_para_respuesta, aformat_productos_para_respuesta
 from .prompt_data import fetch_preguntas_frecuentes, format_preguntas_frecuentes_para_prompt
 
 __all__ = [
@@ -22,6 +22,7 @@ __all__ = [
     "format_nombres_para_prompt",
     "buscar_productos_servicios",
     "format_productos_para_respuesta",
+    "aformat_productos_para_respuesta",
     "fetch_preguntas_frecuentes",
     "format_preguntas_frecuentes_para_prompt",
 ]
@@ -3,8 +3,18 @@ Búsqueda de productos y servicios desde ws_informacion_ia.php.
 Usa codOpe: BUSCAR_PRODUCTOS_SERVICIOS_CITAS
 
 Resiliencia:
-  - TTLCache 15 min por (id_empresa, búsqueda): absorbe búsquedas repetidas
-    del mismo término entre usuarios de la misma empresa.
+  - Índice local del catálogo (catalogo_index.py): si la empresa ya tiene su índice,
+    la búsqueda se resuelve en memoria; la API solo se usa sin índice o sin coincidencias.
+  - TTLCache 15 min por (id_empresa, búsqueda en minúsculas y con espacios colapsados):
+    absorbe búsquedas repetidas del mismo término entre usuarios de la misma empresa.
+    La clave solo junta variantes que el LIKE del PHP también trata igual (mayúsculas,
+    espacios), y al PHP se le manda ese mismo texto. Una frase más larga se puede
+    responder filtrando el resultado cacheado de una parte suya ("novax pro" ⊃ "novax").
+  - Cache negativo (TTL corto, SEARCH_NEGATIVE_CACHE_TTL_SECONDS): búsquedas sin
+    resultados y respuestas success:false, que el LLM suele reintentar con variaciones.
+  - Backoff por empresa: tras un error de la API, las búsquedas de esa empresa
+    devuelven el error sin llamar a la API durante un intervalo exponencial con
+    jitter (2s, 4s, 8s... hasta SEARCH_FAILURE_BACKOFF_MAX_SECONDS).
   - Anti-thundering herd: si N usuarios buscan el mismo término simultáneamente
     en cache miss, solo el primero llama a la API; los demás esperan ese Lock.
   - Retry: tenacity en post_with_logging → post_with_retry (TransportError, exponential backoff).
@@ -12,29 +22,47 @@ Resiliencia:
 """
 
 import asyncio
-import html
 import json
-import re
+import random
+import time
 from typing import Any
 
 from cachetools import TTLCache
 
 from .. import config as app_config
 from ..logger import get_logger
-from ..metrics import SEARCH_CACHE, update_cache_stats
+from ..metrics import SEARCH_CACHE, SEARCH_NEGATIVE_CACHE, update_cache_stats
 from ..infra import post_with_logging, resilient_call
 from ..config import informacion_cb
+from .catalogo_index import product_terms, search_catalog
+from .resultado_busqueda import (
+    SearchResult,
+    abuild_search_result,
+    aformat_productos_para_respuesta,
+    format_productos_para_respuesta,
+)
+from .texto_busqueda import query_terms
 
 logger = get_logger(__name__)
 
 COD_OPE = "BUSCAR_PRODUCTOS_SERVICIOS_CITAS"
 MAX_RESULTADOS = 10
 
+# Frases de hasta 4 palabras buscan un resultado cacheado más general (≤6 lookups)
+_MAX_SUPERSET_TERMS = 4
+
+_EMPTY_QUERY = SearchResult(False, [], "El término de búsqueda no puede estar vacío")
+_CIRCUIT_OPEN = SearchResult(False, [], "Servicio no disponible temporalmente. Intenta de nuevo en unos minutos.")
+_SEARCH_FAILED = SearchResult(False, [], "No se pudo completar la búsqueda. Intenta de nuevo.")
+
 # ---------------------------------------------------------------------------
 # Cache de búsquedas
 # ---------------------------------------------------------------------------
 
-# Key: (id_empresa, término_normalizado) → resultado completo.
+# Key: (id_empresa, búsqueda en minúsculas con espacios colapsados) → resultado completo.
+# El PHP hace LIKE sobre la frase, así que la clave no puede juntar frases que el LIKE
+# distingue ("el precio de NovaX" y "NovaX" dan resultados distintos): solo mayúsculas y
+# espacios. "NovaX", "novax" y " novax  " comparten entrada.
 # TTL 15 min: suficiente para absorber picos de búsquedas repetidas sin mostrar datos viejos.
 # maxsize 2000: ~40 términos por empresa para 50 empresas simultáneas.
 _busqueda_cache: TTLCache = TTLCache(
@@ -42,53 +70,89 @@ _busqueda_cache: TTLCache = TTLCache(
     ttl=app_config.SEARCH_CACHE_TTL_MINUTES * 60,
 )
 
+# Resultados negativos (0 productos o success:false): TTL corto y presupuesto propio,
+# no desplazan a los positivos y un producto recién cargado aparece pronto. Misma clave
+# que _busqueda_cache (el texto que se mandó al PHP): un vacío de una frase no se repite
+# para otra que el PHP buscaría distinto.
+_negative_cache: TTLCache | None = (
+    TTLCache(
+        maxsize=app_config.SEARCH_NEGATIVE_CACHE_MAXSIZE,
+        ttl=app_config.SEARCH_NEGATIVE_CACHE_TTL_SECONDS,
+    )
+    if app_config.SEARCH_NEGATIVE_CACHE_TTL_SECONDS > 0
+    else None
+)
+
+# Backoff por empresa tras errores de la API: id_empresa → (fallos consecutivos, reintentar_desde)
+_BACKOFF_BASE_SECONDS = 2.0
+_failure_backoff: TTLCache = TTLCache(
+    maxsize=1000, ttl=max(app_config.SEARCH_FAILURE_BACKOFF_MAX_SECONDS, 1) * 2,
+)
+
 # Lock por cache_key para anti-thundering herd. Limpiado en finally.
 _busqueda_locks: dict[tuple, asyncio.Lock] = {}
 
 
 # ---------------------------------------------------------------------------
-# Formateo de resultados
+# Resultado desde una consulta cacheada más general
 # ---------------------------------------------------------------------------
 
-def _clean_description(desc: str | None, max_chars: int = 120) -> str:
-    """Limpia HTML y trunca la descripción."""
-    if not desc or not str(desc).strip():
-        return "-"
-    text = str(desc).strip()
-    text = re.sub(r"<[^>]+>", " ", text)
-    text = html.unescape(text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return (text[:max_chars] + "...") if len(text) > max_chars else text
+def _matches_all(producto: dict[str, Any], query: list[str]) -> bool:
+    product = product_terms(producto)
+    return all(q in product or any(t.startswith(q) for t in product) for q in query)
 
 
-def _format_precio(precio: Any) -> str:
-    if precio is None or precio == "":
-        return "-"
-    try:
-        return f"S/. {float(precio):,.2f}"
-    except (TypeError, ValueError):
-        return "-"
+async def _from_cached_superset(id_empresa: int, key: str) -> SearchResult | None:
+    """
+    Resuelve "novax pro" filtrando el resultado cacheado de "novax" (o de cualquier
+    tramo contiguo de la frase: todo lo que matchea LIKE '%novax pro%' también matchea
+    LIKE '%novax%'). Solo usa resultados completos (menos de MAX_RESULTADOS productos:
+    la API no truncó) y solo si algún producto contiene todos los términos; si no, la
+    consulta va a la API.
+    """
+    words = key.split()
+    query = query_terms(key)
+    if not 2 <= len(words) <= _MAX_SUPERSET_TERMS or not query:
+        return None
+    for size in range(len(words) - 1, 0, -1):
+        for start in range(len(words) - size + 1):
+            cached = _busqueda_cache.get((id_empresa, " ".join(words[start:start + size])))
+            if cached is None or not cached.success or len(cached.productos) >= MAX_RESULTADOS:
+                continue
+            productos = [p for p in cached.productos if _matches_all(p, query)]
+            if productos:
+                return await abuild_search_result(productos)
+    return None
 
 
-def _format_item(p: dict[str, Any]) -> str:
-    """Formato único para Producto y Servicio."""
-    nombre = (p.get("nombre") or "-").strip()
-    precio_str = _format_precio(p.get("precio_unitario"))
-    categoria = (p.get("nombre_categoria") or "-").strip()
-    descripcion = _clean_description(p.get("descripcion"))
+# ---------------------------------------------------------------------------
+# Cache negativo y backoff por empresa
+# ---------------------------------------------------------------------------
+
+def _cache_negative(cache_key: tuple, resultado: SearchResult) -> None:
+    if _negative_cache is None:
+        return
+    _negative_cache[cache_key] = resultado
+    update_cache_stats("search_negative", len(_negative_cache))
 
-    tipo = (p.get("nombre_tipo_producto") or "").strip().lower()
-    es_servicio = tipo == "servicio"
-    linea_precio = f"- Precio: {precio_str}" if es_servicio else f"- Precio: {precio_str} por {(p.get('nombre_unidad') or 'unidad').strip().lower()}"
 
-    return f"### {nombre}\n{linea_precio}\n- Categoría: {categoria}\n- Descripción: {descripcion}"
+def _in_backoff(id_empresa: int) -> bool:
+    state = _failure_backoff.get(id_empresa)
+    return state is not None and time.monotonic() < state[1]
 
 
-def format_productos_para_respuesta(productos: list[dict[str, Any]]) -> str:
-    """Formatea la lista de productos/servicios para la respuesta de la tool."""
-    if not productos:
-        return "No se encontraron resultados."
-    return "\n\n".join(_format_item(p) for p in productos)
+def _record_failure(id_empresa: int) -> None:
+    """Fallo de la API: próximo intento tras base·2^(n-1) segundos (mitad fija, mitad jitter)."""
+    if app_config.SEARCH_FAILURE_BACKOFF_MAX_SECONDS <= 0:
+        return
+    failures = _failure_backoff.get(id_empresa, (0, 0.0))[0] + 1
+    window = min(app_config.SEARCH_FAILURE_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * 2 ** (failures - 1))
+    delay = window / 2 + random.uniform(0, window / 2)
+    _failure_backoff[id_empresa] = (failures, time.monotonic() + delay)
+    logger.info(
+        "[BUSQUEDA] Backoff id_empresa=%s: %.1fs tras %s fallo(s) consecutivo(s)",
+        id_empresa, delay, failures,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -101,7 +165,7 @@ async def _do_busqueda_api(
     cache_key: tuple,
     payload: dict[str, Any],
     log_search_apis: bool,
-) -> dict[str, Any]:
+) -> SearchResult:
     """
     Ejecuta la llamada real a la API con resilient_call. Se llama SOLO desde
     buscar_productos_servicios, dentro de un asyncio.Lock (anti-thundering herd).
@@ -122,13 +186,23 @@ async def _do_busqueda_api(
         if log_search_apis:
             logger.info("  Respuesta: %s", json.dumps(data, ensure_ascii=False))
 
+        _failure_backoff.pop(id_empresa, None)
+
         if not data.get("success"):
             error_msg = data.get("error") or data.get("message") or "Error desconocido"
             logger.warning("[BUSQUEDA] API no success id_empresa=%s: %s", id_empresa, error_msg)
-            return {"success": False, "productos": [], "error": error_msg}
+            resultado = SearchResult(False, [], error_msg)
+            _cache_negative(cache_key, resultado)
+            return resultado
 
         productos = data.get("productos", [])
-        resultado = {"success": True, "productos": productos, "error": None}
+        # Texto para el LLM calculado una vez: los hits del cache no vuelven a formatear
+        resultado = await abuild_search_result(productos)
+
+        if not productos:
+            _cache_negative(cache_key, resultado)
+            logger.debug("[BUSQUEDA] Cache negativo SET id_empresa=%s busqueda=%r", id_empresa, busqueda_norm)
+            return resultado
 
         # Éxito: cachear resultado
         _busqueda_cache[cache_key] = resultado
@@ -144,7 +218,8 @@ async def _do_busqueda_api(
             "[BUSQUEDA] Error id_empresa=%s busqueda=%r: %s: %s",
             id_empresa, busqueda_norm, type(e).__name__, e,
         )
-        return {"success": False, "productos": [], "error": "No se pudo completar la búsqueda. Intenta de nuevo."}
+        _record_failure(id_empresa)
+        return _SEARCH_FAILED
 
 
 # ---------------------------------------------------------------------------
@@ -155,11 +230,12 @@ async def buscar_productos_servicios(
     id_empresa: int,
     busqueda: str,
     log_search_apis: bool = False,
-) -> dict[str, Any]:
+) -> SearchResult:
     """
     Busca productos y servicios por término.
 
-    Incluye TTLCache 15 min por (id_empresa, búsqueda), anti-thundering herd,
+    Primero consulta el índice local del catálogo; si no responde, usa la API con
+    TTLCache 15 min por (id_empresa, búsqueda), anti-thundering herd,
     retry tenacity (TransportError) y circuit breaker compartido (informacion_cb).
 
     Args:
@@ -168,38 +244,76 @@ async def buscar_productos_servicios(
         log_search_apis: Si True, registra API, URL, payload y respuesta en info
 
     Returns:
-        Dict con success, productos (lista), error si aplica
+        SearchResult con success, productos (lista), error si aplica y, si hubo
+        éxito, el texto ya formateado para la tool (texto/resumen)
     """
     if not busqueda or not str(busqueda).strip():
-        return {"success": False, "productos": [], "error": "El término de búsqueda no puede estar vacío"}
+        return _EMPTY_QUERY
+
+    busqueda_norm = " ".join(busqueda.split())
+
+    # 1. Índice local del catálogo: sin red. None = aún no disponible o sin coincidencia
+    #    suficiente (regla de cobertura en catalogo_index.py) → API
+    locales = search_catalog(id_empresa, busqueda_norm, MAX_RESULTADOS)
+    if locales is not None:
+        logger.debug(
+            "[BUSQUEDA] Índice local id_empresa=%s busqueda=%r (%s productos)",
+            id_empresa, busqueda_norm, len(locales.productos),
+        )
+        return locales
 
-    busqueda_norm = busqueda.strip()
     cache_key = (id_empresa, busqueda_norm.lower())
 
-    # 1. Cache hit — respuesta inmediata sin tocar la red
+    # 2. Cache hit — respuesta inmediata sin tocar la red
     if cache_key in _busqueda_cache:
         SEARCH_CACHE.labels(result="hit").inc()
         update_cache_stats("search", len(_busqueda_cache))
         logger.debug("[BUSQUEDA] Cache HIT id_empresa=%s busqueda=%r", id_empresa, busqueda_norm)
         return _busqueda_cache[cache_key]
 
-    # 2. Circuit breaker — si la API de esta empresa está fallando, cortar rápido
+    # 2b. Filtrado de un resultado cacheado más general ("novax pro" ⊂ "novax")
+    resultado = await _from_cached_superset(id_empresa, cache_key[1])
+    if resultado is not None:
+        SEARCH_CACHE.labels(result="superset").inc()
+        _busqueda_cache[cache_key] = resultado
+        update_cache_stats("search", len(_busqueda_cache))
+        logger.debug(
+            "[BUSQUEDA] Cache SUPERSET id_empresa=%s busqueda=%r (%s productos)",
+            id_empresa, busqueda_norm, len(resultado.productos),
+        )
+        return resultado
+
+    # 3. Cache negativo: misma búsqueda sin resultados (o con error de la API) hace poco
+    if _negative_cache is not None and (negativo := _negative_cache.get(cache_key)) is not None:
+        SEARCH_NEGATIVE_CACHE.labels(result="hit").inc()
+        logger.debug("[BUSQUEDA] Cache negativo HIT id_empresa=%s busqueda=%r", id_empresa, busqueda_norm)
+        return negativo
+
+    # 4. Backoff tras errores de la API de esta empresa
+    if _in_backoff(id_empresa):
+        SEARCH_NEGATIVE_CACHE.labels(result="backoff").inc()
+        logger.debug("[BUSQUEDA] En backoff id_empresa=%s — búsqueda rechazada sin llamar API", id_empresa)
+        return _SEARCH_FAILED
+
+    # 5. Circuit breaker — si la API de esta empresa está fallando, cortar rápido
     if informacion_cb.is_open(id_empresa):
         SEARCH_CACHE.labels(result="circuit_open").inc()
         logger.warning(
             "[BUSQUEDA] Circuit ABIERTO id_empresa=%s — búsqueda rechazada sin llamar API",
             id_empresa,
         )
-        return {"success": False, "productos": [], "error": "Servicio no disponible temporalmente. Intenta de nuevo en unos minutos."}
+        return _CIRCUIT_OPEN
 
     payload = {
         "codOpe": COD_OPE,
         "id_empresa": id_empresa,
+        # La búsqueda PHP hace LIKE sobre la frase ("Plan de salud"): se manda el texto
+        # del usuario con los espacios colapsados, el mismo del que sale cache_key
         "busqueda": busqueda_norm,
         "limite": MAX_RESULTADOS,
     }
 
-    # 3. Anti-thundering herd: Lock por cache_key + double-check.
+    # 6. Anti-thundering herd: Lock por cache_key + double-check.
     lock = _busqueda_locks.setdefault(cache_key, asyncio.Lock())
     try:
         async with lock:
@@ -212,6 +326,9 @@ async def buscar_productos_servicios(
                     id_empresa, busqueda_norm,
                 )
                 return _busqueda_cache[cache_key]
+            if _negative_cache is not None and (negativo := _negative_cache.get(cache_key)) is not None:
+                SEARCH_NEGATIVE_CACHE.labels(result="hit").inc()
+                return negativo
 
             SEARCH_CACHE.labels(result="miss").inc()
             return await _do_busqueda_api(
@@ -221,4 +338,9 @@ async def buscar_productos_servicios(
         _busqueda_locks.pop(cache_key, None)
 
 
-__all__ = ["buscar_productos_servicios", "format_productos_para_respuesta"]
+__all__ = [
+    "SearchResult",
+    "buscar_productos_servicios",
+    "format_productos_para_respuesta",
+    "aformat_productos_para_respuesta",
+]
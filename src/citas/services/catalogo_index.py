@@ -0,0 +1,328 @@
+"""
+Índice local del catálogo por empresa para search_productos_servicios.
+
+Se construye con el snapshot del catálogo de la empresa (catalogo_snapshot.py, el mismo
+que usa el system prompt) y responde búsquedas en memoria, sin llamar a
+BUSCAR_PRODUCTOS_SERVICIOS_CITAS:
+
+  - Índice invertido término → [(doc, tf normalizado BM25)] con términos normalizados (sin tildes,
+    minúsculas, sin stopwords, con stem; ver texto_busqueda.py). tf ponderado por campo:
+    nombre ×3, categoría ×1.5, tipo ×1, descripción ×1 (HTML limpio, primeros 2000 chars).
+  - Ranking BM25 (k1=1.2, b=0.75). Cada término de la consulta matchea exacto (peso 1),
+    por prefijo (≥3 letras, peso 0.7) o, si no hubo nada, con distancia de edición
+    ≤1 (≤2 desde 8 letras, peso 0.5).
+  - Regla de cobertura: un ítem solo es respuesta local si matchea TODOS los términos
+    de la consulta y el peso medio de sus matches es ≥ 0.75. Así un término exacto
+    alcanza, pero un prefijo o un typo sueltos no ("consul" → "consultoría" va a la
+    API); en consultas de varios términos un prefijo o un typo se compensan con
+    matches exactos. Los ítems que pasan la regla se ordenan por score.
+
+Refresco: cada índice recuerda la versión del snapshot con que se armó. Cuando el
+snapshot cambia de versión, el índice se reconstruye en segundo plano (pool de CPU)
+y mientras tanto se sigue usando el anterior. Los productos que no cambiaron reutilizan sus términos y su texto del índice anterior
+(solo se re-tokeniza y re-formatea lo nuevo o modificado). El texto que ve el LLM
+(resultado_busqueda.ProductoResumen) se arma al construir el índice, así una
+búsqueda local solo une los bloques ya formateados. Si el catálogo no trae precio ni descripción
+(endpoint solo con nombres), el índice no responde y se sigue usando la API.
+
+search_catalog retorna None cuando no hay índice utilizable o ningún ítem pasa la regla
+de cobertura; en ambos casos busqueda_productos cae a la API PHP.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import html
+import math
+import re
+import time
+from bisect import bisect_left
+from typing import Any
+
+from cachetools import LRUCache, TTLCache
+
+from .. import config as app_config
+from ..logger import get_logger
+from ..metrics import CATALOG_INDEX, CATALOG_INDEX_REFRESH, update_cache_stats
+from ..infra import run_cpu_bound
+from .catalogo_snapshot import CatalogSnapshot, get_catalog_snapshot, peek_catalog_snapshot
+from .resultado_busqueda import ProductoResumen, SearchResult, render_resumen, resumir_producto
+from .texto_busqueda import query_terms, terms
+
+logger = get_logger(__name__)
+
+# (campo, peso en tf)
+_FIELD_WEIGHTS: tuple[tuple[str, float], ...] = (
+    ("nombre", 3.0),
+    ("nombre_categoria", 1.5),
+    ("nombre_tipo_producto", 1.0),
+    ("descripcion", 1.0),
+)
+_DESC_MAX_CHARS = 2000
+
+_K1 = 1.2
+_B = 0.75
+_PREFIX_WEIGHT = 0.7
+_FUZZY_WEIGHT = 0.5
+_MIN_PREFIX_LEN = 3
+_MIN_FUZZY_LEN = 4
+_MAX_EXPANSIONS = 30
+# Peso medio mínimo de los matches de un ítem que cubre todos los términos
+_MIN_MATCH_QUALITY = 0.75
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+# ---------------------------------------------------------------------------
+# Índice
+# ---------------------------------------------------------------------------
+
+_RENDER_FIELDS = ("precio_unitario", "nombre_unidad")
+
+
+def _doc_key(item: dict[str, Any]) -> tuple[str, ...]:
+    """Contenido indexado y mostrado del ítem: si no cambia, sus términos y su texto se reutilizan."""
+    return tuple(str(item.get(field) or "") for field, _ in _FIELD_WEIGHTS) + tuple(
+        str(item.get(field) or "") for field in _RENDER_FIELDS
+    )
+
+
+def product_terms(item: dict[str, Any]) -> dict[str, float]:
+    """Términos normalizados de un producto → tf ponderado por campo."""
+    weighted: dict[str, float] = {}
+    for field, weight in _FIELD_WEIGHTS:
+        value = item.get(field)
+        if not value:
+            continue
+        text = str(value)
+        if field == "descripcion":
+            text = html.unescape(_HTML_TAG_RE.sub(" ", text[: _DESC_MAX_CHARS * 2]))[:_DESC_MAX_CHARS]
+        for term in terms(text):
+            weighted[term] = weighted.get(term, 0.0) + weight
+    return weighted
+
+
+def _within_distance(a: str, b: str, max_dist: int) -> bool:
+    """Levenshtein(a, b) <= max_dist, cortando apenas una fila supera el máximo."""
+    if abs(len(a) - len(b)) > max_dist:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > max_dist:
+            return False
+        previous = current
+    return previous[-1] <= max_dist
+
+
+class CatalogIndex:
+    """Índice invertido inmutable del catálogo de una empresa."""
+
+    __slots__ = (
+        "items", "version", "complete", "reused",
+        "_keys", "_doc_terms", "_resumen", "_texto", "_postings", "_idf", "_vocab", "_vocab_by_len",
+    )
+
+    def __init__(
+        self, items: list[dict[str, Any]], previous: "CatalogIndex | None" = None, version: int = 0,
+    ) -> None:
+        reusable = (
+            {key: doc for doc, key in enumerate(previous._keys)} if previous is not None else {}
+        )
+        self.items = items
+        self.version = version
+        self._keys = [_doc_key(item) for item in items]
+        self._doc_terms: list[dict[str, float]] = []
+        self._resumen: list[ProductoResumen] = []
+        self._texto: list[str] = []
+        self.reused = 0
+        for key, item in zip(self._keys, items):
+            prev_doc = reusable.get(key)
+            if prev_doc is None:
+                resumen = resumir_producto(item)
+                self._doc_terms.append(product_terms(item))
+                self._resumen.append(resumen)
+                self._texto.append(render_resumen(resumen))
+            else:
+                self.reused += 1
+                self._doc_terms.append(previous._doc_terms[prev_doc])
+                self._resumen.append(previous._resumen[prev_doc])
+                self._texto.append(previous._texto[prev_doc])
+
+        # Posting = (doc, factor BM25 de tf ya normalizado por largo del documento)
+        doc_len = [sum(weighted.values()) for weighted in self._doc_terms]
+        avg_len = (sum(doc_len) / len(items)) if items else 1.0
+        postings: dict[str, list[tuple[int, float]]] = {}
+        for doc, weighted in enumerate(self._doc_terms):
+            norm = _K1 * (1 - _B + _B * doc_len[doc] / avg_len)
+            for term, tf in weighted.items():
+                postings.setdefault(term, []).append((doc, tf * (_K1 + 1) / (tf + norm)))
+        self._postings = postings
+        n = len(items)
+        self._idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for term, p in postings.items()}
+        self._vocab = sorted(postings)
+        self._vocab_by_len: dict[int, list[str]] = {}
+        for term in self._vocab:
+            self._vocab_by_len.setdefault(len(term), []).append(term)
+        # Un catálogo solo con nombres daría respuestas peores que la búsqueda PHP
+        self.complete = any(
+            item.get("precio_unitario") not in (None, "") or item.get("descripcion") for item in items
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def vocab_size(self) -> int:
+        return len(self._vocab)
+
+    def _expand(self, token: str) -> list[tuple[str, float]]:
+        """Términos del índice que matchean `token`: exacto, por prefijo o difuso."""
+        matches: list[tuple[str, float]] = []
+        if token in self._postings:
+            matches.append((token, 1.0))
+        if len(token) >= _MIN_PREFIX_LEN:
+            vocab = self._vocab
+            i = bisect_left(vocab, token)
+            while i < len(vocab) and len(matches) < _MAX_EXPANSIONS and vocab[i].startswith(token):
+                if vocab[i] != token:
+                    matches.append((vocab[i], _PREFIX_WEIGHT))
+                i += 1
+        if not matches and len(token) >= _MIN_FUZZY_LEN:
+            max_dist = 1 if len(token) < 8 else 2
+            for length in range(len(token) - max_dist, len(token) + max_dist + 1):
+                for term in self._vocab_by_len.get(length, ()):
+                    if term[0] == token[0] and _within_distance(token, term, max_dist):
+                        matches.append((term, _FUZZY_WEIGHT))
+                        if len(matches) >= _MAX_EXPANSIONS:
+                            return matches
+        return matches
+
+    def search(self, query: str, limit: int) -> list[dict[str, Any]]:
+        """Hasta `limit` ítems que pasan la regla de cobertura, ordenados por score BM25."""
+        return [self.items[doc] for doc in self._rank(query, limit)]
+
+    def search_result(self, query: str, limit: int) -> SearchResult | None:
+        """Como search, con el texto para el LLM armado desde los bloques precalculados. None sin ítems."""
+        docs = self._rank(query, limit)
+        if not docs:
+            return None
+        return SearchResult(
+            True,
+            [self.items[doc] for doc in docs],
+            None,
+            "\n\n".join(self._texto[doc] for doc in docs),
+            tuple(self._resumen[doc] for doc in docs),
+        )
+
+    def _rank(self, query: str, limit: int) -> list[int]:
+        tokens = query_terms(query)
+        if not tokens or not self.items:
+            return []
+        scores: dict[int, float] = {}
+        coverage: dict[int, int] = {}
+        quality: dict[int, float] = {}
+        for token in tokens:
+            best: dict[int, tuple[float, float]] = {}
+            for term, weight in self._expand(token):
+                idf = self._idf[term] * weight
+                for doc, tf_factor in self._postings[term]:
+                    score = idf * tf_factor
+                    prev_score, prev_weight = best.get(doc, (0.0, 0.0))
+                    best[doc] = (max(score, prev_score), max(weight, prev_weight))
+            for doc, (score, weight) in best.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+                coverage[doc] = coverage.get(doc, 0) + 1
+                quality[doc] = quality.get(doc, 0.0) + weight
+        min_quality = _MIN_MATCH_QUALITY * len(tokens)
+        matched = [
+            doc for doc, covered in coverage.items()
+            if covered == len(tokens) and quality[doc] >= min_quality
+        ]
+        return heapq.nlargest(limit, matched, key=scores.__getitem__)
+
+
+# ---------------------------------------------------------------------------
+# Índices por empresa y refresco en segundo plano
+# ---------------------------------------------------------------------------
+
+_indices: LRUCache = LRUCache(maxsize=app_config.CATALOG_INDEX_MAX_EMPRESAS)
+
+# Una reconstrucción a la vez por empresa; una versión que falló no se reintenta por 60s
+_refresh_tasks: dict[Any, asyncio.Task] = {}
+_failed_versions: TTLCache = TTLCache(maxsize=app_config.CATALOG_INDEX_MAX_EMPRESAS, ttl=60)
+
+
+async def refresh_catalog_index(
+    id_empresa: Any, snapshot: CatalogSnapshot | None = None,
+) -> CatalogIndex | None:
+    """Reconstruye el índice de la empresa desde su snapshot. None si no hay snapshot completo."""
+    started = time.perf_counter()
+    try:
+        if snapshot is None:
+            snapshot = await get_catalog_snapshot(id_empresa)
+        if snapshot is None or not snapshot.complete:
+            return None
+        index = await run_cpu_bound(CatalogIndex, snapshot.items, _indices.get(id_empresa), snapshot.version)
+    except Exception as e:
+        CATALOG_INDEX_REFRESH.labels(status="error").inc()
+        if snapshot is not None:
+            _failed_versions[(id_empresa, snapshot.version)] = True
+        logger.warning("[CATALOGO] Error reconstruyendo índice id_empresa=%s: %s: %s", id_empresa, type(e).__name__, e)
+        return None
+
+    _indices[id_empresa] = index
+    update_cache_stats("catalog_index", len(_indices))
+    CATALOG_INDEX_REFRESH.labels(status="ok").inc()
+    logger.info(
+        "[CATALOGO] Índice id_empresa=%s v%s: %s ítems, %s términos, %s reutilizados (%.0f ms)%s",
+        id_empresa, index.version, len(index), index.vocab_size, index.reused,
+        (time.perf_counter() - started) * 1000,
+        "" if index.complete else " — catálogo sin precios/descripciones, se usa la API",
+    )
+    return index
+
+
+def _schedule_refresh(id_empresa: Any, snapshot: CatalogSnapshot) -> None:
+    if id_empresa in _refresh_tasks or (id_empresa, snapshot.version) in _failed_versions:
+        return
+    # Contexto vacío: el refresco no pertenece al request que lo disparó (timing, grabación)
+    task = asyncio.create_task(refresh_catalog_index(id_empresa, snapshot), context=contextvars.Context())
+    _refresh_tasks[id_empresa] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(id_empresa, None))
+
+
+def search_catalog(id_empresa: Any, busqueda: str, limit: int) -> SearchResult | None:
+    """
+    Busca en el índice local de la empresa.
+
+    Returns:
+        None si no hay índice utilizable (se agenda la descarga del snapshot o la
+        construcción del índice) o si ningún ítem pasa la regla de cobertura; si no,
+        el SearchResult con los ítems encontrados y su texto.
+    """
+    if not app_config.CATALOG_INDEX_ENABLED:
+        return None
+    snapshot = peek_catalog_snapshot(id_empresa)
+    index: CatalogIndex | None = _indices.get(id_empresa)
+    if snapshot is not None and snapshot.complete and (index is None or index.version != snapshot.version):
+        _schedule_refresh(id_empresa, snapshot)
+    if index is None or not index.complete:
+        CATALOG_INDEX.labels(result="not_ready").inc()
+        return None
+    resultado = index.search_result(busqueda, limit)
+    CATALOG_INDEX.labels(result="hit" if resultado is not None else "empty").inc()
+    return resultado
+
+
+async def shutdown_catalog_index() -> None:
+    """Cancela los refrescos en curso. Llamar en el teardown del servidor (lifespan)."""
+    tasks = list(_refresh_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+__all__ = ["CatalogIndex", "product_terms", "refresh_catalog_index", "search_catalog", "shutdown_catalog_index"]
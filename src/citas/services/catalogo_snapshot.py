@@ -0,0 +1,268 @@
+"""
+Snapshot del catálogo por empresa (productos + servicios), compartido por:
+
+  - el system prompt (prompt_data.fetch_nombres_productos_servicios: primeros nombres)
+  - el índice local de search_productos_servicios (catalogo_index.py)
+
+Una sola descarga (OBTENER_PRODUCTOS_CITAS + OBTENER_SERVICIOS_CITAS) alimenta a
+ambos, así el prompt y la tool ven el mismo catálogo.
+
+Versionado: cada snapshot lleva `version`, que solo sube cuando el contenido cambió.
+Al refrescar se compara ítem por ítem (huella blake2b de su JSON): los ítems sin
+cambios reutilizan el objeto del snapshot anterior y, si nada cambió, la versión
+se mantiene y el índice no se reconstruye.
+
+TTL (CATALOG_SNAPSHOT_TTL_MINUTES): pasado ese tiempo el snapshot se sigue sirviendo
+mientras una tarea en segundo plano trae el catálogo nuevo (stale-while-revalidate).
+Si una de las dos llamadas falla, el snapshot queda marcado como incompleto y se
+reintenta al minuto; el índice local no se construye sobre un snapshot incompleto.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import time
+from typing import Any
+
+import orjson
+from cachetools import LRUCache, TTLCache
+
+from .. import config as app_config
+from ..logger import get_logger
+from ..metrics import CATALOG_SNAPSHOT_REFRESH, update_cache_stats
+from ..infra import post_with_logging, resilient_call, CircuitBreaker
+from ..config import informacion_cb as _default_informacion_cb
+
+logger = get_logger(__name__)
+
+# (codOpe, clave de la respuesta, tipo por defecto si el ítem no lo trae)
+_CATALOG_SOURCES = (
+    ("OBTENER_PRODUCTOS_CITAS", "productos", "Producto"),
+    ("OBTENER_SERVICIOS_CITAS", "servicios", "Servicio"),
+)
+
+# Snapshot incompleto (una de las llamadas falló) o intento fallido: reintentar tras esto
+_RETRY_SECONDS = 60
+
+
+def _item_digest(item: dict[str, Any]) -> bytes:
+    return hashlib.blake2b(orjson.dumps(item, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+
+
+class CatalogSnapshot:
+    """Catálogo inmutable de una empresa en un momento dado."""
+
+    __slots__ = ("id_empresa", "version", "productos", "servicios", "complete", "fetched_at", "_digests")
+
+    def __init__(
+        self,
+        id_empresa: Any,
+        version: int,
+        productos: tuple[dict[str, Any], ...],
+        servicios: tuple[dict[str, Any], ...],
+        complete: bool,
+        digests: tuple[bytes, ...],
+    ) -> None:
+        self.id_empresa = id_empresa
+        self.version = version
+        self.productos = productos
+        self.servicios = servicios
+        self.complete = complete
+        self.fetched_at = time.monotonic()
+        self._digests = digests
+
+    @property
+    def items(self) -> list[dict[str, Any]]:
+        return [*self.productos, *self.servicios]
+
+    def is_stale(self) -> bool:
+        max_age = app_config.CATALOG_SNAPSHOT_TTL_MINUTES * 60 if self.complete else _RETRY_SECONDS
+        return time.monotonic() - self.fetched_at > max_age
+
+    def nombres(self, max_items: int) -> tuple[list[str], list[str]]:
+        """Primeros `max_items` nombres de productos y de servicios."""
+        return (
+            [str(item["nombre"]).strip() for item in self.productos[:max_items]],
+            [str(item["nombre"]).strip() for item in self.servicios[:max_items]],
+        )
+
+
+# ---------------------------------------------------------------------------
+# Descarga
+# ---------------------------------------------------------------------------
+
+async def _fetch_source(
+    id_empresa: Any, cod_ope: str, key: str, tipo: str, cb: CircuitBreaker,
+) -> list[dict[str, Any]] | None:
+    """Ítems de un codOpe (con tipo por defecto). None si la llamada falla."""
+    payload = {"codOpe": cod_ope, "id_empresa": id_empresa}
+    try:
+        data = await resilient_call(
+            lambda: post_with_logging(app_config.API_INFORMACION_URL, payload),
+            cb=cb,
+            circuit_key=id_empresa,
+            service_name="CATALOGO",
+        )
+    except Exception as e:
+        logger.warning("[CATALOGO] %s falló id_empresa=%s: %s: %s", cod_ope, id_empresa, type(e).__name__, e)
+        return None
+    if not data.get("success"):
+        logger.warning("[CATALOGO] %s sin éxito id_empresa=%s: %s", cod_ope, id_empresa, data.get("error"))
+        return None
+
+    items: list[dict[str, Any]] = []
+    for item in data.get(key) or data.get("items") or []:
+        if isinstance(item, str) and item.strip():
+            item = {"nombre": item.strip()}
+        if isinstance(item, dict) and item.get("nombre"):
+            items.append(item if item.get("nombre_tipo_producto") else {**item, "nombre_tipo_producto": tipo})
+    return items
+
+
+def _build_snapshot(
+    id_empresa: Any,
+    fetched: list[list[dict[str, Any]] | None],
+    previous: CatalogSnapshot | None,
+) -> tuple[CatalogSnapshot, int]:
+    """
+    Snapshot nuevo a partir de lo descargado. Un codOpe que falló conserva la parte
+    del snapshot anterior (si había). Retorna (snapshot, ítems nuevos o modificados).
+    """
+    previous_parts = (previous.productos, previous.servicios) if previous is not None else ((), ())
+    reusable = dict(zip(previous._digests, previous.items)) if previous is not None else {}
+    parts: list[tuple[dict[str, Any], ...]] = []
+    digests: list[bytes] = []
+    changed = 0
+    for items, previous_part in zip(fetched, previous_parts):
+        if items is None:
+            parts.append(previous_part)
+            digests.extend(_item_digest(item) for item in previous_part)
+            continue
+        part = []
+        for item in items:
+            digest = _item_digest(item)
+            reused = reusable.get(digest)
+            if reused is None:
+                changed += 1
+                reused = item
+            part.append(reused)
+            digests.append(digest)
+        parts.append(tuple(part))
+
+    complete = all(items is not None for items in fetched)
+    digests_tuple = tuple(digests)
+    if previous is None:
+        version = 1
+    elif digests_tuple == previous._digests:
+        version = previous.version
+    else:
+        version = previous.version + 1
+    return CatalogSnapshot(id_empresa, version, parts[0], parts[1], complete, digests_tuple), changed
+
+
+# ---------------------------------------------------------------------------
+# Snapshots por empresa y refresco
+# ---------------------------------------------------------------------------
+
+_snapshots: LRUCache = LRUCache(maxsize=app_config.CATALOG_SNAPSHOT_MAX_EMPRESAS)
+
+# Una descarga a la vez por empresa; tras un intento fallido no se reintenta por 60s
+_refresh_tasks: dict[Any, asyncio.Task] = {}
+_failed_attempts: TTLCache = TTLCache(maxsize=app_config.CATALOG_SNAPSHOT_MAX_EMPRESAS, ttl=_RETRY_SECONDS)
+
+
+async def refresh_catalog_snapshot(id_empresa: Any, cb: CircuitBreaker | None = None) -> CatalogSnapshot | None:
+    """Descarga el catálogo y publica el snapshot nuevo. None si ambas llamadas fallan."""
+    _cb = cb or _default_informacion_cb
+    started = time.perf_counter()
+    fetched = list(await asyncio.gather(
+        *(_fetch_source(id_empresa, cod_ope, key, tipo, _cb) for cod_ope, key, tipo in _CATALOG_SOURCES)
+    ))
+    previous: CatalogSnapshot | None = _snapshots.get(id_empresa)
+    if all(items is None for items in fetched):
+        CATALOG_SNAPSHOT_REFRESH.labels(status="error").inc()
+        _failed_attempts[id_empresa] = True
+        return None
+
+    try:
+        snapshot, changed = _build_snapshot(id_empresa, fetched, previous)
+    except Exception as e:
+        CATALOG_SNAPSHOT_REFRESH.labels(status="error").inc()
+        _failed_attempts[id_empresa] = True
+        logger.warning("[CATALOGO] Error armando snapshot id_empresa=%s: %s: %s", id_empresa, type(e).__name__, e)
+        return None
+    _snapshots[id_empresa] = snapshot
+    update_cache_stats("catalog_snapshot", len(_snapshots))
+    if not snapshot.complete:
+        status = "partial"
+        _failed_attempts[id_empresa] = True
+    elif previous is not None and snapshot.version == previous.version:
+        status = "unchanged"
+    else:
+        status = "changed"
+    CATALOG_SNAPSHOT_REFRESH.labels(status=status).inc()
+    logger.info(
+        "[CATALOGO] Snapshot id_empresa=%s v%s (%s): %s productos, %s servicios, %s nuevos/modificados (%.0f ms)",
+        id_empresa, snapshot.version, status, len(snapshot.productos), len(snapshot.servicios),
+        changed, (time.perf_counter() - started) * 1000,
+    )
+    return snapshot
+
+
+def _start_refresh(id_empresa: Any, cb: CircuitBreaker) -> asyncio.Task:
+    task = _refresh_tasks.get(id_empresa)
+    if task is None:
+        # Contexto vacío: el refresco no pertenece al request que lo disparó (timing, grabación)
+        task = asyncio.create_task(refresh_catalog_snapshot(id_empresa, cb), context=contextvars.Context())
+        _refresh_tasks[id_empresa] = task
+        task.add_done_callback(lambda _: _refresh_tasks.pop(id_empresa, None))
+    return task
+
+
+def _can_refresh(id_empresa: Any, cb: CircuitBreaker) -> bool:
+    return id_empresa not in _failed_attempts and not cb.is_open(id_empresa)
+
+
+def peek_catalog_snapshot(id_empresa: Any, cb: CircuitBreaker | None = None) -> CatalogSnapshot | None:
+    """
+    Snapshot actual sin esperar red. Si no hay o está vencido, agenda la descarga en
+    segundo plano y retorna lo que haya (posiblemente None o un snapshot viejo).
+    """
+    _cb = cb or _default_informacion_cb
+    snapshot: CatalogSnapshot | None = _snapshots.get(id_empresa)
+    if (snapshot is None or snapshot.is_stale()) and _can_refresh(id_empresa, _cb):
+        _start_refresh(id_empresa, _cb)
+    return snapshot
+
+
+async def get_catalog_snapshot(id_empresa: Any, cb: CircuitBreaker | None = None) -> CatalogSnapshot | None:
+    """
+    Snapshot del catálogo. Si no hay ninguno, espera la descarga (compartida entre
+    llamadas concurrentes); si está vencido, retorna el actual y refresca en segundo plano.
+    """
+    _cb = cb or _default_informacion_cb
+    snapshot = peek_catalog_snapshot(id_empresa, _cb)
+    if snapshot is not None:
+        return snapshot
+    task = _refresh_tasks.get(id_empresa)
+    if task is None:
+        return None  # en backoff tras un fallo reciente o circuit abierto
+    # shield: cancelar al que espera no cancela la descarga compartida
+    return await asyncio.shield(task)
+
+
+async def shutdown_catalog_snapshot() -> None:
+    """Cancela las descargas en curso. Llamar en el teardown del servidor (lifespan)."""
+    tasks = list(_refresh_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+__all__ = [
+    "CatalogSnapshot",
+    "get_catalog_snapshot",
+    "peek_catalog_snapshot",
+    "refresh_catalog_snapshot",
+    "shutdown_catalog_snapshot",
+]
@@ -1,71 +1,19 @@
 """
-Productos y servicios para citas: fetch desde ws_informacion_ia.php.
-Usa OBTENER_PRODUCTOS_CITAS y OBTENER_SERVICIOS_CITAS.
+Productos y servicios para citas: nombres para el system prompt.
+Lee el snapshot del catálogo por empresa (catalogo_snapshot.py: OBTENER_PRODUCTOS_CITAS
+y OBTENER_SERVICIOS_CITAS), el mismo que usa el índice local de search_productos_servicios.
 Devuelve solo nombres (máx 10 de cada) para inyectar en el system prompt.
 """
 
-import asyncio
 from typing import Any
 
-from ... import config as app_config
 from ...logger import get_logger
-from ...infra import post_with_logging, resilient_call, CircuitBreaker
-from ...config import informacion_cb as _default_informacion_cb
+from ...infra import CircuitBreaker
+from ..catalogo_snapshot import get_catalog_snapshot
 
 logger = get_logger(__name__)
 
-_MAX_PRODUCTOS = 10
-_MAX_SERVICIOS = 10
-
-
-async def _fetch_nombres(cod_ope: str, id_empresa: Any, max_items: int, response_key: str, cb: CircuitBreaker) -> list[str]:
-    """
-    Obtiene una lista de la API y extrae solo los nombres.
-
-    Args:
-        cod_ope: OBTENER_PRODUCTOS_CITAS o OBTENER_SERVICIOS_CITAS
-        id_empresa: ID de la empresa
-        max_items: Máximo de ítems a retornar
-        response_key: Clave en la respuesta ("productos" o "servicios")
-
-    Returns:
-        Lista de nombres (strings)
-    """
-    if id_empresa is None or id_empresa == "":
-        return []
-
-    # Fast reject antes de tocar la red
-    if cb.is_open(id_empresa):
-        return []
-
-    payload = {
-        "codOpe": cod_ope,
-        "id_empresa": id_empresa,
-    }
-    try:
-        data = await resilient_call(
-            lambda: post_with_logging(app_config.API_INFORMACION_URL, payload),
-            cb=cb,
-            circuit_key=id_empresa,
-            service_name="PRODUCTOS_SERVICIOS",
-        )
-
-        if not data.get("success"):
-            logger.warning("[PRODUCTOS_SERVICIOS] API no success para %s: %s", cod_ope, data.get("error"))
-            return []
-
-        items = data.get(response_key) or data.get("items") or []
-        nombres = []
-        for item in items[:max_items]:
-            if isinstance(item, dict) and item.get("nombre"):
-                nombres.append(str(item["nombre"]).strip())
-            elif isinstance(item, str):
-                nombres.append(item.strip())
-        return nombres
-
-    except Exception as e:
-        logger.warning("[PRODUCTOS_SERVICIOS] Error al obtener %s: %s", cod_ope, e)
-        return []
+_MAX_ITEMS = 10  # por lista (productos y servicios)
 
 
 async def fetch_nombres_productos_servicios(
@@ -73,7 +21,8 @@ async def fetch_nombres_productos_servicios(
     cb: CircuitBreaker | None = None,
 ) -> tuple[list[str], list[str]]:
     """
-    Obtiene listas de nombres de productos y servicios (máx 10 de cada) en paralelo.
+    Obtiene listas de nombres de productos y servicios (máx 10 de cada) desde el
+    snapshot del catálogo. Sin snapshot (API caída o circuit abierto) retorna listas vacías.
 
     Args:
         id_empresa: ID de la empresa. Si es None, retorna listas vacías.
@@ -84,16 +33,19 @@ async def fetch_nombres_productos_servicios(
     if id_empresa is None or id_empresa == "":
         return [], []
 
-    _cb = cb or _default_informacion_cb
-    results = await asyncio.gather(
-        _fetch_nombres("OBTENER_PRODUCTOS_CITAS", id_empresa, _MAX_PRODUCTOS, "productos", _cb),
-        _fetch_nombres("OBTENER_SERVICIOS_CITAS", id_empresa, _MAX_SERVICIOS, "servicios", _cb),
-        return_exceptions=True,
-    )
-    nombres_productos = results[0] if not isinstance(results[0], Exception) else []
-    nombres_servicios = results[1] if not isinstance(results[1], Exception) else []
+    try:
+        snapshot = await get_catalog_snapshot(id_empresa, cb)
+    except Exception as e:
+        logger.warning("[PRODUCTOS_SERVICIOS] Error al obtener catálogo id_empresa=%s: %s", id_empresa, e)
+        return [], []
+    if snapshot is None:
+        return [], []
 
-    logger.info("[PRODUCTOS_SERVICIOS] Respuesta recibida id_empresa=%s: %s productos, %s servicios", id_empresa, len(nombres_productos), len(nombres_servicios))
+    nombres_productos, nombres_servicios = snapshot.nombres(_MAX_ITEMS)
+    logger.info(
+        "[PRODUCTOS_SERVICIOS] Catálogo v%s id_empresa=%s: %s productos, %s servicios",
+        snapshot.version, id_empresa, len(nombres_productos), len(nombres_servicios),
+    )
     return nombres_productos, nombres_servicios
 
 
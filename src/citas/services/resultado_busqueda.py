@@ -0,0 +1,138 @@
+"""
+Resultado de búsqueda de productos/servicios y su texto para el LLM.
+
+El formateo (HTML de la descripción, html.unescape, precio) se hace una sola vez,
+al armar el SearchResult que se guarda en el cache o al construir el índice del
+catálogo. Cada SearchResult trae:
+
+  - productos: los ítems tal como llegaron de la API
+  - resumen: forma compacta (ProductoResumen por ítem, strings ya limpios)
+  - texto: el bloque final que devuelve la tool search_productos_servicios
+
+Así un cache hit no repite trabajo de strings: la tool solo antepone el encabezado.
+"""
+
+import html
+import re
+from typing import Any, NamedTuple
+
+from ..infra import run_cpu_bound
+
+# Con descripciones (HTML) que suman más de esto, el formateo va al pool de CPU
+_OFFLOAD_MIN_DESC_CHARS = 20_000
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+SIN_RESULTADOS = "No se encontraron resultados."
+
+
+class ProductoResumen(NamedTuple):
+    """Ítem ya formateado. unidad es None para servicios (el precio no lleva "por ...")."""
+    nombre: str
+    precio: str
+    categoria: str
+    descripcion: str
+    unidad: str | None = None
+
+
+class SearchResult(NamedTuple):
+    """Resultado de una búsqueda (inmutable; el cache guarda esta misma instancia)."""
+    success: bool
+    productos: list[dict[str, Any]]
+    error: str | None = None
+    texto: str = ""
+    resumen: tuple[ProductoResumen, ...] = ()
+
+
+# ---------------------------------------------------------------------------
+# Formateo
+# ---------------------------------------------------------------------------
+
+def _clean_description(desc: str | None, max_chars: int = 120) -> str:
+    """Limpia HTML y trunca la descripción."""
+    if not desc or not str(desc).strip():
+        return "-"
+    text = str(desc).strip()
+    text = _HTML_TAG_RE.sub(" ", text)
+    text = html.unescape(text)
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return (text[:max_chars] + "...") if len(text) > max_chars else text
+
+
+def _format_precio(precio: Any) -> str:
+    if precio is None or precio == "":
+        return "-"
+    try:
+        return f"S/. {float(precio):,.2f}"
+    except (TypeError, ValueError):
+        return "-"
+
+
+def resumir_producto(p: dict[str, Any]) -> ProductoResumen:
+    """Formato único para Producto y Servicio."""
+    tipo = (p.get("nombre_tipo_producto") or "").strip().lower()
+    return ProductoResumen(
+        nombre=(p.get("nombre") or "-").strip(),
+        precio=_format_precio(p.get("precio_unitario")),
+        categoria=(p.get("nombre_categoria") or "-").strip(),
+        descripcion=_clean_description(p.get("descripcion")),
+        unidad=None if tipo == "servicio" else (p.get("nombre_unidad") or "unidad").strip().lower(),
+    )
+
+
+def render_resumen(r: ProductoResumen) -> str:
+    linea_precio = f"- Precio: {r.precio}" if r.unidad is None else f"- Precio: {r.precio} por {r.unidad}"
+    return f"### {r.nombre}\n{linea_precio}\n- Categoría: {r.categoria}\n- Descripción: {r.descripcion}"
+
+
+def format_productos_para_respuesta(productos: list[dict[str, Any]]) -> str:
+    """Formatea la lista de productos/servicios para la respuesta de la tool."""
+    if not productos:
+        return SIN_RESULTADOS
+    return "\n\n".join(render_resumen(resumir_producto(p)) for p in productos)
+
+
+async def aformat_productos_para_respuesta(productos: list[dict[str, Any]]) -> str:
+    """
+    Igual que format_productos_para_respuesta; si las descripciones son largas
+    (HTML de catálogo) el limpiado corre en el pool de CPU en vez del event loop.
+    """
+    if not _needs_offload(productos):
+        return format_productos_para_respuesta(productos)
+    return await run_cpu_bound(format_productos_para_respuesta, productos)
+
+
+# ---------------------------------------------------------------------------
+# Resultados ya renderizados
+# ---------------------------------------------------------------------------
+
+def _needs_offload(productos: list[dict[str, Any]]) -> bool:
+    return sum(len(str(p.get("descripcion") or "")) for p in productos) >= _OFFLOAD_MIN_DESC_CHARS
+
+
+def build_search_result(productos: list[dict[str, Any]]) -> SearchResult:
+    """SearchResult exitoso con resumen y texto calculados una vez."""
+    if not productos:
+        return SearchResult(True, productos, None, SIN_RESULTADOS)
+    resumen = tuple(resumir_producto(p) for p in productos)
+    return SearchResult(True, productos, None, "\n\n".join(render_resumen(r) for r in resumen), resumen)
+
+
+async def abuild_search_result(productos: list[dict[str, Any]]) -> SearchResult:
+    """build_search_result en el pool de CPU si las descripciones son largas."""
+    if not _needs_offload(productos):
+        return build_search_result(productos)
+    return await run_cpu_bound(build_search_result, productos)
+
+
+__all__ = [
+    "ProductoResumen",
+    "SearchResult",
+    "resumir_producto",
+    "render_resumen",
+    "format_productos_para_respuesta",
+    "aformat_productos_para_respuesta",
+    "build_search_result",
+    "abuild_search_result",
+]
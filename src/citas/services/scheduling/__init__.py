@@ -3,8 +3,8 @@ Dominio de citas: validación, recomendación, disponibilidad, booking y parsing
 """
 
 from .time_parser import parse_time, parse_time_range, is_time_blocked, build_fecha_inicio_fin
-from .availability_client import check_slot_availability
-from .schedule_validator import ScheduleValidator
+from .availability_client import SlotAvailability, check_slot_availability
+from .schedule_validator import ScheduleValidator, ValidationResult
 from .schedule_recommender import ScheduleRecommender
 from .booking import confirm_booking
 
@@ -13,8 +13,10 @@ __all__ = [
     "parse_time_range",
     "is_time_blocked",
     "build_fecha_inicio_fin",
+    "SlotAvailability",
     "check_slot_availability",
     "ScheduleValidator",
+    "ValidationResult",
     "ScheduleRecommender",
     "confirm_booking",
 ]
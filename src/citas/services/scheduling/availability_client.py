@@ -6,9 +6,10 @@ y ScheduleRecommender (verificación de slot concreto cuando el usuario da fecha
 """
 
 import json
+import logging
 import httpx
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, NamedTuple
 
 from ...logger import get_logger
 from ...metrics import track_api_call, DEGRADATION_TOTAL
@@ -20,6 +21,19 @@ from .time_parser import parse_time
 logger = get_logger(__name__)
 
 
+class SlotAvailability(NamedTuple):
+    """Resultado de CONSULTAR_DISPONIBILIDAD (inmutable)."""
+    available: bool
+    error: str | None = None
+
+
+# Instancias compartidas: disponible/degradado y ocupado no asignan un objeto por consulta
+SLOT_AVAILABLE = SlotAvailability(True)
+_SLOT_TAKEN = SlotAvailability(
+    False, "El horario seleccionado ya está ocupado. Por favor elige otra hora o fecha.",
+)
+
+
 async def check_slot_availability(
     id_empresa: Any,
     fecha_str: str,
@@ -30,7 +44,7 @@ async def check_slot_availability(
     agendar_sucursal: int,
     log_api: bool = False,
     cb: CircuitBreaker | None = None,
-) -> dict[str, Any]:
+) -> SlotAvailability:
     """
     Consulta CONSULTAR_DISPONIBILIDAD en ws_agendar_reunion.php.
 
@@ -49,7 +63,7 @@ async def check_slot_availability(
         cb: Circuit breaker inyectable. Si None, usa agendar_reunion_cb global.
 
     Returns:
-        Dict con:
+        SlotAvailability:
         - available (bool): True si el slot está disponible o ante degradación.
         - error (str | None): Mensaje de error si no está disponible.
     """
@@ -59,7 +73,7 @@ async def check_slot_availability(
         hora = parse_time(hora_str)
         if not hora:
             DEGRADATION_TOTAL.labels(service="availability_check", reason="parse_error").inc()
-            return {"available": True, "error": None}
+            return SLOT_AVAILABLE
 
         fecha_hora_inicio = fecha.replace(hour=hora.hour, minute=hora.minute)
         fecha_hora_fin = fecha_hora_inicio + duracion_cita
@@ -79,10 +93,12 @@ async def check_slot_availability(
             logger.info("  URL: %s", app_config.API_AGENDAR_REUNION_URL)
             logger.info("  Enviado: %s", json.dumps(payload, ensure_ascii=False))
         logger.debug("[AVAILABILITY] Consultando: %s %s", fecha_str, hora_str)
-        logger.debug(
-            "[AVAILABILITY] JSON enviado a ws_agendar_reunion.php (CONSULTAR_DISPONIBILIDAD): %s",
-            json.dumps(payload, ensure_ascii=False, indent=2),
-        )
+        # json.dumps(indent=2) se evaluaba siempre, aunque DEBUG estuviera apagado
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[AVAILABILITY] JSON enviado a ws_agendar_reunion.php (CONSULTAR_DISPONIBILIDAD): %s",
+                json.dumps(payload, ensure_ascii=False, indent=2),
+            )
 
         with track_api_call("consultar_disponibilidad"):
             data = await resilient_call(
@@ -99,31 +115,28 @@ async def check_slot_availability(
         if not data.get("success"):
             logger.warning("[AVAILABILITY] Respuesta sin éxito: %s", data)
             DEGRADATION_TOTAL.labels(service="availability_check", reason="api_success_false").inc()
-            return {"available": True, "error": None}  # Graceful degradation
+            return SLOT_AVAILABLE  # Graceful degradation
 
         if data.get("disponible"):
-            return {"available": True, "error": None}
-        return {
-            "available": False,
-            "error": "El horario seleccionado ya está ocupado. Por favor elige otra hora o fecha.",
-        }
+            return SLOT_AVAILABLE
+        return _SLOT_TAKEN
 
     except RuntimeError:
         logger.warning("[AVAILABILITY] Circuit abierto para ws_agendar_reunion")
         DEGRADATION_TOTAL.labels(service="availability_check", reason="circuit_open").inc()
-        return {"available": True, "error": None}
+        return SLOT_AVAILABLE
     except httpx.TimeoutException:
         logger.warning("[AVAILABILITY] Timeout - graceful degradation")
         DEGRADATION_TOTAL.labels(service="availability_check", reason="timeout").inc()
-        return {"available": True, "error": None}
+        return SLOT_AVAILABLE
     except httpx.HTTPError as e:
         logger.warning("[AVAILABILITY] Error HTTP: %s - graceful degradation", e)
         DEGRADATION_TOTAL.labels(service="availability_check", reason="http_error").inc()
-        return {"available": True, "error": None}
+        return SLOT_AVAILABLE
     except Exception as e:
         logger.warning("[AVAILABILITY] Error inesperado: %s - graceful degradation", e)
         DEGRADATION_TOTAL.labels(service="availability_check", reason="unknown").inc()
-        return {"available": True, "error": None}
+        return SLOT_AVAILABLE
 
 
-__all__ = ["check_slot_availability"]
+__all__ = ["SlotAvailability", "SLOT_AVAILABLE", "check_slot_availability"]
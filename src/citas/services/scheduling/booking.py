@@ -5,14 +5,18 @@ correo_cliente, correo_usuario, agendar_usuario.
 """
 
 import json
+import time
 
 import httpx
 from typing import Any
 
 from ...logger import get_logger
+from ...recording import record_php_call
+from ...timing import track_phase
+from ...tracing import start_span
 from ...metrics import track_api_call, record_booking_attempt, record_booking_success, record_booking_failure
 from ... import config as app_config
-from ...infra import get_client
+from ...infra import send_post
 from ...config import calendario_cb
 from .time_parser import build_fecha_inicio_fin
 
@@ -95,8 +99,15 @@ async def confirm_booking(
         logger.debug("[BOOKING] Payload: %s", payload)
 
         with track_api_call("crear_evento"):
-            client = get_client()
-            response = await client.post(app_config.API_CALENDAR_URL, json=payload)
+            start = time.perf_counter()
+            with (
+                track_phase("php_call", payload["codOpe"]),
+                start_span(
+                    "php.post", kind="client",
+                    cod_ope=payload["codOpe"], **{"url.full": app_config.API_CALENDAR_URL},
+                ),
+            ):
+                response = await send_post(app_config.API_CALENDAR_URL, payload)
             response.raise_for_status()
             try:
                 data = response.json()
@@ -108,6 +119,7 @@ async def confirm_booking(
                     "message": "El servidor respondió con formato inválido",
                     "error": "invalid_json",
                 }
+            record_php_call(payload["codOpe"], payload, data, time.perf_counter() - start)
 
         if log_create_booking_apis:
             logger.info("  Respuesta: success=%s, message=%s", data.get("success"), data.get("message"))
@@ -103,11 +103,11 @@ class ScheduleRecommender:
                     self.agendar_sucursal,
                     cb=self._agendar_cb,
                 )
-                if availability.get("available"):
+                if availability.available:
                     return {
                         "text": f"El {fecha_solicitada} a las {hora_solicitada.strip()} está disponible. ¿Confirmamos la cita?"
                     }
-                error_msg = availability.get("error") or "Ese horario no está disponible."
+                error_msg = availability.error or "Ese horario no está disponible."
                 return {
                     "text": f"{error_msg} ¿Te gustaría que te sugiera otros horarios?"
                 }
@@ -7,7 +7,7 @@ Para sugerencias de horarios disponibles, ver schedule_recommender.py.
 """
 
 from datetime import datetime, timedelta
-from typing import Any
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
 import httpx
@@ -25,6 +25,15 @@ logger = get_logger(__name__)
 _ZONA_PERU = ZoneInfo(app_config.TIMEZONE)
 
 
+class ValidationResult(NamedTuple):
+    """Resultado de ScheduleValidator.validate (inmutable)."""
+    valid: bool
+    error: str | None = None
+
+
+_VALID = ValidationResult(True)  # compartido: el caso válido no asigna
+
+
 class ScheduleValidator:
     """Valida si una fecha y hora son válidas para agendar una cita."""
 
@@ -70,7 +79,7 @@ class ScheduleValidator:
             DEGRADATION_TOTAL.labels(service="schedule_fetch", reason="unknown").inc()
         return None
 
-    async def validate(self, fecha_str: str, hora_str: str) -> dict[str, Any]:
+    async def validate(self, fecha_str: str, hora_str: str) -> ValidationResult:
         """
         Valida si la fecha y hora son válidas para agendar.
 
@@ -79,20 +88,20 @@ class ScheduleValidator:
             hora_str: Hora en formato HH:MM AM/PM
 
         Returns:
-            Dict con:
+            ValidationResult:
             - valid: bool
-            - error: str (mensaje de error si no es válido)
+            - error: str | None (mensaje de error si no es válido)
         """
         # 1. Parsear fecha
         try:
             fecha = datetime.strptime(fecha_str, "%Y-%m-%d")
         except ValueError:
-            return {"valid": False, "error": "Formato de fecha inválido. Usa el formato YYYY-MM-DD (ejemplo: 2026-01-25)."}
+            return ValidationResult(False, "Formato de fecha inválido. Usa el formato YYYY-MM-DD (ejemplo: 2026-01-25).")
 
         # 2. Parsear hora
         hora = parse_time(hora_str)
         if not hora:
-            return {"valid": False, "error": "Formato de hora inválido. Usa el formato HH:MM AM/PM (ejemplo: 10:30 AM)."}
+            return ValidationResult(False, "Formato de hora inválido. Usa el formato HH:MM AM/PM (ejemplo: 10:30 AM).")
 
         # 3. Combinar fecha y hora
         fecha_hora_cita = fecha.replace(hour=hora.hour, minute=hora.minute)
@@ -100,13 +109,13 @@ class ScheduleValidator:
         # 4. Validar que no sea en el pasado (zona horaria Lima, no la del servidor)
         ahora = datetime.now(_ZONA_PERU).replace(tzinfo=None)
         if fecha_hora_cita <= ahora:
-            return {"valid": False, "error": "La fecha y hora seleccionada ya pasó. Por favor elige una fecha y hora futura."}
+            return ValidationResult(False, "La fecha y hora seleccionada ya pasó. Por favor elige una fecha y hora futura.")
 
         # 5. Obtener horario de reuniones
         schedule = await self._fetch_horario()
         if not schedule:
             logger.warning("[SCHEDULE] No se pudo obtener horario, permitiendo cita")
-            return {"valid": True, "error": None}
+            return _VALID
 
         # 6. Obtener el día de la semana
         dia_semana = fecha.weekday()  # 0=Lunes, 6=Domingo
@@ -115,43 +124,43 @@ class ScheduleValidator:
         nombre_dia = DIAS_NOMBRE[dia_semana]
 
         if not horario_dia:
-            return {"valid": False, "error": f"No hay horario disponible para el día {nombre_dia}. Por favor elige otro día."}
+            return ValidationResult(False, f"No hay horario disponible para el día {nombre_dia}. Por favor elige otro día.")
 
         # 7. Verificar si el día está marcado como no disponible
         horario_dia_upper = horario_dia.strip().upper()
         if horario_dia_upper in ["NO DISPONIBLE", "CERRADO", "NO ATIENDE", "-", "N/A", ""]:
-            return {"valid": False, "error": f"No hay atención el día {nombre_dia}. Por favor elige otro día."}
+            return ValidationResult(False, f"No hay atención el día {nombre_dia}. Por favor elige otro día.")
 
         # 8. Parsear el rango de horario del día
         rango = parse_time_range(horario_dia)
         if not rango:
             logger.warning("[SCHEDULE] No se pudo parsear horario del día: %s", horario_dia)
-            return {"valid": True, "error": None}
+            return _VALID
 
         hora_inicio, hora_fin = rango
         horario_formateado = f"{hora_inicio.strftime('%I:%M %p')} a {hora_fin.strftime('%I:%M %p')}"
 
         # 9. Validar que la hora esté dentro del rango
         if hora.time() < hora_inicio.time():
-            return {"valid": False, "error": f"La hora seleccionada es antes del horario de atención. El horario del {nombre_dia} es de {horario_formateado}."}
+            return ValidationResult(False, f"La hora seleccionada es antes del horario de atención. El horario del {nombre_dia} es de {horario_formateado}.")
 
         if hora.time() >= hora_fin.time():
-            return {"valid": False, "error": f"La hora seleccionada es después del horario de atención. El horario del {nombre_dia} es de {horario_formateado}."}
+            return ValidationResult(False, f"La hora seleccionada es después del horario de atención. El horario del {nombre_dia} es de {horario_formateado}.")
 
         # 10. Validar que la cita + duración no exceda la hora de cierre
         hora_fin_cita = fecha_hora_cita + self.duracion_cita
         hora_cierre = fecha.replace(hour=hora_fin.hour, minute=hora_fin.minute)
 
         if hora_fin_cita > hora_cierre:
-            return {
-                "valid": False,
-                "error": f"La cita de {self.duracion_cita.seconds // 60} minutos excedería el horario de atención (cierre: {hora_fin.strftime('%I:%M %p')}). El horario del {nombre_dia} es de {horario_formateado}. Por favor elige una hora más temprana.",
-            }
+            return ValidationResult(
+                False,
+                f"La cita de {self.duracion_cita.seconds // 60} minutos excedería el horario de atención (cierre: {hora_fin.strftime('%I:%M %p')}). El horario del {nombre_dia} es de {horario_formateado}. Por favor elige una hora más temprana.",
+            )
 
         # 11. Validar horarios bloqueados
         horarios_bloqueados = schedule.get("horarios_bloqueados", "")
         if is_time_blocked(fecha, hora, horarios_bloqueados):
-            return {"valid": False, "error": "El horario seleccionado está bloqueado. Por favor elige otra hora."}
+            return ValidationResult(False, "El horario seleccionado está bloqueado. Por favor elige otra hora.")
 
         # 12. Verificar disponibilidad contra citas existentes
         availability = await check_slot_availability(
@@ -160,11 +169,11 @@ class ScheduleValidator:
             self.log_create_booking_apis,
             cb=self._agendar_cb,
         )
-        if not availability["available"]:
-            return {"valid": False, "error": availability["error"]}
+        if not availability.available:
+            return ValidationResult(False, availability.error)
 
         logger.debug("[VALIDATION] Horario válido: %s %s", fecha_str, hora_str)
-        return {"valid": True, "error": None}
+        return _VALID
 
 
-__all__ = ["ScheduleValidator"]
+__all__ = ["ScheduleValidator", "ValidationResult"]
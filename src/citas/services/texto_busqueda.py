@@ -0,0 +1,92 @@
+"""
+Normalización de texto para búsqueda de productos/servicios.
+
+Pipeline (índice local del catálogo y filtrado de búsquedas cacheadas):
+
+  1. fold_accents: minúsculas + NFKD sin marcas combinantes ("Consultoría" → "consultoria")
+  2. tokenize: palabras alfanuméricas sin stopwords del español ("la", "de", "para"...)
+  3. stem: stemmer liviano de plurales y género ("planes" → "plan", "consultorias" →
+     "consultori", "medica"/"medico" → "medic")
+
+Para consultas además se descartan palabras de relleno que el LLM suele agregar
+("precio", "cuánto", "información") y query_key ordena y deduplica los términos:
+"el precio de NovaX", "NovaX" y "novax " comparten la clave "novax". No sirve como
+clave del cache de búsquedas PHP: el LIKE del PHP sí distingue esas frases.
+"""
+
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS: frozenset[str] = frozenset({
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los",
+    "o", "para", "por", "que", "se", "su", "sus", "u", "un", "una", "unos", "unas", "y",
+})
+
+# Relleno de consultas: no describe al producto (ya sin tildes)
+QUERY_NOISE: frozenset[str] = frozenset({
+    "precio", "precios", "costo", "costos", "cuesta", "cuestan", "cuanto", "cuantos", "cuanta",
+    "valor", "tarifa", "tarifas", "info", "informacion", "detalle", "detalles", "sobre",
+    "quiero", "quisiera", "saber", "tienen", "tiene", "hay", "busco",
+})
+
+_VOWELS = frozenset("aeiou")
+
+
+def fold_accents(text: str) -> str:
+    """Minúsculas sin tildes ni diacríticos (NFKD y se descartan las marcas combinantes)."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str, keep_stopwords: bool = False) -> list[str]:
+    """Términos normalizados de `text`, en orden de aparición."""
+    tokens = _TOKEN_RE.findall(fold_accents(text))
+    if keep_stopwords:
+        return tokens
+    return [t for t in tokens if t not in STOPWORDS]
+
+
+def stem(token: str) -> str:
+    """Raíz liviana: quita plural (-s, -es, -iones → -ion) y vocal final de género."""
+    if len(token) <= 3 or token.isdigit():
+        return token
+    if token.endswith("iones"):
+        token = token[:-2]
+    elif token.endswith("es") and len(token) > 4 and token[-3] not in _VOWELS:
+        token = token[:-2]
+    elif token.endswith("s") and token[-2] in _VOWELS:
+        token = token[:-1]
+    if len(token) > 4 and token[-1] in "aeo":
+        token = token[:-1]
+    return token
+
+
+def terms(text: str) -> list[str]:
+    """Tokens con stem, en orden de aparición (para indexar productos)."""
+    return [stem(t) for t in tokenize(text)]
+
+
+def query_terms(text: str) -> list[str]:
+    """Términos de una consulta: sin relleno, con stem, sin repetidos, ordenados."""
+    tokens = tokenize(text)
+    useful = [t for t in tokens if t not in QUERY_NOISE] or tokens
+    return sorted({stem(t) for t in useful})
+
+
+def query_key(text: str) -> str:
+    """Clave canónica de una consulta (misma intención → misma clave)."""
+    return " ".join(query_terms(text))
+
+
+__all__ = [
+    "STOPWORDS",
+    "QUERY_NOISE",
+    "fold_accents",
+    "tokenize",
+    "stem",
+    "terms",
+    "query_terms",
+    "query_key",
+]
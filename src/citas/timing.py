@@ -0,0 +1,119 @@
+"""
+Desglose de latencia por fase de cada turno de chat.
+
+Cada request de /api/chat abre un RequestTiming (main.py) que vive en un ContextVar.
+El objeto es mutable, así que las coroutines y tasks hijas (tools, llamadas a la API,
+escrituras del checkpointer) agregan sus fases al mismo registro.
+
+Fases (label `phase` de citas_request_phase_duration_seconds):
+  semaphore_wait     espera del semáforo MAX_CONCURRENT_AGENT
+  session_lock_wait  espera del lock por session_id
+  agent_lookup       agente servido desde cache
+  agent_build        construcción del agente (cache miss, incluye system prompt)
+  llm_call           cada llamada al modelo
+  tool_call          cada tool (detail = nombre de la tool)
+  php_call           cada llamada a las APIs PHP (detail = codOpe)
+  checkpoint_io      cada operación del checkpointer (detail = get | put | ...)
+
+Con REQUEST_TIMING_LOG=true main.py emite además una línea [TIMING] en JSON por
+request, con el trace_id de logger.py.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from .logger import get_logger, trace_id
+from .metrics import REQUEST_PHASE_DURATION
+
+logger = get_logger(__name__)
+
+
+class RequestTiming:
+    """Fases medidas durante un request: lista de (phase, detail, segundos)."""
+
+    __slots__ = ("start", "events")
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.events: list[tuple[str, str, float]] = []
+
+    def add(self, phase: str, seconds: float, detail: str = "") -> None:
+        self.events.append((phase, detail, seconds))
+
+    def summary(self) -> dict[str, Any]:
+        """Total del request, suma y conteo por fase, y eventos en orden (ms)."""
+        phases: dict[str, dict[str, float]] = {}
+        for phase, _, seconds in self.events:
+            agg = phases.setdefault(phase, {"ms": 0.0, "count": 0})
+            agg["ms"] += seconds * 1000
+            agg["count"] += 1
+        for agg in phases.values():
+            agg["ms"] = round(agg["ms"], 1)
+        return {
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 1),
+            "phases": phases,
+            "events": [
+                [phase, detail, round(seconds * 1000, 1)]
+                for phase, detail, seconds in self.events
+            ],
+        }
+
+
+_current: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+def start_request_timing() -> RequestTiming:
+    """Abre el registro de fases del request actual (llamar al inicio de /api/chat)."""
+    timing = RequestTiming()
+    _current.set(timing)
+    return timing
+
+
+def record_phase(phase: str, seconds: float, detail: str = "") -> None:
+    """Registra una fase ya medida: histograma + registro del request (si hay uno abierto)."""
+    REQUEST_PHASE_DURATION.labels(phase=phase).observe(seconds)
+    timing = _current.get()
+    if timing is not None:
+        timing.add(phase, seconds, detail)
+
+
+@contextmanager
+def track_phase(phase: str, detail: str = ""):
+    """Context manager que mide el bloque como una fase del request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - start, detail)
+
+
+@asynccontextmanager
+async def timed_acquire(lock: Any, phase: str):
+    """Equivalente a `async with lock` registrando solo la espera como fase."""
+    with track_phase(phase):
+        await lock.acquire()
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def log_request_timing(timing: RequestTiming, **fields: Any) -> None:
+    """Emite la línea [TIMING] (JSON) con el desglose del request."""
+    record = {"trace_id": trace_id.get(), **fields, **timing.summary()}
+    logger.info("[TIMING] %s", json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+
+
+__all__ = [
+    "RequestTiming",
+    "start_request_timing",
+    "record_phase",
+    "track_phase",
+    "timed_acquire",
+    "log_request_timing",
+]
@@ -11,9 +11,11 @@ from langchain.tools import tool, ToolRuntime
 from pydantic import ValidationError
 
 from ..services.scheduling import ScheduleValidator, ScheduleRecommender, confirm_booking
-from ..services.busqueda_productos import buscar_productos_servicios, format_productos_para_respuesta
+from ..services.busqueda_productos import buscar_productos_servicios, aformat_productos_para_respuesta
 from ..logger import get_logger
 from ..metrics import track_tool_execution, record_tool_validation_error
+from ..timing import track_phase
+from ..tracing import start_span
 from .validation import BookingData, format_validation_error, validate_date_format
 
 logger = get_logger(__name__)
@@ -110,7 +112,11 @@ async def check_availability(
         if missing:
             return missing
 
-        with track_tool_execution("check_availability"):
+        with (
+            track_tool_execution("check_availability"),
+            track_phase("tool_call", "check_availability"),
+            start_span("tool.check_availability", id_empresa=id_empresa),
+        ):
             recommender = ScheduleRecommender(
                 id_empresa=id_empresa,
                 duracion_cita_minutos=duracion_cita_minutos,
@@ -198,7 +204,11 @@ async def create_booking(
         if missing:
             return missing
 
-        with track_tool_execution("create_booking"):
+        with (
+            track_tool_execution("create_booking"),
+            track_phase("tool_call", "create_booking"),
+            start_span("tool.create_booking", id_empresa=id_empresa),
+        ):
             # 1. VALIDAR datos de entrada y normalizar (email lowercase, nombre title-case)
             logger.debug("[TOOL] create_booking - Validando datos de entrada")
             try:
@@ -228,9 +238,9 @@ async def create_booking(
             validation = await validator.validate(date, time)
             logger.debug("[TOOL] create_booking - Validación: %s", validation)
 
-            if not validation["valid"]:
-                logger.warning("[TOOL] create_booking - Horario no válido: %s", validation["error"])
-                return f"{validation['error']}\n\nPor favor elige otra fecha u hora."
+            if not validation.valid:
+                logger.warning("[TOOL] create_booking - Horario no válido: %s", validation.error)
+                return f"{validation.error}\n\nPor favor elige otra fecha u hora."
 
             # 3. Crear evento en ws_calendario (CREAR_EVENTO)
             logger.debug("[TOOL] create_booking - Creando evento en API")
@@ -306,27 +316,30 @@ async def search_productos_servicios(
             "[TOOL] search_productos_servicios - id_empresa=%s, busqueda=%s",
             id_empresa, busqueda,
         )
-        with track_tool_execution("search_productos_servicios"):
+        with (
+            track_tool_execution("search_productos_servicios"),
+            track_phase("tool_call", "search_productos_servicios"),
+            start_span("tool.search_productos_servicios", id_empresa=id_empresa),
+        ):
             result = await buscar_productos_servicios(
                 id_empresa=id_empresa,
                 busqueda=busqueda,
                 log_search_apis=True,
             )
 
-            if not result["success"]:
-                logger.debug("[TOOL] search_productos_servicios - Respuesta: error=%s", result.get("error"))
-                return result.get("error", "No se pudo completar la búsqueda.")
+            if not result.success:
+                logger.debug("[TOOL] search_productos_servicios - Respuesta: error=%s", result.error)
+                return result.error or "No se pudo completar la búsqueda."
 
-            productos = result.get("productos", [])
+            productos = result.productos
             if not productos:
                 logger.debug("[TOOL] search_productos_servicios - Respuesta: 0 resultados")
                 return f"No encontré productos o servicios que coincidan con '{busqueda}'. Prueba con otros términos."
 
             logger.debug("[TOOL] search_productos_servicios - Respuesta: %s resultado(s)", len(productos))
-            lineas = [f"Encontré {len(productos)} resultado(s) para '{busqueda}':\n"]
-
-            lineas.append(format_productos_para_respuesta(productos))
-            return "\n".join(lineas)
+            # texto viene formateado desde el cache / índice; solo falta el encabezado
+            texto = result.texto or await aformat_productos_para_respuesta(productos)
+            return f"Encontré {len(productos)} resultado(s) para '{busqueda}':\n\n{texto}"
 
     except Exception as e:
         logger.error("[TOOL] search_productos_servicios - Error: %s", e, exc_info=True)
@@ -0,0 +1,169 @@
+"""
+Tracing OpenTelemetry (opcional) del agente de citas.
+
+Se activa con OTEL_ENABLED=true (main.py llama a init_tracing) y requiere el extra
+`tracing` (opentelemetry-api + opentelemetry-sdk). Sin el flag o sin los paquetes,
+todas las funciones son no-op y no hay overhead.
+
+Spans:
+  POST /api/chat        (server) — continúa el `traceparent` del gateway Go
+  agent.invoke          agent.ainvoke completo
+  llm.call              cada llamada al modelo (middleware model_call_timer)
+  tool.<nombre>         check_availability, create_booking, search_productos_servicios
+  php.post              cada POST a las APIs PHP (client), atributo `cod_ope`
+
+Los POST a PHP llevan `traceparent`/`tracestate` del span php.post, así el waterfall
+sigue en los backends si estos lo soportan.
+
+Exporters (OTEL_EXPORTER):
+  console  spans en JSON por stdout (offline)
+  file     un span JSON por línea en OTEL_EXPORTER_FILE (offline)
+  otlp     OTLP/HTTP (requiere opentelemetry-exporter-otlp-proto-http; endpoint
+           vía OTEL_EXPORTER_OTLP_ENDPOINT estándar)
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Mapping
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    _OTEL_AVAILABLE = True
+except ImportError:  # extra `tracing` no instalado
+    _OTEL_AVAILABLE = False
+
+_tracer: Any = None
+_provider: Any = None
+_export_file: IO[str] | None = None
+
+
+def _build_exporter(exporter: str, export_file: str) -> Any:
+    global _export_file
+    if exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning(
+                "[TRACING] opentelemetry-exporter-otlp-proto-http no instalado; usando console"
+            )
+        else:
+            return OTLPSpanExporter()
+    if exporter == "file":
+        path = Path(export_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _export_file = path.open("a", encoding="utf-8")
+        return ConsoleSpanExporter(
+            out=_export_file,
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    return ConsoleSpanExporter()
+
+
+def init_tracing(
+    service_name: str = "agent-citas",
+    exporter: str = "console",
+    export_file: str = "logs/traces.jsonl",
+) -> bool:
+    """
+    Configura el TracerProvider y el exporter. Idempotente.
+
+    Args:
+        service_name: Atributo service.name de los spans
+        exporter: console | file | otlp
+        export_file: Ruta del archivo (solo exporter=file)
+
+    Returns:
+        True si el tracing quedó activo
+    """
+    global _tracer, _provider
+    if _tracer is not None:
+        return True
+    if not _OTEL_AVAILABLE:
+        logger.warning("[TRACING] OTEL_ENABLED=true pero opentelemetry-sdk no está instalado")
+        return False
+    _provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    _provider.add_span_processor(BatchSpanProcessor(_build_exporter(exporter, export_file)))
+    _tracer = _provider.get_tracer("citas")
+    logger.info("[TRACING] OpenTelemetry activo (exporter=%s, service=%s)", exporter, service_name)
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Exporta los spans pendientes y libera el exporter. Llamar en el lifespan."""
+    global _tracer, _provider, _export_file
+    if _provider is not None:
+        _provider.shutdown()
+    if _export_file is not None:
+        _export_file.close()
+    _tracer = _provider = _export_file = None
+
+
+@contextmanager
+def start_span(
+    name: str,
+    *,
+    kind: str = "internal",
+    carrier: Mapping[str, str] | None = None,
+    **attributes: Any,
+) -> Iterator[Any]:
+    """
+    Abre un span hijo del span actual (o del `traceparent` en `carrier`).
+
+    Args:
+        name: Nombre del span
+        kind: internal | server | client
+        carrier: Headers entrantes de donde extraer el contexto padre (W3C)
+        **attributes: Atributos del span (se omiten los None)
+
+    Yields:
+        El span, o None si el tracing está desactivado
+    """
+    if _tracer is None:
+        yield None
+        return
+    context = propagate.extract(carrier) if carrier is not None else None
+    with _tracer.start_as_current_span(
+        name,
+        context=context,
+        kind=getattr(trace.SpanKind, kind.upper()),
+        attributes={k: v for k, v in attributes.items() if v is not None},
+    ) as span:
+        yield span
+
+
+def annotate_current_span(**attributes: Any) -> None:
+    """Agrega atributos al span activo (no-op sin tracing)."""
+    if _tracer is None:
+        return
+    span = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            span.set_attribute(key, value)
+
+
+def trace_headers() -> dict[str, str] | None:
+    """Headers W3C (`traceparent`, `tracestate`) del span actual para requests salientes."""
+    if _tracer is None:
+        return None
+    headers: dict[str, str] = {}
+    propagate.inject(headers)
+    return headers or None
+
+
+__all__ = [
+    "init_tracing",
+    "shutdown_tracing",
+    "start_span",
+    "annotate_current_span",
+    "trace_headers",
+]
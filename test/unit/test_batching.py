@@ -0,0 +1,130 @@
+"""Tests para infra/batching.py (POST multi-operación a ws_informacion_ia.php)."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+
+import httpx
+import pytest
+
+from citas.infra.batching import PostBatcher
+
+URL = "https://php.example.com/ws_informacion_ia.php"
+
+
+class _FakePHP:
+    """POST falso: registra los payloads y responde según el modo."""
+
+    def __init__(self, mode: str = "batched") -> None:
+        self.mode = mode
+        self.sent: list[dict] = []
+
+    async def __call__(self, url: str, payload: dict) -> dict:
+        self.sent.append(payload)
+        if "operaciones" in payload:
+            if self.mode == "http_400":
+                request = httpx.Request("POST", url)
+                raise httpx.HTTPStatusError("400", request=request, response=httpx.Response(400, request=request))
+            if self.mode == "http_500":
+                request = httpx.Request("POST", url)
+                raise httpx.HTTPStatusError("500", request=request, response=httpx.Response(500, request=request))
+            if self.mode == "no_resultados":
+                return {"success": False, "error": "codOpe desconocido"}
+            return {"success": True, "resultados": [{"echo": op["codOpe"]} for op in payload["operaciones"]]}
+        return {"echo": payload["codOpe"]}
+
+
+def _batcher(php, max_ops: int = 10) -> PostBatcher:
+    return PostBatcher(php, "MULTI", window_seconds=0.01, max_ops=max_ops)
+
+
+async def _submit_all(batcher: PostBatcher, *cod_opes: str) -> list:
+    return await asyncio.gather(
+        *(batcher.submit(URL, {"codOpe": cod, "id_empresa": 1}) for cod in cod_opes),
+        return_exceptions=True,
+    )
+
+
+async def test_reads_in_window_share_one_post():
+    php = _FakePHP()
+
+    results = await _submit_all(_batcher(php), "A", "B", "C")
+
+    assert results == [{"echo": "A"}, {"echo": "B"}, {"echo": "C"}]
+    assert len(php.sent) == 1
+    assert php.sent[0]["codOpe"] == "MULTI"
+
+
+async def test_single_read_is_sent_as_is():
+    php = _FakePHP()
+
+    assert await _submit_all(_batcher(php), "A") == [{"echo": "A"}]
+    assert php.sent == [{"codOpe": "A", "id_empresa": 1}]
+
+
+@pytest.mark.parametrize("mode", ["http_400", "no_resultados"])
+async def test_unsupported_backend_falls_back_to_fan_out(mode):
+    php = _FakePHP(mode)
+    batcher = _batcher(php)
+
+    results = await _submit_all(batcher, "A", "B")
+
+    assert results == [{"echo": "A"}, {"echo": "B"}]
+    assert not batcher.supports(URL)
+    # Ya marcada: el siguiente lote va directo en paralelo, sin reintentar el multi
+    php.sent.clear()
+    assert await _submit_all(batcher, "C", "D") == [{"echo": "C"}, {"echo": "D"}]
+    assert all("operaciones" not in payload for payload in php.sent)
+
+
+async def test_server_error_fails_every_caller():
+    php = _FakePHP("http_500")
+    batcher = _batcher(php)
+
+    results = await _submit_all(batcher, "A", "B")
+
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+    assert batcher.supports(URL)
+
+
+async def test_full_batch_is_sent_without_waiting_for_more():
+    php = _FakePHP()
+    batcher = _batcher(php, max_ops=2)
+
+    results = await _submit_all(batcher, "A", "B", "C")
+
+    assert results == [{"echo": "A"}, {"echo": "B"}, {"echo": "C"}]
+    assert [len(p.get("operaciones", [p])) for p in php.sent] == [2, 1]
+
+
+async def test_close_cancels_in_flight_batches():
+    php = _FakePHP()
+    batcher = PostBatcher(php, "MULTI", window_seconds=10, max_ops=10)
+    waiting = asyncio.ensure_future(_submit_all(batcher, "A", "B"))
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    await batcher.close()
+
+    assert all(isinstance(r, asyncio.CancelledError) for r in await waiting)
+    assert php.sent == []
+
+
+async def test_batch_runs_outside_the_callers_context():
+    caller = contextvars.ContextVar("caller", default=None)
+    seen: list = []
+    php = _FakePHP()
+
+    async def send(url: str, payload: dict) -> dict:
+        seen.append(caller.get())
+        return await php(url, payload)
+
+    batcher = _batcher(send)
+
+    async def read(name: str) -> dict:
+        caller.set(name)
+        return await batcher.submit(URL, {"codOpe": name, "id_empresa": 1})
+
+    assert await asyncio.gather(read("A"), read("B")) == [{"echo": "A"}, {"echo": "B"}]
+    assert seen == [None]
@@ -0,0 +1,103 @@
+"""Tests para agent/runtime/_bounded_saver.py (eviction y contabilidad de bytes)."""
+
+from __future__ import annotations
+
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+
+from citas.agent.runtime import _bounded_saver
+from citas.agent.runtime._bounded_saver import BoundedInMemorySaver
+
+
+def _stored_bytes(saver: InMemorySaver) -> int:
+    """Bytes que realmente retiene el saver (lo que total_bytes debería reflejar)."""
+    nbytes = sum(
+        len(checkpoint[1]) + len(metadata[1])
+        for namespaces in saver.storage.values()
+        for checkpoints in namespaces.values()
+        for checkpoint, metadata, _ in checkpoints.values()
+    )
+    nbytes += sum(len(blob[1]) for blob in saver.blobs.values())
+    nbytes += sum(len(write[2][1]) for writes in saver.writes.values() for write in writes.values())
+    return nbytes
+
+
+def _put(saver: BoundedInMemorySaver, thread_id: str, text: str = "hola", checkpoint_id: str | None = None) -> dict:
+    checkpoint = empty_checkpoint()
+    if checkpoint_id is not None:
+        checkpoint["id"] = checkpoint_id
+    checkpoint["channel_values"] = {"messages": text}
+    checkpoint["channel_versions"] = {"messages": 1}
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return saver.put(config, checkpoint, {"source": "loop", "step": 1}, {"messages": 1})
+
+
+def _get(saver: BoundedInMemorySaver, thread_id: str):
+    return saver.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+
+
+def test_idle_thread_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(_bounded_saver.time, "monotonic", lambda: now[0])
+    saver = BoundedInMemorySaver(ttl_seconds=60)
+    _put(saver, "viejo")
+
+    now[0] += 30
+    assert _get(saver, "viejo") is not None
+    now[0] += 61
+    assert _get(saver, "viejo") is None
+    assert saver.thread_count == 0 and saver.total_bytes == 0
+
+
+def test_thread_cap_evicts_least_recently_used():
+    saver = BoundedInMemorySaver(max_threads=2)
+    _put(saver, "a")
+    _put(saver, "b")
+    _get(saver, "a")
+
+    _put(saver, "c")
+
+    assert set(saver.storage) == {"a", "c"}
+    assert saver.total_bytes == _stored_bytes(saver)
+
+
+def test_byte_cap_keeps_the_thread_being_written():
+    saver = BoundedInMemorySaver(max_bytes=1)
+    _put(saver, "a")
+    _put(saver, "b", "x" * 1000)
+
+    assert set(saver.storage) == {"b"}
+    assert saver.total_bytes == _stored_bytes(saver) > 1
+
+
+def test_total_bytes_after_delete_and_eviction():
+    saver = BoundedInMemorySaver(max_threads=2)
+    for thread_id in ("a", "b", "c"):
+        _put(saver, thread_id, thread_id * 50)
+    assert saver.total_bytes == _stored_bytes(saver)
+
+    saver.delete_thread("c")
+
+    assert saver.thread_count == 1
+    assert saver.total_bytes == _stored_bytes(saver)
+
+
+def test_reput_same_checkpoint_is_counted_once():
+    saver = BoundedInMemorySaver()
+    _put(saver, "a", checkpoint_id="c1")
+    _put(saver, "a", checkpoint_id="c1")
+
+    assert saver.total_bytes == _stored_bytes(saver)
+
+
+def test_overwritten_writes_are_not_double_counted():
+    saver = BoundedInMemorySaver()
+    config = _put(saver, "a")
+
+    saver.put_writes(config, [("messages", "x" * 100)], task_id="t")
+    # Los canales especiales (__error__) se sobrescriben; los normales se conservan
+    saver.put_writes(config, [("__error__", "y" * 500)], task_id="t")
+    saver.put_writes(config, [("__error__", "z")], task_id="t")
+    saver.put_writes(config, [("messages", "otro")], task_id="t")
+
+    assert saver.total_bytes == _stored_bytes(saver)
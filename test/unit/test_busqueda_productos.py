@@ -0,0 +1,94 @@
+"""Tests para services/busqueda_productos.py (payload PHP y claves del cache)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from citas.services import busqueda_productos
+
+_CATALOGO = [
+    {"nombre": "NovaX", "precio_unitario": "120"},
+    {"nombre": "NovaX Pro", "precio_unitario": "250"},
+    {"nombre": "Plan de salud familiar", "precio_unitario": "80"},
+]
+
+
+class _LikePHP:
+    """BUSCAR_PRODUCTOS_SERVICIOS_CITAS falso: LIKE '%frase%' sobre el nombre."""
+
+    def __init__(self) -> None:
+        self.enviados: list[str] = []
+
+    async def __call__(self, url, payload):
+        frase = payload["busqueda"]
+        self.enviados.append(frase)
+        await asyncio.sleep(0.01)
+        return {
+            "success": True,
+            "productos": [p for p in _CATALOGO if frase.lower() in p["nombre"].lower()],
+        }
+
+
+@pytest.fixture
+def php(monkeypatch) -> _LikePHP:
+    fake = _LikePHP()
+    monkeypatch.setattr(busqueda_productos, "post_with_logging", fake)
+    busqueda_productos._busqueda_cache.clear()
+    if busqueda_productos._negative_cache is not None:
+        busqueda_productos._negative_cache.clear()
+    busqueda_productos._failure_backoff.clear()
+    return fake
+
+
+def _nombres(resultado) -> list[str]:
+    return [p["nombre"] for p in resultado.productos]
+
+
+async def test_case_and_whitespace_variants_share_one_call(php):
+    first, second = await asyncio.gather(
+        busqueda_productos.buscar_productos_servicios(4201, "Plan de salud"),
+        busqueda_productos.buscar_productos_servicios(4201, " plan  de   SALUD "),
+    )
+
+    assert php.enviados == ["Plan de salud"]
+    assert _nombres(first) == _nombres(second) == ["Plan de salud familiar"]
+
+
+async def test_empty_phrase_does_not_poison_shorter_query(php):
+    vacio = await busqueda_productos.buscar_productos_servicios(4202, "el precio de NovaX")
+    encontrado = await busqueda_productos.buscar_productos_servicios(4202, "NovaX")
+
+    assert vacio.productos == []
+    assert php.enviados == ["el precio de NovaX", "NovaX"]
+    assert _nombres(encontrado) == ["NovaX", "NovaX Pro"]
+
+
+async def test_longer_phrase_is_filtered_from_cached_result(php):
+    await busqueda_productos.buscar_productos_servicios(4203, "novax")
+    resultado = await busqueda_productos.buscar_productos_servicios(4203, "NovaX pro")
+
+    assert php.enviados == ["novax"]
+    assert _nombres(resultado) == ["NovaX Pro"]
+
+
+async def test_negative_answer_is_only_replayed_for_the_same_text(php, monkeypatch):
+    respuestas = iter([
+        {"success": False, "error": "busqueda invalida"},
+        {"success": True, "productos": [_CATALOGO[0]]},
+    ])
+
+    async def _post(url, payload):
+        php.enviados.append(payload["busqueda"])
+        return next(respuestas)
+
+    monkeypatch.setattr(busqueda_productos, "post_with_logging", _post)
+
+    error = await busqueda_productos.buscar_productos_servicios(4204, "precio NovaX?")
+    repetido = await busqueda_productos.buscar_productos_servicios(4204, "PRECIO  novax?")
+    otra_frase = await busqueda_productos.buscar_productos_servicios(4204, "NovaX")
+
+    assert not error.success and repetido is error
+    assert php.enviados == ["precio NovaX?", "NovaX"]
+    assert _nombres(otra_frase) == ["NovaX"]
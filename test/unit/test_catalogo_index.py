@@ -0,0 +1,66 @@
+"""Tests para services/catalogo_index.py (ranking BM25 y regla de cobertura)."""
+
+from __future__ import annotations
+
+import pytest
+
+from citas.services.catalogo_index import CatalogIndex
+
+
+def _item(nombre: str, descripcion: str = "", categoria: str = "") -> dict:
+    return {
+        "nombre": nombre,
+        "descripcion": descripcion,
+        "nombre_categoria": categoria,
+        "precio_unitario": "100.00",
+    }
+
+
+@pytest.fixture
+def index() -> CatalogIndex:
+    return CatalogIndex([
+        _item("Plan de salud familiar", "Cobertura médica para toda la familia"),
+        _item("Consultoría tributaria", "Asesoría en impuestos"),
+        _item("Plan dental", "Limpieza y revisión odontológica"),
+        _item("Seguro vehicular", "Incluye plan de salud para el conductor"),
+        _item("Beneficios corporativos", categoria="Empresas"),
+    ])
+
+
+def _nombres(index: CatalogIndex, query: str) -> list[str]:
+    return [item["nombre"] for item in index.search(query, 10)]
+
+
+def test_name_match_ranks_above_description_match(index):
+    assert _nombres(index, "plan de salud") == ["Plan de salud familiar", "Seguro vehicular"]
+
+
+def test_exact_single_term_answers_locally(index):
+    assert _nombres(index, "dental") == ["Plan dental"]
+
+
+def test_accents_plural_and_noise_are_normalized(index):
+    assert _nombres(index, "¿Cuánto cuesta la CONSULTORIA tributaria?") == ["Consultoría tributaria"]
+
+
+def test_partial_coverage_does_not_answer(index):
+    # "plan" está en varios ítems, pero ninguno habla de mascotas: decide la API
+    assert index.search_result("plan mascotas", 10) is None
+
+
+def test_lone_prefix_or_typo_does_not_answer(index):
+    assert index.search_result("consul", 10) is None
+    assert index.search_result("benefisios", 10) is None
+
+
+def test_prefix_and_typo_are_compensated_by_exact_terms(index):
+    assert _nombres(index, "consultoria tribut") == ["Consultoría tributaria"]
+    assert _nombres(index, "beneficios corporatibos empresas") == ["Beneficios corporativos"]
+
+
+def test_search_result_carries_rendered_text(index):
+    resultado = index.search_result("dental", 10)
+
+    assert resultado.success
+    assert "Plan dental" in resultado.texto
+    assert len(resultado.resumen) == 1
@@ -0,0 +1,104 @@
+"""Tests para infra/hedging.py (presupuesto y carrera de hedges)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from citas.infra.hedging import HedgeBudget, hedged
+
+
+def test_budget_accumulates_credit_per_request():
+    budget = HedgeBudget(0.25)
+
+    for _ in range(3):
+        budget.on_request()
+    assert not budget.try_spend()
+    budget.on_request()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+def test_budget_credit_is_capped():
+    budget = HedgeBudget(1.0)
+
+    for _ in range(100):
+        budget.on_request()
+
+    assert sum(budget.try_spend() for _ in range(100)) == 10
+
+
+def _calls(*delays: float, fail: set[int] = frozenset()):
+    """call() que en la n-ésima invocación espera delays[n] y responde n (o falla)."""
+    started: list[int] = []
+    cancelled: list[int] = []
+
+    async def call():
+        n = len(started)
+        started.append(n)
+        try:
+            await asyncio.sleep(delays[n])
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        if n in fail:
+            raise ValueError(f"fallo {n}")
+        return n
+
+    return call, started, cancelled
+
+
+def _budget(credit: float) -> HedgeBudget:
+    budget = HedgeBudget(credit)
+    budget.on_request()
+    return budget
+
+
+async def test_fast_primary_sends_no_hedge():
+    call, started, _ = _calls(0.0)
+    events: list[str] = []
+
+    assert await hedged(call, 0.05, _budget(1.0), events.append) == 0
+    assert started == [0] and events == []
+
+
+async def test_hedge_wins_and_primary_is_cancelled():
+    call, started, cancelled = _calls(1.0, 0.0)
+    events: list[str] = []
+
+    assert await hedged(call, 0.01, _budget(1.0), events.append) == 1
+    await asyncio.sleep(0)
+    assert events == ["sent", "won"]
+    assert cancelled == [0]
+
+
+async def test_primary_wins_after_hedge_sent():
+    call, _, cancelled = _calls(0.03, 1.0)
+    events: list[str] = []
+
+    assert await hedged(call, 0.01, _budget(1.0), events.append) == 0
+    await asyncio.sleep(0)
+    assert events == ["sent"]
+    assert cancelled == [1]
+
+
+async def test_without_budget_waits_for_primary():
+    call, started, _ = _calls(0.03)
+    events: list[str] = []
+
+    assert await hedged(call, 0.01, _budget(0.5), events.append) == 0
+    assert started == [0] and events == ["budget_exhausted"]
+
+
+async def test_failed_hedge_falls_back_to_primary():
+    call, _, _ = _calls(0.03, 0.0, fail={1})
+
+    assert await hedged(call, 0.01, _budget(1.0), lambda _: None) == 0
+
+
+async def test_both_failing_raises_primary_error():
+    call, _, _ = _calls(0.02, 0.0, fail={0, 1})
+
+    with pytest.raises(ValueError, match="fallo 0"):
+        await hedged(call, 0.01, _budget(1.0), lambda _: None)
@@ -0,0 +1,122 @@
+"""Tests para agent/runtime/_hot_cache.py (cache local sobre el checkpointer Redis)."""
+
+from __future__ import annotations
+
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+
+from citas.agent.runtime._hot_cache import HotThreadCacheSaver
+
+
+class _FakePipeline:
+    def __init__(self, redis: "_FakeRedis") -> None:
+        self._redis = redis
+        self._ops: list = []
+
+    def get(self, key):
+        self._ops.append(lambda: self._redis.values.get(key))
+
+    def zcard(self, key):
+        self._ops.append(lambda: self._redis.zcards.get(key, 0))
+
+    async def execute(self):
+        self._redis.round_trips += 1
+        return [op() for op in self._ops]
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.zcards: dict[str, int] = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+class _FakeRegistry:
+    @staticmethod
+    def make_write_keys_zset_key(thread_id, checkpoint_ns, checkpoint_id) -> str:
+        return f"write_keys_zset:{thread_id}:{checkpoint_ns}:{checkpoint_id}"
+
+
+class _RedisLikeSaver(InMemorySaver):
+    """InMemorySaver con la superficie de AsyncRedisSaver que usa el cache."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._redis = _FakeRedis()
+        self._key_registry = _FakeRegistry()
+        self.reads = 0
+
+    @staticmethod
+    def _make_redis_checkpoint_key(thread_id, checkpoint_ns, checkpoint_id) -> str:
+        return f"checkpoint:{thread_id}:{checkpoint_ns}:{checkpoint_id}"
+
+    async def aget_tuple(self, config):
+        self.reads += 1
+        return await super().aget_tuple(config)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        next_config = await super().aput(config, checkpoint, metadata, new_versions)
+        cfg = next_config["configurable"]
+        pointer = f"checkpoint_latest:{cfg['thread_id']}:{cfg['checkpoint_ns'] or '__empty__'}"
+        self._redis.values[pointer] = self._make_redis_checkpoint_key(
+            cfg["thread_id"], cfg["checkpoint_ns"], cfg["checkpoint_id"]
+        )
+        return next_config
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await super().aput_writes(config, writes, task_id, task_path)
+        cfg = config["configurable"]
+        key = _FakeRegistry.make_write_keys_zset_key(cfg["thread_id"], cfg["checkpoint_ns"], cfg["checkpoint_id"])
+        self._redis.zcards[key] = self._redis.zcards.get(key, 0) + len(writes)
+
+
+async def _saver_with_turn() -> tuple[HotThreadCacheSaver, _RedisLikeSaver, dict]:
+    inner = _RedisLikeSaver()
+    saver = HotThreadCacheSaver(inner, max_threads=10)
+    config = {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+    next_config = await saver.aput(config, empty_checkpoint(), {"source": "loop", "step": 1, "tags": []}, {})
+    await saver.aput_writes(next_config, [("messages", {"content": "hola"})], task_id="task")
+    return saver, inner, config
+
+
+async def test_hit_returns_independent_copies():
+    saver, inner, config = await _saver_with_turn()
+
+    first = await saver.aget_tuple(config)
+    first.metadata["tags"].append("mutado")
+    first.pending_writes[0][2]["content"] = "mutado"
+    second = await saver.aget_tuple(config)
+
+    assert inner.reads == 0
+    assert second.metadata["tags"] == []
+    assert second.pending_writes[0][2] == {"content": "hola"}
+
+
+async def test_writes_from_other_replica_invalidate_entry():
+    saver, inner, config = await _saver_with_turn()
+    checkpoint_id = (await saver.aget_tuple(config)).config["configurable"]["checkpoint_id"]
+
+    # Otra réplica agrega un write al mismo checkpoint: el puntero no cambia
+    other = {"configurable": {"thread_id": "t1", "checkpoint_ns": "", "checkpoint_id": checkpoint_id}}
+    await inner.aput_writes(other, [("tools", "resultado")], task_id="task-2")
+    result = await saver.aget_tuple(config)
+
+    assert inner.reads == 1
+    assert {channel for _, channel, _ in result.pending_writes} == {"messages", "tools"}
+
+
+async def test_reput_writes_after_load_does_not_duplicate():
+    saver, inner, config = await _saver_with_turn()
+    checkpoint_id = (await saver.aget_tuple(config)).config["configurable"]["checkpoint_id"]
+    other = {"configurable": {"thread_id": "t1", "checkpoint_ns": "", "checkpoint_id": checkpoint_id}}
+    await saver.aput_writes(other, [("tools", "resultado")], task_id="task-2")
+    saver._entries.clear()
+    await saver.aget_tuple(config)
+
+    # Reintento de task-2: mismas claves que las cargadas de Redis
+    await saver.aput_writes(other, [("tools", "resultado")], task_id="task-2")
+
+    assert sorted(saver._entries[("t1", "")].writes) == [("task", 0), ("task-2", 0)]
@@ -0,0 +1,121 @@
+"""Tests para infra/http_client.py (hedging y latencia observada)."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from citas import config as app_config, recording
+from citas.infra import http_client
+
+URL = "https://php.example.com/ws_informacion_ia.php"
+
+
+@pytest.fixture(autouse=True)
+def _clean_state(monkeypatch):
+    monkeypatch.setattr(app_config, "ADAPTIVE_TIMEOUT_ENABLED", False)
+    http_client._latencies.clear()
+    http_client._hedge_budgets.clear()
+    yield
+    http_client._latencies.clear()
+    http_client._hedge_budgets.clear()
+
+
+def _fake_send(*delays: float):
+    calls: list[int] = []
+
+    async def send_post(url, payload, read_timeout=None):
+        n = len(calls)
+        calls.append(n)
+        await asyncio.sleep(delays[n])
+        return httpx.Response(200, json={"success": True, "n": n}, request=httpx.Request("POST", url))
+
+    return send_post, calls
+
+
+def _seed(cod_ope: str, seconds: float, n: int = 20) -> tuple[str, str]:
+    key = (http_client.pool_name(URL), cod_ope)
+    for _ in range(n):
+        http_client._latencies.observe(key, seconds)
+    return key
+
+
+async def test_lost_primary_is_recorded_as_censored_sample(monkeypatch):
+    monkeypatch.setattr(app_config, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(app_config, "HEDGE_COD_OPES", frozenset({"LEER"}))
+    monkeypatch.setattr(app_config, "HEDGE_MIN_DELAY_MS", 0)
+    monkeypatch.setattr(app_config, "HEDGE_BUDGET_PERCENT", 100)
+    send_post, calls = _fake_send(1.0, 0.0)
+    monkeypatch.setattr(http_client, "send_post", send_post)
+    key = _seed("LEER", 0.01)
+
+    data = await http_client.post_with_retry(URL, {"codOpe": "LEER"})
+
+    assert data["n"] == 1 and calls == [0, 1]
+    # 20 semillas + hedge ganador (~0) + original cancelado (>= espera del hedge)
+    window = dict(http_client._latencies.windows())[key]
+    assert len(window) == 22
+    assert window.quantile(1.0) >= 0.01
+
+
+def test_adaptive_timeout_floor_tied_to_static_timeout(monkeypatch):
+    monkeypatch.setattr(app_config, "ADAPTIVE_TIMEOUT_ENABLED", True)
+    monkeypatch.setattr(app_config, "ADAPTIVE_TIMEOUT_FLOOR_SECONDS", 0.1)
+    monkeypatch.setattr(app_config, "ADAPTIVE_TIMEOUT_MIN_FRACTION", 0.25)
+    key = _seed("RAPIDO", 0.01)
+    static = http_client._read_timeout(key[0])
+
+    assert http_client._adaptive_timeout(*key) == pytest.approx(static * 0.25)
+
+    _seed("LENTO", static)
+    assert http_client._adaptive_timeout(key[0], "LENTO") == static
+
+
+def test_retry_wait_floor_tied_to_static_wait(monkeypatch):
+    monkeypatch.setattr(app_config, "ADAPTIVE_TIMEOUT_ENABLED", True)
+    monkeypatch.setattr(app_config, "ADAPTIVE_RETRY_WAIT_MIN_MS", 0)
+    monkeypatch.setattr(app_config, "HTTP_RETRY_WAIT_MIN", 1)
+    monkeypatch.setattr(app_config, "ADAPTIVE_TIMEOUT_MIN_FRACTION", 0.25)
+    _seed("RAPIDO", 0.01)
+    state = SimpleNamespace(args=(URL, {"codOpe": "RAPIDO"}), kwargs={}, attempt_number=1)
+
+    assert http_client._retry_wait(state) == pytest.approx(0.25)
+
+
+async def test_batched_reads_are_recorded_per_caller(monkeypatch):
+    monkeypatch.setattr(app_config, "PHP_BATCH_ENABLED", True)
+    monkeypatch.setattr(app_config, "PHP_BATCH_WINDOW_MS", 10)
+    monkeypatch.setattr(app_config, "API_INFORMACION_URL", URL)
+    sent: list[dict] = []
+
+    async def post_with_retry(url, payload):
+        sent.append(payload)
+        assert recording._current.get() is None
+        return {"success": True, "resultados": [{"echo": op["codOpe"]} for op in payload["operaciones"]]}
+
+    monkeypatch.setattr(http_client, "post_with_retry", post_with_retry)
+    monkeypatch.setattr(http_client, "_batcher", None)
+
+    async def read(cod_ope: str) -> list[dict]:
+        record = SimpleNamespace(php=[])
+        recording._current.set(record)
+        await http_client.post_with_logging(URL, {"codOpe": cod_ope, "id_empresa": 1})
+        return record.php
+
+    try:
+        horario, productos = await asyncio.gather(
+            read("OBTENER_HORARIO_REUNIONES"), read("OBTENER_PRODUCTOS_CITAS"),
+        )
+    finally:
+        await http_client._batcher.close()
+
+    assert len(sent) == 1
+    assert [(c["cod_ope"], c["response"]) for c in horario] == [
+        ("OBTENER_HORARIO_REUNIONES", {"echo": "OBTENER_HORARIO_REUNIONES"}),
+    ]
+    assert [(c["cod_ope"], c["response"]) for c in productos] == [
+        ("OBTENER_PRODUCTOS_CITAS", {"echo": "OBTENER_PRODUCTOS_CITAS"}),
+    ]
@@ -0,0 +1,99 @@
+"""Tests para agent/runtime/_instrumented_saver.py (latencia y bytes por operación)."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from types import SimpleNamespace
+
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+from prometheus_client import REGISTRY
+from redis.asyncio import Redis
+
+from citas.agent.runtime._instrumented_saver import InstrumentedCheckpointSaver
+from citas.agent.runtime._redis_saver import CompactAsyncRedisSaver
+from citas.agent.runtime._serde import CompactCheckpointSerializer
+
+
+def _sample(name: str, op: str) -> float:
+    return REGISTRY.get_sample_value(name, {"op": op}) or 0.0
+
+
+async def _saver_with_checkpoints(n: int) -> tuple[InstrumentedCheckpointSaver, dict]:
+    saver = InstrumentedCheckpointSaver(InMemorySaver())
+    config = {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+    for step in range(n):
+        config = await saver.aput(config, empty_checkpoint(), {"source": "loop", "step": step}, {})
+    return saver, {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+
+
+async def test_alist_counts_bytes_and_observes_once():
+    saver, config = await _saver_with_checkpoints(3)
+    count_before = _sample("citas_checkpoint_op_duration_seconds_count", "list")
+    bytes_before = _sample("citas_checkpoint_serialized_bytes_sum", "list")
+
+    items = [item async for item in saver.alist(config)]
+
+    assert len(items) == 3
+    assert _sample("citas_checkpoint_op_duration_seconds_count", "list") == count_before + 1
+    assert _sample("citas_checkpoint_serialized_bytes_sum", "list") > bytes_before
+
+
+async def test_alist_closed_from_another_context():
+    saver, config = await _saver_with_checkpoints(3)
+    count_before = _sample("citas_checkpoint_op_duration_seconds_count", "list")
+    iterator = saver.alist(config)
+
+    # El consumidor lee un item y corta; el cierre corre en un contexto distinto
+    first = await asyncio.create_task(iterator.__anext__(), context=contextvars.Context())
+    await asyncio.create_task(iterator.aclose(), context=contextvars.Context())
+
+    assert first.config["configurable"]["thread_id"] == "t1"
+    assert _sample("citas_checkpoint_op_duration_seconds_count", "list") == count_before + 1
+
+
+def test_list_stops_early():
+    saver = InstrumentedCheckpointSaver(InMemorySaver())
+    config = {"configurable": {"thread_id": "t2", "checkpoint_ns": ""}}
+    for step in range(2):
+        config = saver.put(config, empty_checkpoint(), {"source": "loop", "step": step}, {})
+    count_before = _sample("citas_checkpoint_op_duration_seconds_count", "list")
+
+    iterator = saver.list({"configurable": {"thread_id": "t2", "checkpoint_ns": ""}})
+    next(iterator)
+    iterator.close()
+
+    assert _sample("citas_checkpoint_op_duration_seconds_count", "list") == count_before + 1
+
+
+class _NullPipeline:
+    """Pipeline Redis que acepta todo y no guarda nada (solo interesa el serde)."""
+
+    def json(self) -> "_NullPipeline":
+        return self
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: None
+
+    async def execute(self, raise_on_error: bool = True) -> list:
+        return []
+
+
+async def test_compact_redis_put_counts_json_checkpoint_bytes():
+    redis_saver = CompactAsyncRedisSaver(redis_client=Redis())
+    redis_saver.serde = CompactCheckpointSerializer()
+    redis_saver._redis = SimpleNamespace(pipeline=lambda transaction=True: _NullPipeline())
+    saver = InstrumentedCheckpointSaver(redis_saver)
+    checkpoint = empty_checkpoint()
+    metadata = {"source": "loop", "step": 1}
+    expected = sum(
+        len(CompactCheckpointSerializer().dumps_json_typed(obj)[1]) for obj in (checkpoint, metadata)
+    )
+    count_before = _sample("citas_checkpoint_serialized_bytes_count", "put")
+    bytes_before = _sample("citas_checkpoint_serialized_bytes_sum", "put")
+
+    await saver.aput({"configurable": {"thread_id": "t3", "checkpoint_ns": ""}}, checkpoint, metadata, {})
+
+    assert _sample("citas_checkpoint_serialized_bytes_count", "put") == count_before + 1
+    assert _sample("citas_checkpoint_serialized_bytes_sum", "put") - bytes_before >= expected
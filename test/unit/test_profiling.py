@@ -0,0 +1,46 @@
+"""Tests para profiling.py (detector de callbacks lentos)."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from citas.profiling import install_slow_callback_detector, uninstall_slow_callback_detector
+
+
+def _slow_callbacks() -> float:
+    return REGISTRY.get_sample_value("citas_event_loop_slow_callbacks_total") or 0.0
+
+
+@pytest.fixture
+def detector():
+    yield install_slow_callback_detector
+    uninstall_slow_callback_detector()
+
+
+def test_counts_slow_callbacks_on_asyncio_loop(detector):
+    detector(0.02)
+    before = _slow_callbacks()
+
+    async def _block() -> None:
+        await asyncio.sleep(0)
+        time.sleep(0.05)
+
+    asyncio.run(_block())
+
+    assert _slow_callbacks() > before
+
+
+def test_warns_under_uvloop(detector, caplog):
+    uvloop = pytest.importorskip("uvloop")
+
+    async def _install() -> None:
+        detector(0.02)
+
+    with caplog.at_level("WARNING"):
+        uvloop.run(_install())
+
+    assert "Detector de callbacks lentos inactivo" in caplog.text
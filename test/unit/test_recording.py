@@ -0,0 +1,90 @@
+"""Tests para recording.py (sanitizado y lectura de grabaciones)."""
+
+from __future__ import annotations
+
+import contextvars
+import gzip
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from citas import recording
+from citas.recording import iter_records, sanitize
+
+
+def test_emails_are_replaced_stably():
+    first = sanitize("Mi correo es Ana.Ruiz@Gmail.com")
+    again = sanitize({"correo_cliente": "ana.ruiz@gmail.com"})
+
+    assert "ana" not in first.lower()
+    assert first.endswith("@example.com")
+    assert again["correo_cliente"] == first.split()[-1]
+
+
+def test_phones_keep_length_and_dates_are_untouched():
+    result = sanitize("Llamame al 987654321 el 2026-05-14 a las 15:30")
+
+    assert "987654321" not in result
+    assert "2026-05-14 a las 15:30" in result
+    assert len(result) == len("Llamame al 987654321 el 2026-05-14 a las 15:30")
+
+
+def test_customer_name_is_masked_by_key_and_in_free_text():
+    entry = {
+        "request": {"message": "Soy juan  PÉREZ, quiero una cita"},
+        "tools": [{"name": "create_booking", "args": {"nombre_completo": "Juan Pérez"}}],
+        "php": [{"payload": {"titulo": "Reunion para el usuario: Juan Pérez"}}],
+    }
+
+    result = sanitize(entry)
+    fake = result["tools"][0]["args"]["nombre_completo"]
+
+    assert "juan" not in json.dumps(result, ensure_ascii=False).lower()
+    assert fake.replace(" ", "").isalpha()
+    assert result["php"][0]["payload"]["titulo"] == f"Reunion para el usuario: {fake}"
+    assert result["request"]["message"] == f"Soy {fake}, quiero una cita"
+
+
+def test_title_without_name_prefix_is_only_sanitized():
+    assert sanitize({"titulo": "Consulta"}) == {"titulo": "Consulta"}
+
+
+def test_non_string_values_pass_through():
+    assert sanitize({"n": 3, "ok": True, "x": None, "l": (1, "a")}) == {"n": 3, "ok": True, "x": None, "l": [1, "a"]}
+
+
+@pytest.mark.parametrize("name", ["conversaciones.jsonl", "conversaciones.jsonl.gz"])
+def test_iter_records_reads_plain_and_gzip(tmp_path, name):
+    path = tmp_path / name
+    lines = [json.dumps({"v": 1, "n": n}) for n in range(3)]
+    opener = gzip.open if name.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(lines[:2]) + "\n\n" + lines[2] + "\n")
+
+    assert [r["n"] for r in iter_records(path)] == [0, 1, 2]
+
+
+def test_finished_record_is_sanitized_on_disk(tmp_path):
+    path = tmp_path / "rec.jsonl"
+    recording.configure_recording(str(path))
+    try:
+        request = SimpleNamespace(
+            session_id=7,
+            model_dump=lambda exclude: {"message": "Soy Juan Pérez, juan@x.com", "session_id": 7},
+        )
+
+        def _turn() -> None:
+            record = recording.start_recording(request)
+            recording.record_tool_call("create_booking", {"nombre_completo": "Juan Pérez"}, "ok")
+            recording.finish_recording(record, "Listo Juan Pérez", None, "success")
+
+        # Contexto propio: el registro abierto no queda activo para los demás tests
+        contextvars.copy_context().run(_turn)
+    finally:
+        recording.close_recording()
+
+    (entry,) = iter_records(path)
+    assert "Juan" not in json.dumps(entry, ensure_ascii=False)
+    assert "juan@x.com" not in json.dumps(entry)
+    assert entry["status"] == "success"
@@ -0,0 +1,103 @@
+"""Tests para agent/runtime/_redis_saver.py (escrituras en pipeline)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from redis.asyncio import Redis
+
+from citas.agent.runtime._redis_saver import PipelinedAsyncRedisSaver
+
+
+class _FakePipeline:
+    def __init__(self, redis: "_FakeRedis") -> None:
+        self._redis = redis
+        self.commands: list[tuple[str, str]] = []
+
+    def json(self) -> "_FakePipeline":
+        return self
+
+    def set(self, key, *args, **kwargs) -> None:
+        # JSON.SET recibe (key, "$", doc); SET recibe (key, value)
+        self.commands.append(("json.set" if len(args) == 2 else "set", key))
+
+    def merge(self, key, *args) -> None:
+        self.commands.append(("json.merge", key))
+
+    def expire(self, key, seconds) -> None:
+        self.commands.append(("expire", key))
+
+    def zadd(self, key, mapping) -> None:
+        self.commands.append(("zadd", key))
+
+    async def execute(self, raise_on_error: bool = True) -> list:
+        self._redis.executed.append(self.commands)
+        if self._redis.cancel_next:
+            self._redis.cancel_next = False
+            raise asyncio.CancelledError()
+        return [True] * len(self.commands)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.executed: list[list[tuple[str, str]]] = []
+        self.cancel_next = False
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+async def _saver(ttl_minutes: int | None = 60) -> tuple[PipelinedAsyncRedisSaver, _FakeRedis]:
+    saver = PipelinedAsyncRedisSaver(
+        redis_client=Redis(), ttl={"default_ttl": ttl_minutes} if ttl_minutes else None,
+    )
+    fake = _FakeRedis()
+    saver._redis = fake
+    return saver, fake
+
+
+def _config() -> dict:
+    return {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+
+
+async def test_aput_keeps_expire_out_of_json_pipeline():
+    saver, fake = await _saver()
+
+    next_config = await saver.aput(_config(), empty_checkpoint(), {"source": "loop", "step": 1}, {})
+
+    assert next_config["configurable"]["thread_id"] == "t1"
+    write, ttl = fake.executed
+    assert [cmd for cmd, _ in write] == ["json.set", "set"]
+    assert [cmd for cmd, _ in ttl] == ["expire", "expire"]
+
+
+async def test_aput_without_ttl_is_one_round_trip():
+    saver, fake = await _saver(ttl_minutes=None)
+
+    await saver.aput(_config(), empty_checkpoint(), {}, {})
+
+    assert len(fake.executed) == 1
+
+
+async def test_aput_cancelled_saves_interrupted_checkpoint():
+    saver, fake = await _saver()
+    fake.cancel_next = True
+
+    with pytest.raises(asyncio.CancelledError):
+        await saver.aput(_config(), empty_checkpoint(), {}, {}, stream_mode="values")
+
+    _, rescue = fake.executed
+    assert [cmd for cmd, _ in rescue] == ["json.set"]
+
+
+async def test_aput_writes_expire_in_second_pipeline():
+    saver, fake = await _saver()
+    config = {"configurable": {"thread_id": "t1", "checkpoint_ns": "", "checkpoint_id": "c1"}}
+
+    await saver.aput_writes(config, [("messages", "hola"), ("tools", "x")], task_id="task")
+
+    write, ttl = fake.executed
+    assert "expire" not in {cmd for cmd, _ in write}
+    assert {cmd for cmd, _ in ttl} == {"expire"}
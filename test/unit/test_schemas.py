@@ -0,0 +1,55 @@
+"""Tests para schemas.py (reutilización del CitasConfig validado)."""
+
+from __future__ import annotations
+
+import pytest
+from cachetools import LRUCache
+
+from citas import schemas
+from citas.schemas import ChatRequest
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch):
+    monkeypatch.setattr(schemas, "_config_cache", LRUCache(maxsize=8))
+
+
+def _request(config: dict) -> ChatRequest:
+    return ChatRequest(message="hola", session_id=1, id_empresa=42, api_key="k", config=config)
+
+
+def test_same_payload_reuses_validated_config():
+    first = _request({"nombre_bot": "Ana", "agendar_usuario": True})
+    second = _request({"nombre_bot": "Ana", "agendar_usuario": True})
+
+    assert second.config is first.config
+    assert first.config.agendar_usuario == 1
+    assert first.config.fingerprint is not None
+
+
+def test_key_order_does_not_matter():
+    first = _request({"nombre_bot": "Ana", "slots": 3})
+    second = _request({"slots": 3, "nombre_bot": "Ana"})
+
+    assert second.config is first.config
+
+
+def test_changed_payload_is_validated_again():
+    first = _request({"nombre_bot": "Ana", "slots": 3})
+    second = _request({"nombre_bot": "Ana", "slots": 4})
+
+    assert second.config is not first.config
+    assert second.config.slots == 4
+    assert len(schemas._config_cache) == 2
+
+
+def test_disabled_cache_validates_every_time(monkeypatch):
+    # CONFIG_CACHE_MAXSIZE=0 deja el cache en None al importar
+    monkeypatch.setattr(schemas, "_config_cache", None)
+
+    first = _request({"nombre_bot": "Ana"})
+    second = _request({"nombre_bot": "Ana"})
+
+    assert second.config is not first.config
+    assert second.config == first.config
+    assert first.config.fingerprint is None
@@ -0,0 +1,64 @@
+"""Tests para agent/runtime/_serde.py (msgpack comprimido con header versionado)."""
+
+from __future__ import annotations
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.redis.jsonplus_redis import JsonPlusRedisSerializer
+
+from citas.agent.runtime._serde import CompactCheckpointSerializer, available_codecs
+
+_STATE = {
+    "messages": [HumanMessage(content="Quiero una cita"), AIMessage(content="¿Para qué día? " * 100)],
+    "step": 3,
+}
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_round_trip_per_codec(codec):
+    serde = CompactCheckpointSerializer(codec=codec, min_size=16)
+
+    type_, data = serde.dumps_typed(_STATE)
+
+    assert type_ == "cmsgpack"
+    assert data[:2] == b"CK" and data[2] == 1
+    assert serde.loads_typed((type_, data)) == _STATE
+
+
+def test_small_payload_is_stored_uncompressed():
+    serde = CompactCheckpointSerializer(codec="zlib", min_size=1 << 20)
+
+    type_, data = serde.dumps_typed({"step": 1})
+
+    assert data[3] == 0
+    assert serde.loads_typed((type_, data)) == {"step": 1}
+
+
+def test_reads_blobs_from_other_codec_instances():
+    data = CompactCheckpointSerializer(codec="zlib", min_size=16).dumps_typed(_STATE)
+
+    assert CompactCheckpointSerializer(codec="none").loads_typed(data) == _STATE
+
+
+def test_reads_existing_json_checkpoints():
+    legacy = JsonPlusRedisSerializer().dumps_typed(_STATE)
+
+    assert CompactCheckpointSerializer().loads_typed(legacy) == _STATE
+
+
+@pytest.mark.parametrize(
+    ("blob", "error"),
+    [
+        (b"XX\x01\x00abc", "sin header"),
+        (b"CK\x09\x00abc", "Versión"),
+        (b"CK\x01\x7fabc", "no instalado"),
+    ],
+)
+def test_rejects_invalid_headers(blob, error):
+    with pytest.raises((ValueError, RuntimeError), match=error):
+        CompactCheckpointSerializer().loads_typed(("cmsgpack", blob))
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        CompactCheckpointSerializer(codec="brotli")
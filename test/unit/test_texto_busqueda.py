@@ -0,0 +1,31 @@
+"""Tests para services/texto_busqueda.py (normalización de consultas)."""
+
+from __future__ import annotations
+
+from citas.services.texto_busqueda import query_key, query_terms, stem, terms
+
+
+def test_query_key_groups_equivalent_queries():
+    assert query_key("el precio de NovaX") == query_key("NovaX") == query_key("novax ") == "novax"
+
+
+def test_query_key_ignores_accents_order_and_plurals():
+    assert query_key("Planes de Salud") == query_key("salud plan") == "plan salud"
+    assert query_key("consultorías médicas") == query_key("Consultoria medica")
+
+
+def test_query_key_keeps_noise_only_queries():
+    # Solo relleno: se usa igual (si no, la clave quedaría vacía)
+    assert query_key("precio") == query_key("precios") == "preci"
+    assert query_key("de la") == ""
+
+
+def test_terms_keep_order_and_query_terms_dedupe():
+    assert terms("Plan dental y planes familiares") == ["plan", "dental", "plan", "familiar"]
+    assert query_terms("plan dental planes") == ["dental", "plan"]
+
+
+def test_stem_leaves_short_tokens_and_numbers():
+    assert stem("sus") == "sus"
+    assert stem("2024") == "2024"
+    assert stem("sesiones") == "sesion"